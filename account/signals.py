@@ -2,7 +2,7 @@ from django.db.models.signals import post_save
 from django.conf import settings
 from django.dispatch import receiver
 from .models import OtpToken
-from django.core.mail import send_mail
+from outbox.models import OutboxEmail
 from django.utils import timezone
 
  
@@ -35,12 +35,11 @@ def create_token(sender, instance, created, **kwargs):
        
         
         
-        # send email
-        send_mail(
+        # queue email; the send_outbox worker delivers it
+        OutboxEmail.objects.queue(
                 subject,
                 message,
-                sender,
                 receiver,
-                fail_silently=False,
+                from_email=sender,
             )
   
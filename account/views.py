@@ -6,15 +6,14 @@ from django.contrib import messages
 
 from django.contrib.auth import login,logout
 
+from listings.facets import listing_facets
+from listings.stats import owner_stats
+
+
 def home(request):
-    regions = [
-        "Arusha","Dar es Salaam","Dodoma","Geita","Iringa","Kagera","Katavi",
-        "Kigoma","Kilimanjaro","Lindi","Manyara","Mara","Mbeya","Morogoro",
-        "Mtwara","Mwanza","Njombe","Pemba North","Pemba South","Pwani",
-        "Rukwa","Ruvuma","Shinyanga","Simiyu","Singida","Songwe","Tabora",
-        "Tanga","Zanzibar Central/South","Zanzibar North","Zanzibar Urban/West"
-    ]
-    return render(request, 'customer/home.html', {"regions": regions})
+    # Same scope as global_search: booking and residence listings
+    facets = listing_facets(["booking", "residence"], verified_only=False)
+    return render(request, 'customer/home.html', {"regions": facets.regions})
 
 
 def about(request):
@@ -24,35 +23,11 @@ def about(request):
 
 
 
-from resedence.models import ResidenceProperty
 from booking.models import BookingProperty
-from carrental.models import CarRental
 
 def dashboard(request):
-    user = request.user  # get logged-in user
-
-    # Counts for this user only
-    booking_count = BookingProperty.objects.filter(owner=user).count()
-    residence_count = ResidenceProperty.objects.filter(owner=user).count()
-    car_rental_count = CarRental.objects.filter(owner=user).count()
-
-    # Residence property statuses (for this user)
-    available_count = ResidenceProperty.objects.filter(owner=user, status='open').count()
-    hold_count = ResidenceProperty.objects.filter(owner=user, status='hold').count()
-    closed_count = ResidenceProperty.objects.filter(owner=user, status='closed').count()
-
-    # Latest 3 Residence Properties for this user
-    residence_properties = ResidenceProperty.objects.filter(owner=user).order_by('-created_at')[:3]
-
-    context = {
-        'booking_count': booking_count,
-        'residence_count': residence_count,
-        'car_rental_count': car_rental_count,
-        'available_count': available_count,
-        'hold_count': hold_count,
-        'closed_count': closed_count,
-        'residence_properties': residence_properties,
-    }
+    # Counters and recent residences for this owner, cached until a listing changes
+    context = owner_stats(request.user.pk)
 
     return render(request, 'property/dashboard.html', context)
 
@@ -62,7 +37,7 @@ from .models import OtpToken
 from django.contrib import messages
 from django.contrib.auth import get_user_model
 from django.utils import timezone
-from django.core.mail import send_mail
+from outbox.models import OutboxEmail
 from django.contrib.auth import authenticate, login, logout
 
 
@@ -138,13 +113,12 @@ def resend_otp(request):
             receiver = [user.email, ]
         
         
-            # send email
-            send_mail(
+            # queue email; the send_outbox worker delivers it
+            OutboxEmail.objects.queue(
                     subject,
                     message,
-                    sender,
                     receiver,
-                    fail_silently=False,
+                    from_email=sender,
                 )
             
             messages.success(request, "A new OTP has been sent to your email-address")
@@ -241,102 +215,63 @@ def property_change_password(request):
 
 from django.db.models import Q
 
-from booking.models import BookingProperty
-from resedence.models import ResidenceProperty
-from carrental.models import CarRental
+from booking.forms import AvailabilityForm
+from core.pagination import paginate_keyset
+from listings.models import ListingIndex
 
 
 def global_search(request):
     region = request.GET.get("region", "").strip()
     property_type = request.GET.get("property_type", "").strip()
 
-    booking_results = BookingProperty.objects.none()
-    residence_results = ResidenceProperty.objects.none()
-    car_results = CarRental.objects.none()
-
     # ----------------------------
-    # Booking properties search
+    # One query over the cross-vertical listing index
     # ----------------------------
+    results = ListingIndex.objects.none()
     if region:
-        booking_results = BookingProperty.objects.filter(
-            Q(region__iexact=region)
+        results = ListingIndex.objects.filter(
+            region__iexact=region,
+            is_active=True,
+            vertical__in=["booking", "residence"],
         )
 
         if property_type:
-            booking_results = booking_results.filter(
-                property_type__iexact=property_type
-            )
+            results = results.filter(listing_type__iexact=property_type)
 
-    # ----------------------------
-    # Residence properties search
-    # ----------------------------
-    if region:
-        residence_results = ResidenceProperty.objects.filter(
-            Q(region__iexact=region),
-            status="open"
-        )
-
-        if property_type:
-            residence_results = residence_results.filter(
-                property_type__iexact=property_type
-            )
-
-    # ----------------------------
-    # OPTIONAL: Car search (disabled unless you want it)
-    # ----------------------------
-    # if region:
-    #     car_results = CarRental.objects.filter(
-    #         available_region__iexact=region
-    #     )
+    # With dates picked, booking listings must have a room free for the stay;
+    # residences are monthly rentals and are not affected
+    availability = AvailabilityForm(request.GET)
+    if availability.is_valid() and availability.cleaned_data.get("check_in"):
+        free = availability.filter(BookingProperty.objects.all()).values("pk")
+        results = results.filter(~Q(vertical="booking") | Q(listing_id__in=free))
 
     context = {
         "region": region,
         "property_type": property_type,
-        "booking_results": booking_results,
-        "residence_results": residence_results,
-        "car_results": car_results,
+        "availability": availability,
+        "results": paginate_keyset(request, results),
     }
 
     return render(request, "customer/search_results.html", context)
 
 
-
-
-
-from django.db.models import Q
-from booking.models import BookingProperty
-from carrental.models import CarRental
-from resedence.models import ResidenceProperty
-
 def city_search(request, city):
     city = city.strip()  # remove extra spaces if any
 
-    # Query Booking Properties
-    booking_results = BookingProperty.objects.filter(
-        Q(district__icontains=city) |
-        Q(region__icontains=city) |
-        Q(country__icontains=city)
-    )
-
-    # Query Residence Properties
-    residence_results = ResidenceProperty.objects.filter(
-        Q(district__icontains=city) |
-        Q(region__icontains=city) |
-        Q(country__icontains=city),
-        status="open"
-    )
-
-    # Query Car Rentals
-    car_results = CarRental.objects.filter(
-        Q(car_name__icontains=city) |
-        Q(car_description__icontains=city)
+    # Partial, case-insensitive match on the location columns; cars have no
+    # location, so they match on their name and description
+    results = ListingIndex.objects.filter(
+        Q(region__icontains=city)
+        | Q(district__icontains=city)
+        | Q(country__icontains=city)
+        | Q(vertical="car") & (Q(name__icontains=city) | Q(description__icontains=city)),
+        is_active=True,
     )
 
     context = {
         "property_type": city,  # for template header
-        "booking_results": booking_results,
-        "residence_results": residence_results,
-        "car_results": car_results,
+        "city": city,
+        "results": paginate_keyset(request, results),
     }
 
     return render(request, "customer/city_results.html", context)
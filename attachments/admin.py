@@ -1,5 +1,6 @@
 from django.contrib import admin
 from django.utils.html import format_html
+from listings.models import refresh_owner_verified
 from .models import Attachment
 
 
@@ -76,11 +77,15 @@ class AttachmentAdmin(admin.ModelAdmin):
 
     # ✅ Actions
     def mark_verified(self, request, queryset):
+        user_ids = list(queryset.values_list("user_id", flat=True).distinct())
         queryset.update(is_verified=True)
+        refresh_owner_verified(user_ids)
 
     mark_verified.short_description = "Mark selected attachments as VERIFIED"
 
     def mark_unverified(self, request, queryset):
+        user_ids = list(queryset.values_list("user_id", flat=True).distinct())
         queryset.update(is_verified=False)
+        refresh_owner_verified(user_ids)
 
     mark_unverified.short_description = "Mark selected attachments as UNVERIFIED"
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.8 on 2026-10-18 17:06
+
+import os
+
+import core.storage
+from django.conf import settings
+from django.db import migrations, models
+
+
+def move_documents(apps, source, target):
+    Attachment = apps.get_model("attachments", "Attachment")
+    for name in Attachment.objects.exclude(document="").values_list("document", flat=True).iterator():
+        old_path, new_path = os.path.join(source, name), os.path.join(target, name)
+        if os.path.isfile(old_path) and not os.path.exists(new_path):
+            os.makedirs(os.path.dirname(new_path), exist_ok=True)
+            os.replace(old_path, new_path)
+
+
+def protect_documents(apps, schema_editor):
+    # Out of the public media tree, so the front server no longer serves them
+    move_documents(apps, settings.MEDIA_ROOT, settings.PROTECTED_MEDIA_ROOT)
+
+
+def unprotect_documents(apps, schema_editor):
+    move_documents(apps, settings.PROTECTED_MEDIA_ROOT, settings.MEDIA_ROOT)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attachments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='attachment',
+            name='document',
+            field=models.ImageField(storage=core.storage.ProtectedStorage(), upload_to='attachments/images/'),
+        ),
+        migrations.RunPython(protect_documents, unprotect_documents),
+    ]
@@ -2,6 +2,8 @@ from django.conf import settings
 from django.db import models
 from django.core.exceptions import ValidationError
 
+from core.storage import protected_storage
+
 
 class Attachment(models.Model):
 
@@ -30,9 +32,10 @@ class Attachment(models.Model):
         null=True
     )
 
-    # Image only (NOT file)
+    # Image only (NOT file); private, served by views.attachment_file
     document = models.ImageField(
-        upload_to='attachments/images/'
+        upload_to='attachments/images/',
+        storage=protected_storage
     )
 
     is_verified = models.BooleanField(
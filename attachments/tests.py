@@ -1,3 +1,60 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from io import BytesIO
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from .models import Attachment
+
+
+class AttachmentFileTests(TestCase):
+
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        settings_override = override_settings(PROTECTED_MEDIA_ROOT=root, SENDFILE_BACKEND="")
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        User = get_user_model()
+        self.owner = User.objects.create_user(username="owner", email="owner@example.com", password="pass12345")
+        buffer = BytesIO()
+        Image.new("RGB", (60, 40), "white").save(buffer, "JPEG")
+        self.attachment = Attachment.objects.create(
+            user=self.owner, attachment_type="passport",
+            document=SimpleUploadedFile("passport.jpg", buffer.getvalue()),
+        )
+        self.url = self.attachment.document.url
+
+    def test_only_owner_and_staff_can_fetch_the_document(self):
+        self.assertTrue(self.url.startswith("/attachments/files/attachments/images/"))
+        self.assertEqual(self.client.get(self.url).status_code, 302)  # to login
+
+        self.client.force_login(self.owner)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Cache-Control"], "private, no-store")
+
+        stranger = get_user_model().objects.create_user(username="x", email="x@example.com", password="pass12345")
+        self.client.force_login(stranger)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+        stranger.is_staff = True
+        stranger.save()
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    def test_front_server_sends_the_bytes(self):
+        self.client.force_login(self.owner)
+        name = self.attachment.document.name
+
+        with override_settings(SENDFILE_BACKEND="x-accel-redirect"):
+            response = self.client.get(self.url)
+        self.assertEqual(response["X-Accel-Redirect"], f"/_protected/{name}")
+        self.assertEqual(response.content, b"")
+
+        with override_settings(SENDFILE_BACKEND="x-sendfile"):
+            response = self.client.get(self.url)
+        self.assertEqual(response["X-Sendfile"], self.attachment.document.path)
@@ -4,4 +4,5 @@ from . import views
 urlpatterns = [
     path('attachments/', views.add_attachment, name='add_attachment'),
     path('owner-categories/', views.service, name='services-category'),
+    path('files/<path:name>', views.attachment_file, name='attachment_file'),
 ]
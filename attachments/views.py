@@ -1,8 +1,11 @@
 
 
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
+from django.http import Http404
 from django.shortcuts import redirect, render
 from django.contrib import messages
+from core.streaming import sendfile_response
 from .models import Attachment
 from .forms import AttachmentForm
 
@@ -35,3 +38,19 @@ def add_attachment(request):
 @login_required
 def service(request):
     return render(request, 'customer/services.html')
+
+
+
+@login_required
+def attachment_file(request, name):
+    """
+    An identity document, for its owner and staff only. Anyone else gets a
+    404, so document names cannot be probed.
+    """
+    attachment = Attachment.objects.filter(document=name).only("user_id").first()
+    if attachment is None or not (attachment.user_id == request.user.pk or request.user.is_staff):
+        raise Http404("No such document")
+    return sendfile_response(
+        request, settings.PROTECTED_MEDIA_ROOT, name,
+        headers={"Cache-Control": "private, no-store", "X-Content-Type-Options": "nosniff"},
+    )
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.utils.html import format_html
 from .models import (
     BookingProperty,
     BookingPropertySetup,
@@ -18,9 +19,9 @@ class BookingPropertyPhotoInline(admin.TabularInline):
     
     def image_preview(self, obj):
         if obj.image:
-            return f'<img src="{obj.image.url}" width="100" style="border-radius:5px;" />'
+            # Small rendition instead of the full-size upload
+            return format_html('<img src="{}" width="100" style="border-radius:5px;" />', obj.preview_url)
         return "-"
-    image_preview.allow_tags = True
     image_preview.short_description = 'Preview'
 
 
@@ -149,9 +150,10 @@ class BookingPropertyAdmin(admin.ModelAdmin):
     
 
 
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.utils.html import format_html
 from .models import Booking
+from .transitions import transition_bookings
 
 
 from django.contrib import admin
@@ -279,12 +281,24 @@ class BookingAdmin(admin.ModelAdmin):
 
     @admin.action(description="✅ Mark selected bookings as CONFIRMED")
     def mark_confirmed(self, request, queryset):
-        queryset.update(status="confirmed")
+        self.change_status(request, queryset, "confirmed")
 
     @admin.action(description="❌ Mark selected bookings as CANCELLED")
     def mark_cancelled(self, request, queryset):
-        queryset.update(status="cancelled")
+        self.change_status(request, queryset, "cancelled")
 
     @admin.action(description="🏁 Mark selected bookings as COMPLETED")
     def mark_completed(self, request, queryset):
-        queryset.update(status="completed")
+        self.change_status(request, queryset, "completed")
+
+    def change_status(self, request, queryset, status):
+        # Through the state machine, so rooms, stats and guest emails follow
+        result = transition_bookings(queryset.values_list("pk", flat=True), status)
+        self.message_user(request, f"{len(result.applied)} booking(s) marked {status}.", messages.SUCCESS)
+        if result.rejected:
+            self.message_user(
+                request,
+                f"{len(result.rejected)} booking(s) skipped: "
+                + "; ".join(f"#{pk} {reason}" for pk, reason in result.rejected.items()),
+                messages.WARNING,
+            )
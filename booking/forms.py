@@ -1,3 +1,5 @@
+import uuid
+
 from django import forms
 from .models import (
     BookingProperty,
@@ -230,10 +232,17 @@ class BookingForm(forms.Form):
     )
     guests = forms.IntegerField(min_value=1)
 
+    # Issued with the form; a resubmitted POST carries the same key and is
+    # answered with the booking it already created
+    idempotency_key = forms.UUIDField(widget=forms.HiddenInput, required=False)
+
     def __init__(self, *args, **kwargs):
         self.property_obj = kwargs.pop("property", None)
         super().__init__(*args, **kwargs)
 
+        if not self.is_bound:
+            self.initial.setdefault("idempotency_key", uuid.uuid4())
+
         if self.property_obj:
             setup = getattr(self.property_obj, "bookingpropertysetup", None)
             if setup and setup.room_types:
@@ -248,3 +257,96 @@ class BookingForm(forms.Form):
             )
 
         return cleaned_data
+
+
+# ------------------------------------------------------------------
+# AVAILABILITY SEARCH (check-in / check-out / guests on listing pages)
+# ------------------------------------------------------------------
+class AvailabilityForm(forms.Form):
+    check_in = forms.DateField(
+        required=False,
+        widget=forms.DateInput(attrs={"type": "date"})
+    )
+    check_out = forms.DateField(
+        required=False,
+        widget=forms.DateInput(attrs={"type": "date"})
+    )
+    guests = forms.IntegerField(min_value=1, required=False)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        check_in = cleaned_data.get("check_in")
+        check_out = cleaned_data.get("check_out")
+
+        if bool(check_in) != bool(check_out):
+            raise forms.ValidationError("Pick both a check-in and a check-out date.")
+        if check_in and check_out <= check_in:
+            raise forms.ValidationError("Check-out must be after check-in.")
+
+        return cleaned_data
+
+    def filter(self, properties):
+        """Narrow a BookingProperty queryset to those free for the requested stay."""
+        if not self.is_valid() or not self.cleaned_data.get("check_in"):
+            return properties
+        return properties.available(
+            self.cleaned_data["check_in"],
+            self.cleaned_data["check_out"],
+            self.cleaned_data.get("guests") or 1,
+        )
+
+
+# ------------------------------------------------------------------
+# OWNER BOOKINGS INBOX FILTERS (status / property / stay dates)
+# ------------------------------------------------------------------
+class OwnerBookingFilterForm(forms.Form):
+    status = forms.ChoiceField(
+        choices=[("", "All")] + list(Booking.STATUS_CHOICES),
+        required=False,
+    )
+    property = forms.ModelChoiceField(
+        queryset=BookingProperty.objects.none(),
+        required=False,
+        empty_label="All properties",
+    )
+    date_from = forms.DateField(
+        required=False,
+        widget=forms.DateInput(attrs={"type": "date"})
+    )
+    date_to = forms.DateField(
+        required=False,
+        widget=forms.DateInput(attrs={"type": "date"})
+    )
+
+    def __init__(self, *args, owner, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["property"].queryset = BookingProperty.objects.filter(owner=owner).order_by("property_name")
+        bootstrap_fields(self.fields)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        date_from = cleaned_data.get("date_from")
+        date_to = cleaned_data.get("date_to")
+        if date_from and date_to and date_to < date_from:
+            raise forms.ValidationError("The end date must not be before the start date.")
+        return cleaned_data
+
+    def filter(self, bookings):
+        """
+        Narrow a Booking queryset by property and by stays overlapping the
+        date range. The status filter is left to the caller, so the status
+        counts can cover every status.
+        """
+        if not self.is_valid():
+            return bookings
+        if self.cleaned_data.get("property"):
+            bookings = bookings.filter(property=self.cleaned_data["property"])
+        if self.cleaned_data.get("date_from"):
+            bookings = bookings.filter(check_out__gt=self.cleaned_data["date_from"])
+        if self.cleaned_data.get("date_to"):
+            bookings = bookings.filter(check_in__lte=self.cleaned_data["date_to"])
+        return bookings
+
+    def selected_status(self):
+        return self.cleaned_data.get("status", "") if self.is_valid() else ""
+
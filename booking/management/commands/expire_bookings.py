@@ -0,0 +1,50 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from booking.transitions import EXPIRY_BATCH_SIZE, ExpirySummaries, expire_pending_bookings
+
+
+class Command(BaseCommand):
+    help = (
+        "Cancel bookings left pending longer than BOOKING_PENDING_EXPIRY_HOURS, releasing their rooms "
+        "and emailing each owner one summary per sweep."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-age", type=float, default=None,
+            help="Hours a booking may stay pending (default: BOOKING_PENDING_EXPIRY_HOURS).",
+        )
+        parser.add_argument("--batch-size", type=int, default=EXPIRY_BATCH_SIZE)
+        parser.add_argument(
+            "--loop", action="store_true",
+            help="Keep running and sweep again every --interval seconds instead of exiting.",
+        )
+        parser.add_argument("--interval", type=float, default=300.0, help="Seconds to wait between sweeps with --loop.")
+
+    def handle(self, *args, **options):
+        max_age = options["max_age"]
+        if max_age is None:
+            max_age = settings.BOOKING_PENDING_EXPIRY_HOURS
+        total = 0
+        while True:
+            cutoff = timezone.now() - timedelta(hours=max_age)
+            summaries, skipped = ExpirySummaries(), set()
+            while True:
+                result = expire_pending_bookings(cutoff, summaries, options["batch_size"], skip=skipped)
+                if result is None:
+                    break
+                # Rejected rows may still be pending; step past them rather than stop
+                skipped.update(result.rejected)
+                total += len(result.applied)
+                if options["verbosity"] >= 2:
+                    self.stdout.write(f"Expired {len(result.applied)} booking(s).")
+            summaries.release()
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+        self.stdout.write(self.style.SUCCESS(f"Expired {total} pending booking(s)."))
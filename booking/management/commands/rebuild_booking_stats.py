@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from booking.models import DailyPropertyStats, OwnerStats
+
+
+class Command(BaseCommand):
+    help = "Recount the DailyPropertyStats and OwnerStats rollups from the bookings table."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            DailyPropertyStats.objects.rebuild()
+            OwnerStats.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Booking stats rebuilt: {DailyPropertyStats.objects.count()} property day(s), "
+            f"{OwnerStats.objects.count()} owner(s)."
+        ))
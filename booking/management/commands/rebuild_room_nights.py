@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Min
+
+from booking.models import Booking, RoomNight
+
+
+class Command(BaseCommand):
+    help = "Recount the per-night RoomNight ledger from the bookings table."
+
+    def handle(self, *args, **options):
+        RoomNight.objects.all().delete()
+        spans = (
+            Booking.objects.filter(status__in=Booking.HOLDING_STATUSES)
+            .values("property_id")
+            .annotate(start=Min("check_in"), end=Max("check_out"))
+            .order_by()
+        )
+        count = 0
+        for span in spans:
+            RoomNight.objects.recount(span["property_id"], span["start"], span["end"])
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"Room ledger rebuilt for {count} property(ies)."))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0004_alter_bookingproperty_region'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bookingproperty',
+            index=models.Index(fields=['created_at', 'id'], name='bookingprop_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+from django.db import migrations
+
+from core.search import create_fulltext_index
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0005_bookingproperty_bookingprop_created_id_idx'),
+    ]
+
+    operations = [
+        create_fulltext_index(
+            'booking_bookingproperty',
+            ['property_name', 'property_description', 'address', 'district', 'region'],
+        ),
+    ]
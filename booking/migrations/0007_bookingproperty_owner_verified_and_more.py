@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:38
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+
+
+def backfill_owner_verified(apps, schema_editor):
+    Attachment = apps.get_model('attachments', 'Attachment')
+    BookingProperty = apps.get_model('booking', 'BookingProperty')
+    BookingProperty.objects.update(
+        owner_verified=Exists(Attachment.objects.filter(user=OuterRef('owner'), is_verified=True))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attachments', '0001_initial'),
+        ('booking', '0006_bookingproperty_fulltext_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bookingproperty',
+            name='owner_verified',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='bookingproperty',
+            index=models.Index(fields=['property_type', 'owner_verified', 'created_at'], name='bookingprop_public_idx'),
+        ),
+        migrations.RunPython(backfill_owner_verified, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:43
+
+import django.db.models.deletion
+from django.conf import settings
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def backfill_room_nights(apps, schema_editor):
+    Booking = apps.get_model('booking', 'Booking')
+    RoomNight = apps.get_model('booking', 'RoomNight')
+    counts = {}
+    bookings = Booking.objects.filter(
+        status__in=['pending', 'confirmed', 'completed']
+    ).values_list('property_id', 'check_in', 'check_out')
+    for property_id, night, check_out in bookings.iterator():
+        while night < check_out:
+            counts[property_id, night] = counts.get((property_id, night), 0) + 1
+            night += timedelta(days=1)
+    RoomNight.objects.bulk_create(
+        (RoomNight(property_id=property_id, night=night, rooms_booked=booked)
+         for (property_id, night), booked in counts.items()),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0007_bookingproperty_owner_verified_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomNight',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('night', models.DateField()),
+                ('rooms_booked', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['property', 'check_out', 'check_in'], name='booking_property_dates_idx'),
+        ),
+        migrations.AddField(
+            model_name='roomnight',
+            name='property',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='room_nights', to='booking.bookingproperty'),
+        ),
+        migrations.AddConstraint(
+            model_name='roomnight',
+            constraint=models.UniqueConstraint(fields=('property', 'night'), name='roomnight_unique_night'),
+        ),
+        migrations.RunPython(backfill_room_nights, migrations.RunPython.noop),
+    ]
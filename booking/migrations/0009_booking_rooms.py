@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0008_roomnight'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='rooms',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0009_booking_rooms'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='idempotency_key',
+            field=models.UUIDField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='booking',
+            constraint=models.UniqueConstraint(fields=('user', 'idempotency_key'), name='booking_unique_idempotency_key'),
+        ),
+    ]
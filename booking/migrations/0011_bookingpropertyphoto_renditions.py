@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0010_booking_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bookingpropertyphoto',
+            name='renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
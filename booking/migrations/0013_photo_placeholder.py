@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 17:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0012_alter_bookingpropertyphoto_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bookingpropertyphoto',
+            name='placeholder',
+            field=models.TextField(blank=True, editable=False),
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 5.2.8 on 2026-10-18 17:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+
+
+TOTAL_FIELDS = ['pending_count', 'confirmed_count', 'cancelled_count', 'completed_count', 'revenue', 'room_nights_sold']
+
+
+def backfill_booking_stats(apps, schema_editor):
+    Booking = apps.get_model('booking', 'Booking')
+    DailyPropertyStats = apps.get_model('booking', 'DailyPropertyStats')
+    OwnerStats = apps.get_model('booking', 'OwnerStats')
+    sold = Q(status__in=['confirmed', 'completed'])
+    days = (
+        Booking.objects.annotate(day=TruncDate('created_at'))
+        .values('property_id', 'day')
+        .annotate(
+            pending_count=Count('pk', filter=Q(status='pending')),
+            confirmed_count=Count('pk', filter=Q(status='confirmed')),
+            cancelled_count=Count('pk', filter=Q(status='cancelled')),
+            completed_count=Count('pk', filter=Q(status='completed')),
+            revenue=Sum('total_price', filter=sold),
+            room_nights_sold=Sum(F('nights') * F('rooms'), filter=sold),
+        )
+        .order_by()
+    )
+    DailyPropertyStats.objects.bulk_create(
+        (DailyPropertyStats(**{**row, 'revenue': row['revenue'] or 0, 'room_nights_sold': row['room_nights_sold'] or 0})
+         for row in days.iterator()),
+        batch_size=500,
+    )
+    owners = (
+        DailyPropertyStats.objects.values(owner_id=F('property__owner'))
+        .annotate(**{field: Sum(field) for field in TOTAL_FIELDS})
+        .order_by()
+    )
+    OwnerStats.objects.bulk_create((OwnerStats(**row) for row in owners.iterator()), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0013_photo_placeholder'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OwnerStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pending_count', models.IntegerField(default=0)),
+                ('confirmed_count', models.IntegerField(default=0)),
+                ('cancelled_count', models.IntegerField(default=0)),
+                ('completed_count', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('room_nights_sold', models.IntegerField(default=0)),
+                ('owner', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='booking_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'Owner stats',
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyPropertyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pending_count', models.IntegerField(default=0)),
+                ('confirmed_count', models.IntegerField(default=0)),
+                ('cancelled_count', models.IntegerField(default=0)),
+                ('completed_count', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('room_nights_sold', models.IntegerField(default=0)),
+                ('day', models.DateField()),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='booking.bookingproperty')),
+            ],
+            options={
+                'verbose_name_plural': 'Daily property stats',
+                'constraints': [models.UniqueConstraint(fields=('property', 'day'), name='dailypropertystats_unique_day')],
+            },
+        ),
+        migrations.RunPython(backfill_booking_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 17:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0014_booking_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['property', 'created_at', 'id'], name='booking_property_created_idx'),
+        ),
+    ]
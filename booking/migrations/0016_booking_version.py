@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 17:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0015_booking_property_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 17:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0016_booking_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['status', 'created_at'], name='booking_status_created_idx'),
+        ),
+    ]
@@ -1,10 +1,62 @@
+from datetime import timedelta
+
 from django.db import models
 from django.conf import settings
 
 from django.db import models
+from django.db.models.functions import Greatest
 from django.conf import settings
+from core.images import RenditionsMixin
+from core.storage import photo_storage
+from core.listings import ListingQuerySet, CoverPhotoMixin, OwnerVerifiedMixin
+
+
+class BookingPropertyQuerySet(ListingQuerySet):
+    listing_related = ("bookingpropertypricing", "bookingpropertysetup")
+    search_fields = ("property_name", "property_description", "address", "district", "region")
+    search_weights = (10.0, 1.0, 2.0, 4.0, 4.0)
+
+    def available(self, check_in, check_out, guests=1):
+        """
+        Properties that can take ``guests`` for every night from ``check_in``
+        up to (not including) ``check_out``.
+
+        The stay has to fit the pricing window and stay limits, and no night
+        in the range may be too full in the RoomNight ledger. That last check
+        is a NOT EXISTS over the ledger's (property, night) index, so it reads
+        at most one row per night and never the bookings themselves. As in
+        ``RoomNightQuerySet.reserve``, a property without a setup row has no
+        room count and is never too full.
+        """
+        nights = (check_out - check_in).days
+        guests_per_room = Greatest("bookingpropertysetup__max_guests_per_room", 1)
+        rooms_needed = (models.Value(guests) + guests_per_room - 1) / guests_per_room
+
+        properties = self.filter(
+            bookingpropertypricing__available_from__lte=check_in,
+            bookingpropertypricing__available_to__gte=check_out - timedelta(days=1),
+            bookingpropertypricing__minimum_stay_nights__lte=nights,
+        ).filter(
+            models.Q(bookingpropertypricing__maximum_stay_nights__isnull=True)
+            | models.Q(bookingpropertypricing__maximum_stay_nights__gte=nights)
+        ).alias(
+            rooms_left_over=models.F("bookingpropertysetup__number_of_rooms") - rooms_needed,
+        ).filter(
+            models.Q(rooms_left_over__gte=0)
+            | ~models.Exists(BookingPropertySetup.objects.filter(property=models.OuterRef("pk")))
+        )
 
-class BookingProperty(models.Model):
+        # Without a setup row rooms_left_over is NULL, so no night compares as too full
+        too_full = RoomNight.objects.filter(
+            property=models.OuterRef("pk"),
+            night__gte=check_in,
+            night__lt=check_out,
+            rooms_booked__gt=models.OuterRef("rooms_left_over"),
+        )
+        return properties.filter(~models.Exists(too_full))
+
+
+class BookingProperty(OwnerVerifiedMixin, CoverPhotoMixin, models.Model):
     TANZANIA_REGIONS = [
     ('Arusha', 'Arusha'),
     ('Dar es Salaam', 'Dar es Salaam'),
@@ -61,8 +113,11 @@ class BookingProperty(models.Model):
     phone_number = models.CharField(max_length=20, blank=True, null=True)
     property_size_sqm = models.PositiveIntegerField(blank=True, null=True)  
     languages_spoken = models.JSONField(default=list, blank=True)  # e.g., ["English", "French"]
+    owner_verified = models.BooleanField(default=False, editable=False)  # owner has a verified attachment
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    objects = BookingPropertyQuerySet.as_manager()
     
     def __str__(self):
         return self.property_name
@@ -70,6 +125,11 @@ class BookingProperty(models.Model):
     class Meta:
         verbose_name = "BookingProperty"
         verbose_name_plural = "Booking Properties"
+        indexes = [
+            # Keyset pagination on the public listing pages
+            models.Index(fields=["created_at", "id"], name="bookingprop_created_id_idx"),
+            models.Index(fields=["property_type", "owner_verified", "created_at"], name="bookingprop_public_idx"),
+        ]
 
 
 # Step 2: Property Setup
@@ -92,9 +152,11 @@ class BookingPropertySetup(models.Model):
             self.total_beds = self.number_of_rooms * self.beds_per_room
         super().save(*args, **kwargs)
 
-class BookingPropertyPhoto(models.Model):
+class BookingPropertyPhoto(RenditionsMixin, models.Model):
     property = models.ForeignKey(BookingProperty, on_delete=models.CASCADE, related_name='photos')
-    image = models.ImageField(upload_to='booking_property_photos/')
+    image = models.ImageField(upload_to='booking_property_photos/', storage=photo_storage)  # stored once per distinct file
+    renditions = models.JSONField(default=dict, blank=True, editable=False)  # size -> resized copy, see core.images
+    placeholder = models.TextField(blank=True, editable=False)  # tiny data URI shown while loading
     
 
 class BookingPropertyPricing(models.Model):
@@ -117,11 +179,30 @@ class BookingPropertyLegal(models.Model):
     pet_policy = models.TextField(blank=True, null=True)
 
 
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, models, transaction
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
 from django.conf import settings
 from .models import BookingProperty
 
 
+class RoomsUnavailable(Exception):
+    """A booking needs more rooms on some night than the property has left."""
+
+
+class BookingQuerySet(models.QuerySet):
+
+    def for_owner(self, owner):
+        return self.filter(property__owner=owner)
+
+    def status_counts(self):
+        """``{status: count}`` for every status, zeros included, from one grouped query."""
+        counts = dict.fromkeys((status for status, _ in Booking.STATUS_CHOICES), 0)
+        counts.update(self.order_by().values_list("status").annotate(total=models.Count("pk")))
+        return counts
+
+
 class Booking(models.Model):
 
     STATUS_CHOICES = (
@@ -131,6 +212,22 @@ class Booking(models.Model):
         ('completed', 'Completed'),
     )
 
+    # Statuses that keep a room taken for the booked nights
+    HOLDING_STATUSES = ('pending', 'confirmed', 'completed')
+
+    # Statuses whose price counts as revenue and whose rooms count as sold
+    REVENUE_STATUSES = ('confirmed', 'completed')
+
+    # Status changes owners and staff can make (see booking.transitions).
+    # None of them takes rooms, so they cannot fail on a full night; a
+    # cancelled or completed booking is final.
+    TRANSITIONS = {
+        'pending': ('confirmed', 'cancelled'),
+        'confirmed': ('completed', 'cancelled'),
+        'cancelled': (),
+        'completed': (),
+    }
+
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     property = models.ForeignKey(BookingProperty, on_delete=models.CASCADE)
 
@@ -139,6 +236,7 @@ class Booking(models.Model):
     check_in = models.DateField()
     check_out = models.DateField()
     guests = models.PositiveIntegerField(default=1)
+    rooms = models.PositiveIntegerField(default=1)
 
     nights = models.PositiveIntegerField(default=1)
     price_per_night = models.DecimalField(max_digits=10, decimal_places=2)
@@ -150,8 +248,17 @@ class Booking(models.Model):
         default='pending'
     )
 
+    # Key sent with the booking form, so a retried submission finds this booking
+    idempotency_key = models.UUIDField(blank=True, null=True, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Bumped by every save and status transition; bulk transitions only
+    # apply to rows still at the version the owner saw
+    version = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = BookingQuerySet.as_manager()
+
     def __str__(self):
             # Handle cases where first_name/last_name might be blank
             full_name = f"{self.user.first_name} {self.user.last_name}".strip()
@@ -159,3 +266,385 @@ class Booking(models.Model):
                 full_name = self.user.email  # fallback
             return f"{full_name} booked {self.property.property_name}"
 
+    class Meta:
+        indexes = [
+            # Overlap lookups: bookings of one property that end after a given day
+            models.Index(fields=["property", "check_out", "check_in"], name="booking_property_dates_idx"),
+            # Owner inbox: newest bookings of a property first, keyset paginated
+            models.Index(fields=["property", "created_at", "id"], name="booking_property_created_idx"),
+            # Expiry sweep: oldest pending bookings first
+            models.Index(fields=["status", "created_at"], name="booking_status_created_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["user", "idempotency_key"], name="booking_unique_idempotency_key"),
+        ]
+
+    def can_move_to(self, status):
+        return status in self.TRANSITIONS.get(self.status, ())
+
+    def room_hold(self):
+        """``(property_id, check_in, check_out, rooms)`` this booking takes in the ledger, or ``None``."""
+        if self.status not in self.HOLDING_STATUSES:
+            return None
+        return (self.property_id, self.check_in, self.check_out, self.rooms)
+
+    def stats_deltas(self):
+        """What this booking adds to the rollup rows of its property and owner."""
+        sold = self.status in self.REVENUE_STATUSES
+        return {
+            f"{self.status}_count": 1,
+            "revenue": self.total_price if sold else 0,
+            "room_nights_sold": self.nights * self.rooms if sold else 0,
+        }
+
+    def saved_version(self):
+        """The stored row of this booking, locked until the transaction ends; ``None`` if unsaved."""
+        if not self.pk:
+            return None
+        return Booking.objects.select_for_update().filter(pk=self.pk).first()
+
+    def move_rooms(self, old):
+        """
+        Release the rooms held by ``old``, the saved version of this booking,
+        and take the ones the current values need. Must run inside a
+        transaction, with ``old`` locked so concurrent status changes apply
+        one at a time.
+        """
+        old_hold = old.room_hold() if old else None
+        new_hold = self.room_hold()
+        if old_hold == new_hold:
+            return
+        if old_hold:
+            RoomNight.objects.release(*old_hold)
+        if new_hold:
+            RoomNight.objects.reserve(*new_hold)
+
+    def clean(self):
+        if not (self.property_id and self.check_in and self.check_out):
+            return
+        if self.check_out <= self.check_in:
+            raise ValidationError("Check-out must be after check-in.")
+        # Dry run of the ledger move, always rolled back
+        try:
+            with transaction.atomic():
+                self.move_rooms(self.saved_version())
+                transaction.set_rollback(True)
+        except RoomsUnavailable as exc:
+            raise ValidationError(str(exc))
+
+    def save(self, *args, **kwargs):
+        """
+        Save the booking and update the RoomNight ledger and the stats
+        rollups in one transaction.
+
+        Raises RoomsUnavailable, and saves nothing, when a night the booking
+        now needs is already full. This covers new bookings, status changes
+        (cancelling frees the rooms, re-confirming takes them again) and
+        date changes.
+        """
+        with transaction.atomic():
+            old = self.saved_version()
+            self.move_rooms(old)
+            if old:
+                self.version = old.version + 1
+            super().save(*args, **kwargs)
+            move_booking_stats([(old, self)])
+
+
+# ---------------------------------------------------
+# Per-night room ledger
+# ---------------------------------------------------
+class RoomNightQuerySet(models.QuerySet):
+
+    def reserve(self, property_id, check_in, check_out, rooms=1):
+        """
+        Take ``rooms`` on every night from ``check_in`` up to ``check_out``.
+
+        Each night is a single conditional UPDATE that only succeeds while
+        enough rooms are left, so two requests can never both take the last
+        room. If any night is full, nothing is taken and RoomsUnavailable
+        is raised. A property without a setup row has no room count, so
+        its nights are never full (as before the ledger).
+        """
+        nights = [check_in + timedelta(days=i) for i in range((check_out - check_in).days)]
+        if not nights:
+            raise RoomsUnavailable("Check-out must be after check-in.")
+
+        setup = BookingPropertySetup.objects.filter(property_id=property_id)
+        capacity = models.Subquery(setup.values("number_of_rooms")[:1])
+        with transaction.atomic():
+            self.bulk_create(
+                [RoomNight(property_id=property_id, night=night) for night in nights],
+                ignore_conflicts=True,
+            )
+            taken = self.filter(
+                property_id=property_id,
+                night__gte=check_in,
+                night__lt=check_out,
+            ).filter(
+                models.Q(rooms_booked__lte=capacity - rooms) | ~models.Exists(setup)
+            ).update(rooms_booked=models.F("rooms_booked") + rooms)
+            if taken != len(nights):
+                raise RoomsUnavailable("Sorry, there are not enough rooms left for those dates.")
+
+    def release(self, property_id, check_in, check_out, rooms=1):
+        """Give back ``rooms`` on every night from ``check_in`` up to ``check_out``."""
+        self.filter(
+            property_id=property_id,
+            night__gte=check_in,
+            night__lt=check_out,
+            rooms_booked__gte=rooms,
+        ).update(rooms_booked=models.F("rooms_booked") - rooms)
+
+    def calendar(self, property_obj, start, days=14):
+        """``[(night, rooms_left), ...]`` for ``days`` nights from ``start``, from one range read."""
+        setup = getattr(property_obj, "bookingpropertysetup", None)
+        total = setup.number_of_rooms if setup else 0
+        booked = dict(
+            self.filter(
+                property=property_obj,
+                night__gte=start,
+                night__lt=start + timedelta(days=days),
+            ).values_list("night", "rooms_booked")
+        )
+        nights = [start + timedelta(days=i) for i in range(days)]
+        return [(night, max(total - booked.get(night, 0), 0)) for night in nights]
+
+    def recount(self, property_id, start, end):
+        """
+        Rewrite the ledger for ``property_id`` from ``start`` up to ``end``
+        from the bookings that hold a room on those nights. Used to repair
+        the ledger; normal bookings go through ``reserve``/``release``.
+        """
+        counts = {}
+        bookings = Booking.objects.filter(
+            property_id=property_id,
+            status__in=Booking.HOLDING_STATUSES,
+            check_out__gt=start,
+            check_in__lt=end,
+        ).values_list("check_in", "check_out", "rooms")
+        for check_in, check_out, rooms in bookings:
+            night = max(check_in, start)
+            while night < min(check_out, end):
+                counts[night] = counts.get(night, 0) + rooms
+                night += timedelta(days=1)
+
+        with transaction.atomic():
+            self.filter(property_id=property_id, night__gte=start, night__lt=end).delete()
+            self.bulk_create(
+                RoomNight(property_id=property_id, night=night, rooms_booked=booked)
+                for night, booked in sorted(counts.items())
+            )
+
+
+class RoomNight(models.Model):
+    """
+    Number of rooms taken at one property on one night.
+
+    Booking.save() moves rooms in and out of this table in the same
+    transaction as the booking itself. A night gets its row the first time
+    a room is booked on it. Availability search and the property calendar read it by
+    (property, night) instead of scanning bookings.
+    """
+    property = models.ForeignKey(BookingProperty, on_delete=models.CASCADE, related_name='room_nights')
+    night = models.DateField()
+    rooms_booked = models.PositiveIntegerField(default=0)
+
+    objects = RoomNightQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["property", "night"], name="roomnight_unique_night"),
+        ]
+
+    def __str__(self):
+        return f"{self.property_id} {self.night}: {self.rooms_booked}"
+
+
+# ---------------------------------------------------
+# Booking stats rollups
+# ---------------------------------------------------
+# Booking.save() moves each booking's counts between rows with F()
+# increments, so owner dashboards and reports read one row per owner or per
+# property and day instead of aggregating the bookings table.
+class BookingTotals(models.Model):
+    pending_count = models.IntegerField(default=0)
+    confirmed_count = models.IntegerField(default=0)
+    cancelled_count = models.IntegerField(default=0)
+    completed_count = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=18, decimal_places=2, default=0)  # confirmed and completed
+    room_nights_sold = models.IntegerField(default=0)  # rooms x nights of the confirmed and completed bookings
+
+    class Meta:
+        abstract = True
+
+    @property
+    def booking_count(self):
+        return self.pending_count + self.confirmed_count + self.cancelled_count + self.completed_count
+
+
+def booking_totals():
+    """Aggregates of the BookingTotals columns over a Booking queryset."""
+    sold = models.Q(status__in=Booking.REVENUE_STATUSES)
+    totals = {
+        f"{status}_count": models.Count("pk", filter=models.Q(status=status))
+        for status, _ in Booking.STATUS_CHOICES
+    }
+    totals["revenue"] = Coalesce(
+        models.Sum("total_price", filter=sold), models.Value(0), output_field=models.DecimalField()
+    )
+    totals["room_nights_sold"] = Coalesce(
+        models.Sum(models.F("nights") * models.F("rooms"), filter=sold), models.Value(0)
+    )
+    return totals
+
+
+class BookingTotalsQuerySet(models.QuerySet):
+    """
+    Shared F() bookkeeping for the rollup tables. Subclasses define
+    ``key(booking)``: the lookup of the row a booking is counted in, or
+    ``None``.
+    """
+
+    def adjust(self, key, deltas):
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if key is None or not deltas:
+            return
+        increments = {field: models.F(field) + delta for field, delta in deltas.items()}
+        updated = self.filter(**key).update(**increments)
+        if not updated and all(delta > 0 for delta in deltas.values()):
+            try:
+                with transaction.atomic():
+                    self.create(**key, **deltas)
+            except IntegrityError:
+                # Another booking created the row first
+                self.filter(**key).update(**increments)
+        # A missing row with a decrement means the table predates the
+        # booking; rebuild_booking_stats recounts it
+
+    def changes(self, old, new):
+        """``[(key, deltas)]`` moving a booking's counts from the row of ``old`` (its saved version) to the row of ``new``."""
+        old_key, new_key = self.key(old), self.key(new)
+        old_deltas = old.stats_deltas() if old_key else {}
+        new_deltas = new.stats_deltas() if new_key else {}
+        if old_key == new_key:
+            return [(new_key, {
+                field: new_deltas.get(field, 0) - old_deltas.get(field, 0)
+                for field in {*old_deltas, *new_deltas}
+            })]
+        return [(old_key, {field: -delta for field, delta in old_deltas.items()}), (new_key, new_deltas)]
+
+    def move(self, pairs):
+        """
+        Apply the ``changes`` of every ``(old, new)`` pair, summed per row,
+        so a batch of bookings costs one UPDATE per row touched rather than
+        one per booking.
+        """
+        rows = {}
+        for old, new in pairs:
+            for key, deltas in self.changes(old, new):
+                if key is None:
+                    continue
+                row = rows.setdefault(tuple(sorted(key.items())), {})
+                for field, delta in deltas.items():
+                    row[field] = row.get(field, 0) + delta
+        for key, deltas in rows.items():
+            self.adjust(dict(key), deltas)
+
+
+class DailyPropertyStatsQuerySet(BookingTotalsQuerySet):
+
+    def key(self, booking):
+        if booking is None:
+            return None
+        return {"property_id": booking.property_id, "day": timezone.localdate(booking.created_at)}
+
+    def series(self, owner_id, start, end):
+        """``[{day, revenue, room_nights_sold, ...}]`` over all of one owner's properties, ``start`` to ``end`` inclusive."""
+        return list(
+            self.filter(property__owner_id=owner_id, day__gte=start, day__lte=end)
+            .values("day")
+            .annotate(**{field: models.Sum(field) for field in BOOKING_TOTAL_FIELDS})
+            .order_by("day")
+        )
+
+    def rebuild(self):
+        """Recount every (property, day) row from the bookings with one grouped query."""
+        rows = (
+            Booking.objects.annotate(day=TruncDate("created_at"))
+            .values("property_id", "day")
+            .annotate(**booking_totals())
+            .order_by()
+        )
+        with transaction.atomic():
+            self.all().delete()
+            self.bulk_create(DailyPropertyStats(**row) for row in rows.iterator())
+
+
+class OwnerStatsQuerySet(BookingTotalsQuerySet):
+
+    def key(self, booking):
+        if booking is None:
+            return None
+        return {"owner_id": booking.property.owner_id}
+
+    def rebuild(self):
+        """Recount every owner's totals from DailyPropertyStats."""
+        rows = (
+            DailyPropertyStats.objects.values(owner_id=models.F("property__owner"))
+            .annotate(**{field: models.Sum(field) for field in BOOKING_TOTAL_FIELDS})
+            .order_by()
+        )
+        with transaction.atomic():
+            self.all().delete()
+            self.bulk_create(OwnerStats(**row) for row in rows.iterator())
+
+
+class DailyPropertyStats(BookingTotals):
+    """
+    Booking totals of one property for the bookings made on one (local)
+    day: ``room_nights_sold`` is what was sold that day, whatever nights
+    the stays cover. Occupancy per night is the RoomNight ledger.
+    """
+    property = models.ForeignKey(BookingProperty, on_delete=models.CASCADE, related_name='daily_stats')
+    day = models.DateField()
+
+    objects = DailyPropertyStatsQuerySet.as_manager()
+
+    class Meta:
+        verbose_name_plural = "Daily property stats"
+        constraints = [
+            models.UniqueConstraint(fields=["property", "day"], name="dailypropertystats_unique_day"),
+        ]
+
+    def __str__(self):
+        return f"{self.property_id} {self.day}: {self.booking_count} booking(s)"
+
+
+class OwnerStats(BookingTotals):
+    """Booking totals over all of one owner's properties."""
+    owner = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='booking_stats')
+
+    objects = OwnerStatsQuerySet.as_manager()
+
+    class Meta:
+        verbose_name_plural = "Owner stats"
+
+    def __str__(self):
+        return f"{self.owner_id}: {self.booking_count} booking(s)"
+
+
+BOOKING_TOTAL_FIELDS = [field.name for field in BookingTotals._meta.fields if field.name != "id"]
+
+
+def move_booking_stats(pairs):
+    """
+    Move saved bookings between rollup rows, given ``(old, new)`` pairs;
+    ``old`` is ``None`` for a new booking, ``new`` for a deleted one.
+    """
+    pairs = list(pairs)
+    for old, new in pairs:
+        if old is not None and new is not None and old.property_id == new.property_id:
+            old.property = new.property  # same owner, no second lookup
+    DailyPropertyStats.objects.move(pairs)
+    OwnerStats.objects.move(pairs)
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .models import Booking, RoomNight, move_booking_stats
+
+
+@receiver(post_delete, sender=Booking, dispatch_uid="booking_release_rooms")
+def booking_deleted(sender, instance, **kwargs):
+    hold = instance.room_hold()
+    if hold:
+        RoomNight.objects.release(*hold)
+    move_booking_stats([(instance, None)])
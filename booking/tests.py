@@ -1,3 +1,586 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from attachments.models import Attachment
+from outbox.models import OutboxEmail
+from core.listings import LISTING_QUERY_BUDGETS
+from core.pagination import paginate_keyset
+from listings.stats import owner_stats
+from .models import (
+    Booking,
+    RoomsUnavailable,
+    BookingProperty,
+    BookingPropertySetup,
+    BookingPropertyPhoto,
+    BookingPropertyPricing,
+    DailyPropertyStats,
+    OwnerStats,
+    RoomNight,
+)
+from .transitions import EXPIRY_SUMMARY_HOLD, _apply, transition_bookings
+
+
+class BookingPropertiesQueryBudgetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = get_user_model().objects.create_user(
+            username="owner", email="owner@example.com", password="pass12345"
+        )
+        Attachment.objects.create(
+            user=owner, attachment_type="passport",
+            document="attachments/images/id.jpg", is_verified=True,
+        )
+        for i in range(10):
+            prop = BookingProperty.objects.create(
+                owner=owner, property_name=f"Hotel {i}", property_type="hotel",
+                address="Street", district="Ilala", region="Dar es Salaam",
+            )
+            BookingPropertySetup.objects.create(property=prop, number_of_rooms=3)
+            BookingPropertyPricing.objects.create(
+                property=prop, base_price_per_night=50000,
+                available_from=date(2026, 1, 1), available_to=date(2026, 12, 31),
+            )
+            for j in range(3):
+                BookingPropertyPhoto.objects.create(
+                    property=prop, image=f"booking_property_photos/{i}_{j}.jpg"
+                )
+
+    def test_listing_stays_within_query_budget(self):
+        url = reverse("booking_properties", args=["hotel"])
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertContains(response, "Hotel 9")
+        self.assertLessEqual(len(ctx), LISTING_QUERY_BUDGETS["booking_properties"])
+
+    def test_cover_photo_is_first_photo(self):
+        prop = BookingProperty.objects.for_listing().get(property_name="Hotel 0")
+        self.assertEqual(prop.cover_photo.image.name, "booking_property_photos/0_0.jpg")
+
+
+class KeysetPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = get_user_model().objects.create_user(
+            username="owner", email="owner@example.com", password="pass12345"
+        )
+        for i in range(10):
+            BookingProperty.objects.create(
+                owner=owner, property_name=f"Lodge {i}", property_type="lodge",
+                address="Street", district="Arusha", region="Arusha",
+            )
+
+    def get_page(self, url="/"):
+        request = RequestFactory().get(url)
+        return paginate_keyset(request, BookingProperty.objects.all(), per_page=4)
+
+    def test_walks_forward_and_back_without_gaps(self):
+        first = self.get_page()
+        second = self.get_page(first.next_url)
+        third = self.get_page(second.next_url)
+
+        seen = [p.pk for page in (first, second, third) for p in page]
+        expected = list(BookingProperty.objects.order_by("-created_at", "-pk").values_list("pk", flat=True))
+        self.assertEqual(seen, expected)
+        self.assertFalse(first.has_previous)
+        self.assertFalse(third.has_next)
+
+        back = self.get_page(second.previous_url)
+        self.assertEqual([p.pk for p in back], [p.pk for p in first])
+        self.assertFalse(back.has_previous)
+
+    def test_tampered_cursor_falls_back_to_first_page(self):
+        page = self.get_page("/?cursor=not-a-token")
+        self.assertEqual([p.pk for p in page], [p.pk for p in self.get_page()])
+
+
+class KeywordSearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = get_user_model().objects.create_user(
+            username="owner", email="owner@example.com", password="pass12345"
+        )
+        cls.by_name = BookingProperty.objects.create(
+            owner=owner, property_name="Serengeti Lodge", property_type="lodge",
+            address="Street", district="Serengeti", region="Mara",
+        )
+        cls.by_description = BookingProperty.objects.create(
+            owner=owner, property_name="Mara Camp", property_type="lodge",
+            property_description="Two hours from Serengeti park", address="Road",
+            district="Bunda", region="Mara",
+        )
+
+    def test_ranks_name_matches_first(self):
+        results = list(BookingProperty.objects.search("sereng").order_by("-search_score"))
+        self.assertEqual(results, [self.by_name, self.by_description])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.by_name.property_name = "Ngorongoro Lodge"
+        self.by_name.save()
+        self.assertEqual(list(BookingProperty.objects.search("ngorongoro")), [self.by_name])
+
+        self.by_name.delete()
+        self.assertFalse(BookingProperty.objects.search("ngorongoro").exists())
+
+    def test_punctuation_only_keyword_falls_back_to_icontains(self):
+        self.assertFalse(BookingProperty.objects.search('"*').exists())
+
+
+class AvailabilitySearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.guest = get_user_model().objects.create_user(
+            username="guest", email="guest@example.com", password="pass12345"
+        )
+        owner = get_user_model().objects.create_user(
+            username="owner", email="owner@example.com", password="pass12345"
+        )
+        Attachment.objects.create(
+            user=owner, attachment_type="passport",
+            document="attachments/images/id.jpg", is_verified=True,
+        )
+        cls.small = cls.make_property(owner, "Small Lodge", rooms=1)
+        cls.big = cls.make_property(owner, "Big Hotel", rooms=2, guests_per_room=2)
+
+    @staticmethod
+    def make_property(owner, name, rooms, guests_per_room=1):
+        prop = BookingProperty.objects.create(
+            owner=owner, property_name=name, property_type="hotel",
+            address="Street", district="Arusha", region="Arusha",
+        )
+        BookingPropertySetup.objects.create(
+            property=prop, number_of_rooms=rooms, max_guests_per_room=guests_per_room
+        )
+        BookingPropertyPricing.objects.create(
+            property=prop, base_price_per_night=50000,
+            available_from=date(2026, 1, 1), available_to=date(2026, 12, 31),
+        )
+        return prop
+
+    def book(self, prop, check_in, check_out, status="pending"):
+        return Booking.objects.create(
+            user=self.guest, property=prop, room_type="Single",
+            check_in=check_in, check_out=check_out,
+            nights=(check_out - check_in).days,
+            price_per_night=50000, total_price=50000, status=status,
+        )
+
+    def available(self, check_in, check_out, guests=1):
+        return set(
+            BookingProperty.objects.available(check_in, check_out, guests)
+            .values_list("property_name", flat=True)
+        )
+
+    def test_fully_booked_nights_are_excluded(self):
+        self.book(self.small, date(2026, 12, 12), date(2026, 12, 14))
+        self.assertEqual(
+            self.available(date(2026, 12, 13), date(2026, 12, 15)), {"Big Hotel"}
+        )
+        # Check-out day is free again
+        self.assertEqual(
+            self.available(date(2026, 12, 14), date(2026, 12, 15)), {"Small Lodge", "Big Hotel"}
+        )
+
+    def test_ledger_follows_cancellation_and_date_changes(self):
+        booking = self.book(self.small, date(2026, 12, 12), date(2026, 12, 14))
+        booking.check_in, booking.check_out = date(2026, 12, 20), date(2026, 12, 21)
+        booking.save()
+        self.assertIn("Small Lodge", self.available(date(2026, 12, 12), date(2026, 12, 14)))
+        self.assertNotIn("Small Lodge", self.available(date(2026, 12, 20), date(2026, 12, 21)))
+
+        booking.status = "cancelled"
+        booking.save()
+        self.assertFalse(RoomNight.objects.filter(property=self.small, rooms_booked__gt=0).exists())
+
+    def test_guests_and_stay_window(self):
+        # Big Hotel: 2 rooms x 2 guests
+        self.assertEqual(self.available(date(2026, 3, 1), date(2026, 3, 2), guests=4), {"Big Hotel"})
+        self.book(self.big, date(2026, 3, 1), date(2026, 3, 2))
+        self.assertEqual(self.available(date(2026, 3, 1), date(2026, 3, 2), guests=3), set())
+        self.assertEqual(self.available(date(2026, 12, 30), date(2027, 1, 2)), set())
+
+    def test_listing_page_filters_by_dates_within_budget(self):
+        self.book(self.small, date(2026, 12, 12), date(2026, 12, 15))
+        url = reverse("booking_properties", args=["hotel"])
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, {"check_in": "2026-12-12", "check_out": "2026-12-15"})
+        self.assertContains(response, "Big Hotel")
+        self.assertNotContains(response, "Small Lodge")
+        self.assertLessEqual(len(ctx), LISTING_QUERY_BUDGETS["booking_properties"])
+
+    def test_global_search_filters_booking_listings_by_dates(self):
+        self.book(self.small, date(2026, 12, 12), date(2026, 12, 15))
+        response = self.client.get(reverse("global_search"), {
+            "region": "Arusha", "check_in": "2026-12-12", "check_out": "2026-12-15",
+        })
+        self.assertContains(response, "Big Hotel")
+        self.assertNotContains(response, "Small Lodge")
+
+    def test_last_room_cannot_be_taken_twice(self):
+        self.book(self.small, date(2026, 12, 12), date(2026, 12, 14))
+        with self.assertRaises(RoomsUnavailable):
+            self.book(self.small, date(2026, 12, 13), date(2026, 12, 16))
+        # The failed booking left nothing behind
+        self.assertEqual(Booking.objects.filter(property=self.small).count(), 1)
+        later = RoomNight.objects.filter(property=self.small, night__gte=date(2026, 12, 14))
+        self.assertFalse(later.filter(rooms_booked__gt=0).exists())
+
+    def test_property_without_setup_is_not_capped(self):
+        owner = self.small.owner
+        bare = BookingProperty.objects.create(
+            owner=owner, property_name="Bare Camp", property_type="hotel",
+            address="Street", district="Arusha", region="Arusha",
+        )
+        for _ in range(3):
+            self.book(bare, date(2026, 12, 12), date(2026, 12, 13))
+        self.assertEqual(RoomNight.objects.get(property=bare).rooms_booked, 3)
+
+    def test_date_search_agrees_with_the_ledger_without_a_usable_setup(self):
+        owner = self.small.owner
+        bare = BookingProperty.objects.create(
+            owner=owner, property_name="Bare Camp", property_type="hotel",
+            address="Street", district="Arusha", region="Arusha",
+        )
+        BookingPropertyPricing.objects.create(
+            property=bare, base_price_per_night=50000,
+            available_from=date(2026, 1, 1), available_to=date(2026, 12, 31),
+        )
+        self.book(bare, date(2026, 12, 12), date(2026, 12, 13))
+        self.make_property(owner, "Zero Lodge", rooms=1, guests_per_room=0)
+
+        available = self.available(date(2026, 12, 12), date(2026, 12, 13))
+        self.assertIn("Bare Camp", available)
+        # Taken as one guest per room, as the booking form does
+        self.assertIn("Zero Lodge", available)
+        self.assertNotIn("Zero Lodge", self.available(date(2026, 12, 12), date(2026, 12, 13), guests=2))
+
+    def test_cancelled_booking_cannot_be_revived_into_a_full_night(self):
+        first = self.book(self.small, date(2026, 12, 12), date(2026, 12, 13))
+        first.status = "cancelled"
+        first.save()
+        self.book(self.small, date(2026, 12, 12), date(2026, 12, 13))
+
+        first.status = "confirmed"
+        with self.assertRaises(RoomsUnavailable):
+            first.save()
+        first.refresh_from_db()
+        self.assertEqual(first.status, "cancelled")
+
+    def test_book_property_shows_error_when_full(self):
+        BookingPropertySetup.objects.filter(property=self.small).update(room_types=["Single"])
+        self.book(self.small, date(2026, 12, 12), date(2026, 12, 14))
+        self.client.force_login(self.guest)
+        response = self.client.post(reverse("book_property", args=[self.small.pk]), {
+            "room_type": "Single", "check_in": "2026-12-13", "check_out": "2026-12-15", "guests": 1,
+        })
+        self.assertContains(response, "not enough rooms left")
+        self.assertEqual(Booking.objects.filter(property=self.small).count(), 1)
+
+    def test_calendar_shows_rooms_left(self):
+        self.book(self.big, date(2026, 12, 12), date(2026, 12, 13))
+        calendar = RoomNight.objects.calendar(self.big, date(2026, 12, 11), days=3)
+        self.assertEqual(
+            calendar,
+            [(date(2026, 12, 11), 2), (date(2026, 12, 12), 1), (date(2026, 12, 13), 2)],
+        )
+
+    def test_replayed_booking_post_returns_the_original_booking(self):
+        BookingPropertySetup.objects.filter(property=self.big).update(room_types=["Double"])
+        self.client.force_login(self.guest)
+        url = reverse("book_property", args=[self.big.pk])
+        key = self.client.get(url).context["form"].initial["idempotency_key"]
+        data = {
+            "room_type": "Double", "check_in": "2026-12-12", "check_out": "2026-12-13",
+            "guests": 1, "idempotency_key": key,
+        }
+
+        first = self.client.post(url, data)
+        replay = self.client.post(url, data)
+
+        booking = Booking.objects.get(property=self.big)
+        self.assertRedirects(first, reverse("booking_success", args=[booking.pk]))
+        self.assertRedirects(replay, reverse("booking_success", args=[booking.pk]))
+        self.assertEqual(RoomNight.objects.get(property=self.big).rooms_booked, 1)
+
+
+class BookingStatsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.guest = get_user_model().objects.create_user(
+            username="guest", email="guest@example.com", password="pass12345"
+        )
+        cls.owner = get_user_model().objects.create_user(
+            username="owner", email="owner@example.com", password="pass12345"
+        )
+        cls.lodge = AvailabilitySearchTests.make_property(cls.owner, "Lodge", rooms=3)
+        cls.hotel = AvailabilitySearchTests.make_property(cls.owner, "Hotel", rooms=3)
+
+    def book(self, prop, status="pending", rooms=1):
+        return Booking.objects.create(
+            user=self.guest, property=prop, room_type="Single",
+            check_in=date(2026, 12, 12), check_out=date(2026, 12, 14), nights=2, rooms=rooms,
+            price_per_night=50000, total_price=100000 * rooms, status=status,
+        )
+
+    def snapshot(self):
+        days = sorted(
+            DailyPropertyStats.objects.values_list(
+                "property_id", "day", "pending_count", "confirmed_count",
+                "cancelled_count", "completed_count", "revenue", "room_nights_sold",
+            )
+        )
+        owner = OwnerStats.objects.get(owner=self.owner)
+        return days, (owner.booking_count, owner.confirmed_count, owner.revenue, owner.room_nights_sold)
+
+    def test_rollups_follow_status_changes_and_match_rebuild(self):
+        first = self.book(self.lodge)
+        second = self.book(self.hotel, status="confirmed", rooms=2)
+        self.book(self.hotel)
+
+        first.status = "confirmed"
+        first.save()
+        second.status = "cancelled"
+        second.save()
+        self.book(self.lodge, status="completed").delete()
+
+        days, owner = self.snapshot()
+        self.assertEqual(owner, (3, 1, 100000, 2))
+        lodge = DailyPropertyStats.objects.get(property=self.lodge)
+        self.assertEqual((lodge.pending_count, lodge.confirmed_count, lodge.completed_count), (0, 1, 0))
+
+        DailyPropertyStats.objects.rebuild()
+        OwnerStats.objects.rebuild()
+        self.assertEqual(self.snapshot(), (days, owner))
+
+    def test_saving_unchanged_booking_writes_no_stats(self):
+        booking = self.book(self.lodge, status="confirmed")
+        with CaptureQueriesContext(connection) as queries:
+            booking.guests = 2
+            booking.save()
+        self.assertFalse([q for q in queries if "stats" in q["sql"]])
+
+
+class OwnerBookingsInboxTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.guest = get_user_model().objects.create_user(
+            username="guest", email="guest@example.com", password="pass12345"
+        )
+        cls.owner = get_user_model().objects.create_user(
+            username="owner", email="owner@example.com", password="pass12345"
+        )
+        other = get_user_model().objects.create_user(
+            username="other", email="other@example.com", password="pass12345"
+        )
+        cls.lodge = AvailabilitySearchTests.make_property(cls.owner, "Lodge", rooms=20)
+        cls.hotel = AvailabilitySearchTests.make_property(cls.owner, "Hotel", rooms=20)
+        elsewhere = AvailabilitySearchTests.make_property(other, "Elsewhere", rooms=20)
+        for prop, day, status in [
+            (cls.lodge, 1, "pending"), (cls.lodge, 5, "confirmed"), (cls.lodge, 9, "cancelled"),
+            (cls.hotel, 2, "pending"), (cls.hotel, 20, "confirmed"), (elsewhere, 1, "pending"),
+        ]:
+            Booking.objects.create(
+                user=cls.guest, property=prop, room_type="Single",
+                check_in=date(2026, 11, day), check_out=date(2026, 11, day + 2), nights=2,
+                price_per_night=50000, total_price=100000, status=status,
+            )
+
+    def setUp(self):
+        self.client.force_login(self.owner)
+
+    def get(self, **params):
+        return self.client.get(reverse("owner_bookings"), params)
+
+    def test_filters_and_status_counts(self):
+        response = self.get(property=self.lodge.pk)
+        self.assertEqual(len(response.context["bookings"]), 3)
+        counts = {value: count for value, _, count, _ in response.context["status_tabs"]}
+        self.assertEqual(counts, {"": 3, "pending": 1, "confirmed": 1, "cancelled": 1, "completed": 0})
+
+        response = self.get(status="pending", date_from="2026-11-01", date_to="2026-11-10")
+        self.assertEqual(
+            {b.property.property_name for b in response.context["bookings"]}, {"Lodge", "Hotel"}
+        )
+        counts = {value: count for value, _, count, _ in response.context["status_tabs"]}
+        self.assertEqual((counts[""], counts["confirmed"]), (4, 1))
+
+    def test_page_query_count_does_not_grow_with_bookings(self):
+        # session, user, status counts, page; and the property choices in the form
+        with self.assertNumQueries(5):
+            response = self.get()
+        self.assertEqual(len(response.context["bookings"]), 5)
+        self.assertNotContains(response, "Elsewhere")
+
+
+class BookingTransitionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.guest = get_user_model().objects.create_user(
+            username="guest", email="guest@example.com", password="pass12345"
+        )
+        cls.owner = get_user_model().objects.create_user(
+            username="owner", email="owner@example.com", password="pass12345"
+        )
+        cls.other = get_user_model().objects.create_user(
+            username="other", email="other@example.com", password="pass12345"
+        )
+        cls.lodge = AvailabilitySearchTests.make_property(cls.owner, "Lodge", rooms=5)
+        cls.elsewhere = AvailabilitySearchTests.make_property(cls.other, "Elsewhere", rooms=5)
+
+    def book(self, prop, status="pending"):
+        return Booking.objects.create(
+            user=self.guest, property=prop, room_type="Single",
+            check_in=date(2026, 12, 12), check_out=date(2026, 12, 13), nights=1,
+            price_per_night=50000, total_price=50000, status=status,
+        )
+
+    def test_bulk_update_applies_allowed_transitions_only(self):
+        pending = [self.book(self.lodge) for _ in range(3)]
+        completed = self.book(self.lodge, status="completed")
+        foreign = self.book(self.elsewhere)
+        self.client.force_login(self.owner)
+
+        ids = [b.pk for b in pending] + [completed.pk, foreign.pk]
+        self.client.post(reverse("bulk_update_booking_status"), {"status": "cancelled", "booking_id": ids})
+
+        statuses = dict(Booking.objects.values_list("pk", "status"))
+        self.assertEqual([statuses[b.pk] for b in pending], ["cancelled"] * 3)
+        self.assertEqual((statuses[completed.pk], statuses[foreign.pk]), ("completed", "pending"))
+        self.assertEqual(RoomNight.objects.get(property=self.lodge).rooms_booked, 1)
+        self.assertEqual(OwnerStats.objects.get(owner=self.owner).cancelled_count, 3)
+        # One email for the guest, listing all three bookings
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.recipients, ["guest@example.com"])
+        self.assertEqual(email.message.count("Cancelled"), 3)
+
+    def test_stale_version_is_not_applied(self):
+        booking = self.book(self.lodge)
+        seen = booking.version
+        Booking.objects.get(pk=booking.pk).save()  # someone else saves it meanwhile
+
+        result = transition_bookings([booking.pk], "confirmed", owner=self.owner, versions={booking.pk: seen})
+        self.assertEqual(result.applied, [])
+        self.assertIn(booking.pk, result.rejected)
+
+        result = transition_bookings([booking.pk], "confirmed", owner=self.owner)
+        self.assertEqual([b.status for b in result.applied], ["confirmed"])
+        self.assertEqual(Booking.objects.get(pk=booking.pk).version, seen + 2)
+
+    def test_transition_clears_the_owner_dashboard_cache(self):
+        self.addCleanup(cache.clear)
+        booking = self.book(self.lodge)
+        self.assertEqual(owner_stats(self.owner.pk)["booking_totals"]["pending_count"], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            transition_bookings([booking.pk], "confirmed", owner=self.owner)
+
+        totals = owner_stats(self.owner.pk)["booking_totals"]
+        self.assertEqual((totals["pending_count"], totals["confirmed_count"]), (0, 1))
+
+    def test_large_batches_are_applied_in_chunks(self):
+        Booking.objects.bulk_create(
+            Booking(
+                user=self.guest, property=self.lodge, room_type="Single",
+                check_in=date(2026, 12, 12), check_out=date(2026, 12, 13), nights=1,
+                price_per_night=50000, total_price=50000,
+            )
+            for _ in range(1200)
+        )
+        ids = list(Booking.objects.values_list("pk", flat=True))
+
+        result = transition_bookings(ids, "confirmed")
+
+        self.assertEqual((len(result.applied), result.rejected), (1200, {}))
+        self.assertFalse(Booking.objects.filter(status="pending").exists())
+
+    def test_version_guard_skips_rows_changed_after_loading(self):
+        first, second = self.book(self.lodge), self.book(self.lodge)
+        Booking.objects.filter(pk=second.pk).update(version=5)
+
+        applied = _apply([first, second], "confirmed")
+
+        self.assertEqual(applied, [first])
+        self.assertEqual(
+            dict(Booking.objects.values_list("pk", "status")),
+            {first.pk: "confirmed", second.pk: "pending"},
+        )
+
+    def test_expire_bookings_cancels_stale_pending_in_batches(self):
+        stale = [self.book(self.lodge) for _ in range(3)]
+        fresh = self.book(self.lodge)
+        confirmed = self.book(self.lodge, status="confirmed")
+        Booking.objects.filter(pk__in=[b.pk for b in stale] + [confirmed.pk]).update(
+            created_at=timezone.now() - timedelta(hours=72)
+        )
+
+        call_command("expire_bookings", batch_size=2, stdout=StringIO())
+
+        statuses = dict(Booking.objects.values_list("pk", "status"))
+        self.assertEqual([statuses[b.pk] for b in stale], ["cancelled"] * 3)
+        self.assertEqual((statuses[fresh.pk], statuses[confirmed.pk]), ("pending", "confirmed"))
+        self.assertEqual(RoomNight.objects.get(property=self.lodge).rooms_booked, 2)
+        # One email per guest, but a single summary to the owner for the whole sweep
+        owner_emails = OutboxEmail.objects.filter(recipients=["owner@example.com"])
+        self.assertEqual(list(owner_emails.values_list("subject", flat=True)),
+                         ["3 pending booking(s) expired"])
+        self.assertTrue(OutboxEmail.objects.due().filter(recipients=["owner@example.com"]).exists())
+
+    def test_expire_bookings_keeps_the_owner_summary_of_a_sweep_that_dies(self):
+        stale = [self.book(self.lodge) for _ in range(3)]
+        Booking.objects.filter(pk__in=[b.pk for b in stale]).update(
+            created_at=timezone.now() - timedelta(hours=72)
+        )
+        batches = []
+
+        def fail_second_batch(bookings, status):
+            batches.append(bookings)
+            if len(batches) == 2:
+                raise RuntimeError("worker killed")
+            return _apply(bookings, status)
+
+        with mock.patch("booking.transitions._apply", side_effect=fail_second_batch):
+            with self.assertRaises(RuntimeError):
+                call_command("expire_bookings", batch_size=2, stdout=StringIO())
+
+        # The first batch committed with its owner summary, held back until the hold runs out
+        summary = OutboxEmail.objects.get(recipients=["owner@example.com"])
+        self.assertEqual(summary.subject, "2 pending booking(s) expired")
+        self.assertFalse(OutboxEmail.objects.due().filter(pk=summary.pk).exists())
+        self.assertGreater(summary.next_attempt_at, timezone.now() + EXPIRY_SUMMARY_HOLD - timedelta(minutes=1))
+
+    def test_expire_bookings_moves_past_a_batch_it_could_not_apply(self):
+        stale = [self.book(self.lodge) for _ in range(3)]
+        Booking.objects.filter(pk__in=[b.pk for b in stale]).update(
+            created_at=timezone.now() - timedelta(hours=72)
+        )
+        rejected = []
+
+        def reject_first_batch(bookings, status):
+            # The oldest batch was changed by someone else after it was read
+            if not rejected:
+                rejected.extend(bookings)
+                return []
+            return _apply(bookings, status)
+
+        with mock.patch("booking.transitions._apply", side_effect=reject_first_batch):
+            call_command("expire_bookings", batch_size=2, stdout=StringIO())
+
+        statuses = dict(Booking.objects.values_list("pk", "status"))
+        self.assertEqual([statuses[b.pk] for b in stale], ["pending", "pending", "cancelled"])
 
-# Create your tests here.
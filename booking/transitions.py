@@ -0,0 +1,195 @@
+import copy
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from listings.stats import invalidate_owner_stats
+from outbox.models import OutboxEmail
+from .models import Booking, move_booking_stats
+
+
+# ---------------------------------------------------
+# Bulk booking status transitions
+# ---------------------------------------------------
+# Bookings per guarded UPDATE; each adds a level to the OR of (pk, version)
+# pairs, and SQLite rejects expression trees deeper than 1000
+APPLY_CHUNK_SIZE = 200
+
+
+class TransitionResult:
+    """Bookings moved to the new status, and the ids left alone with the reason why."""
+
+    def __init__(self):
+        self.applied = []
+        self.rejected = {}
+
+
+def transition_bookings(ids, status, owner=None, versions=None, emails=None):
+    """Move the bookings ``ids`` to ``status`` in one transaction, guarded on each row's version."""
+    result = TransitionResult()
+    wanted = []
+    for raw in ids:
+        try:
+            wanted.append(int(raw))
+        except (TypeError, ValueError):
+            continue
+    versions = versions or {}
+    emails = emails or status_emails
+
+    bookings = Booking.objects.filter(pk__in=wanted).select_related("user", "property__owner")
+    if owner is not None:
+        bookings = bookings.for_owner(owner)
+    found = {booking.pk: booking for booking in bookings}
+
+    candidates = []
+    for pk in dict.fromkeys(wanted):
+        booking = found.get(pk)
+        if booking is None:
+            result.rejected[pk] = "not found"
+        elif not booking.can_move_to(status):
+            result.rejected[pk] = f"cannot go from {booking.get_status_display()} to {status}"
+        elif versions.get(pk, booking.version) != booking.version:
+            result.rejected[pk] = "changed since the page was loaded"
+        else:
+            candidates.append(booking)
+    if not candidates:
+        return result
+
+    with transaction.atomic():
+        applied = []
+        for start in range(0, len(candidates), APPLY_CHUNK_SIZE):
+            applied += _apply(candidates[start:start + APPLY_CHUNK_SIZE], status)
+        applied_ids = {booking.pk for booking in applied}
+        for booking in candidates:
+            if booking.pk not in applied_ids:
+                result.rejected[booking.pk] = "changed since the page was loaded"
+
+        pairs = []
+        for old in applied:
+            new = copy.copy(old)
+            new.status, new.version = status, old.version + 1
+            new.move_rooms(old)
+            pairs.append((old, new))
+            result.applied.append(new)
+        move_booking_stats(pairs)
+        # A bulk UPDATE sends no post_save, so clear the dashboards here
+        for owner_id in {booking.property.owner_id for booking in result.applied}:
+            invalidate_owner_stats(owner_id)
+        OutboxEmail.objects.queue_many(emails(result.applied))
+    return result
+
+
+def _apply(bookings, status):
+    """The bookings whose row was still at the version read, after moving those to ``status``."""
+    changes = {"status": status, "version": F("version") + 1}
+    with transaction.atomic():
+        guard = reduce(or_, (Q(pk=booking.pk, version=booking.version) for booking in bookings))
+        if Booking.objects.filter(guard).update(**changes) == len(bookings):
+            return bookings
+        transaction.set_rollback(True)
+    return [
+        booking for booking in bookings
+        if Booking.objects.filter(pk=booking.pk, version=booking.version).update(**changes)
+    ]
+
+
+def status_emails(bookings):
+    """``(subject, message, recipients)`` per guest, listing all of that guest's changed bookings."""
+    by_guest = {}
+    for booking in bookings:
+        if booking.user.email:
+            by_guest.setdefault(booking.user.email, []).append(booking)
+    for email, guest_bookings in by_guest.items():
+        lines = [
+            f"ST-B-{booking.pk:04d} at {booking.property.property_name} "
+            f"({booking.check_in:%d %b %Y} - {booking.check_out:%d %b %Y}): {booking.get_status_display()}"
+            for booking in guest_bookings
+        ]
+        yield (
+            "Your booking status has changed",
+            "Hi {},\n\nThe status of your booking(s) has changed:\n\n{}\n".format(
+                guest_bookings[0].user.first_name or guest_bookings[0].user.username, "\n".join(lines)
+            ),
+            [email],
+        )
+
+
+# ---------------------------------------------------
+# Expiring stale pending bookings
+# ---------------------------------------------------
+EXPIRY_BATCH_SIZE = 100
+
+# Owner summaries are written to the outbox with the batch that expired the
+# bookings, but held back this long so the rest of the sweep can add to them.
+# The sweep releases them when it ends; if it dies, they go out after this.
+EXPIRY_SUMMARY_HOLD = timedelta(minutes=15)
+
+
+class ExpirySummaries:
+    """The owner summary emails of one expiry sweep, one OutboxEmail per owner."""
+
+    def __init__(self):
+        self.bookings = {}  # owner email -> bookings in its summary so far
+        self.emails = {}  # owner email -> pk of its held OutboxEmail
+
+    def add(self, bookings):
+        """Add expired ``bookings``; call in the transaction that expired them."""
+        by_owner = {}
+        for booking in bookings:
+            if booking.property.owner.email:
+                by_owner.setdefault(booking.property.owner.email, []).append(booking)
+        for email, owner_bookings in by_owner.items():
+            so_far = self.bookings.get(email, []) + owner_bookings
+            subject, message, recipients = expiry_summary(so_far)
+            held = OutboxEmail.objects.filter(pk=self.emails.get(email), status="pending")
+            if held.update(subject=subject, message=message):
+                self.bookings[email] = so_far
+                continue
+            # First batch for this owner, or the held summary was already sent
+            subject, message, recipients = expiry_summary(owner_bookings)
+            self.bookings[email] = owner_bookings
+            self.emails[email] = OutboxEmail.objects.create(
+                subject=subject, message=message, recipients=recipients,
+                next_attempt_at=timezone.now() + EXPIRY_SUMMARY_HOLD,
+            ).pk
+
+    def release(self):
+        OutboxEmail.objects.filter(pk__in=self.emails.values(), status="pending").update(
+            next_attempt_at=timezone.now()
+        )
+
+
+def expire_pending_bookings(cutoff, summaries, batch_size=EXPIRY_BATCH_SIZE, skip=()):
+    """Cancel the oldest ``batch_size`` bookings pending since before ``cutoff``; None when none are left."""
+    stale = dict(
+        Booking.objects.filter(status="pending", created_at__lt=cutoff)
+        .exclude(pk__in=skip)
+        .order_by("created_at")
+        .values_list("pk", "version")[:batch_size]
+    )
+    if not stale:
+        return None
+    with transaction.atomic():
+        result = transition_bookings(stale, "cancelled", versions=stale)
+        summaries.add(result.applied)
+    return result
+
+
+def expiry_summary(bookings):
+    """``(subject, message, recipients)`` telling one owner their ``bookings`` expired."""
+    owner = bookings[0].property.owner
+    lines = [
+        f"ST-B-{booking.pk:04d} at {booking.property.property_name} "
+        f"({booking.check_in:%d %b %Y} - {booking.check_out:%d %b %Y})"
+        for booking in bookings
+    ]
+    return (
+        f"{len(bookings)} pending booking(s) expired",
+        "Hi {},\n\nThese booking requests were not confirmed in time and have been cancelled, "
+        "so their rooms are free again:\n\n{}\n".format(owner.first_name or owner.username, "\n".join(lines)),
+        [owner.email],
+    )
@@ -15,6 +15,7 @@ urlpatterns = [
      path('owner/bookings/', views.owner_bookings, name='owner_bookings'),
      path('owner/bookings/<int:booking_id>/', views.owner_booking_detail, name='owner_booking_detail'),
      path('booking/<int:pk>/update-status/', views.update_owner_booking_status, name='update_booking_status'),
+     path('owner/bookings/update-status/', views.bulk_update_owner_booking_status, name='bulk_update_booking_status'),
     
     
 ]
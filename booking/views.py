@@ -1,5 +1,6 @@
 from django.shortcuts import render,get_object_or_404
 from django.forms import formset_factory
+from listings.uploads import attach_uploads, kept_uploads
 from .models import BookingProperty, BookingPropertyPhoto
 from .forms import (
     BookingPropertyForm,
@@ -49,6 +50,10 @@ def add_property_all_in_one(request):
                     image=image
                 )
 
+            # Photos sent ahead in chunks by chunked-upload.js
+            attach_uploads(request.user, request.POST.getlist("upload_id"),
+                           BookingPropertyPhoto, property=property_obj)
+
             success = True
 
     else:
@@ -63,6 +68,7 @@ def add_property_all_in_one(request):
         "pricing_form": pricing_form,
         "legal_form": legal_form,
         "success": success,
+        "uploads": kept_uploads(request),
     })
 
 
@@ -108,35 +114,27 @@ def property_delete(request, pk):
 
 
 from django.shortcuts import render
-from django.db.models import Q
+from core.pagination import paginate_keyset
+from listings.facets import listing_facets
+from listings.models import price_bucket_range
+from .forms import AvailabilityForm
 from .models import BookingProperty
 
-TANZANIA_REGIONS = [
-    'Arusha', 'Dar es Salaam', 'Dodoma', 'Geita', 'Iringa', 'Kagera', 'Katavi',
-    'Kigoma', 'Kilimanjaro', 'Lindi', 'Manyara', 'Mara', 'Mbeya', 'Morogoro',
-    'Mtwara', 'Mwanza', 'Njombe', 'Pwani', 'Rukwa', 'Ruvuma', 'Shinyanga',
-    'Simiyu', 'Singida', 'Tabora', 'Tanga', 'Zanzibar North', 'Zanzibar South',
-    'Zanzibar West', 'Zanzibar Central/South', 'Zanzibar Urban/West'
-]
-
 def booking_properties(request, property_type):
 
     # ✅ ONLY show properties whose OWNER has VERIFIED attachment
     properties = BookingProperty.objects.filter(
         property_type=property_type,
-        owner__attachments__is_verified=True
-    ).distinct()
+        owner_verified=True
+    ).for_listing()
 
     keyword = request.GET.get("keyword", "")
     region = request.GET.get("region", "")
     type_filter = request.GET.get("property_type_filter", "")
+    price = request.GET.get("price", "")
 
     if keyword:
-        properties = properties.filter(
-            Q(property_name__icontains=keyword) |
-            Q(property_description__icontains=keyword) |
-            Q(address__icontains=keyword)
-        )
+        properties = properties.search(keyword)
 
     if region:
         properties = properties.filter(region=region)
@@ -144,11 +142,33 @@ def booking_properties(request, property_type):
     if type_filter:
         properties = properties.filter(property_type=type_filter)
 
+    price_range = price_bucket_range("booking", price)
+    if price_range:
+        low, high = price_range
+        properties = properties.filter(bookingpropertypricing__base_price_per_night__gte=low)
+        if high is not None:
+            properties = properties.filter(bookingpropertypricing__base_price_per_night__lt=high)
+
+    # Only properties with a room free for every night of the stay
+    availability = AvailabilityForm(request.GET)
+    properties = availability.filter(properties)
+
+    page = paginate_keyset(request, properties)
+
+    facets = listing_facets(
+        ["booking"],
+        type_choices=BookingProperty.PROPERTY_TYPE_CHOICES,
+        listing_type=type_filter or property_type,
+        region=region,
+        price=price,
+    )
+
     context = {
-        "properties": properties,
+        "properties": page.object_list,
+        "page": page,
         "property_type": property_type.replace("_", " ").title(),
-        "tanzania_regions": TANZANIA_REGIONS,
-        "property_type_choices": BookingProperty.PROPERTY_TYPE_CHOICES
+        "facets": facets,
+        "availability": availability,
     }
 
     return render(request, "customer/booking_property_lists.html", context)
@@ -156,8 +176,10 @@ def booking_properties(request, property_type):
 
 
 
+from datetime import date
+
 from django.shortcuts import render, get_object_or_404
-from .models import BookingProperty
+from .models import BookingProperty, RoomNight
 
 def booking_property_detail(request, pk):
     # Public access – removes owner=request.user
@@ -169,12 +191,16 @@ def booking_property_detail(request, pk):
     legal = getattr(property_obj, 'bookingpropertylegal', None)
     photos = property_obj.photos.all()
 
+    # Rooms left for the next two weeks, from one ledger range read
+    calendar = RoomNight.objects.calendar(property_obj, date.today()) if setup else []
+
     return render(request, "customer/property_detail.html", {
         "property": property_obj,
         "setup": setup,
         "pricing": pricing,
         "legal": legal,
         "photos": photos,
+        "calendar": calendar,
     })
 
 
@@ -183,9 +209,10 @@ def booking_property_detail(request, pk):
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib import messages
+from django.db import IntegrityError
 from datetime import timedelta
 
-from .models import Booking, BookingProperty, BookingPropertyPricing
+from .models import Booking, BookingProperty, BookingPropertyPricing, RoomsUnavailable
 from .forms import BookingForm
 
 
@@ -203,6 +230,13 @@ def book_property(request, pk):
 
     if request.method == "POST" and form.is_valid():
 
+        # A replayed submission gets the booking it already created
+        idempotency_key = form.cleaned_data["idempotency_key"]
+        if idempotency_key:
+            existing = Booking.objects.filter(user=request.user, idempotency_key=idempotency_key).first()
+            if existing:
+                return redirect('booking_success', booking_id=existing.id)
+
         room_type = form.cleaned_data["room_type"]
         guests = form.cleaned_data["guests"]
         check_in = form.cleaned_data["check_in"]
@@ -219,23 +253,38 @@ def book_property(request, pk):
             price_per_night = pricing.base_price_per_night
             total_price = nights * price_per_night
 
-            # Save booking
-            # Save booking and assign to a variable
-            new_booking = Booking.objects.create(
+            # Enough rooms for everyone (rounded up)
+            setup = getattr(property_obj, "bookingpropertysetup", None)
+            guests_per_room = max(setup.max_guests_per_room, 1) if setup else 1
+            rooms = -(-guests // guests_per_room)
+
+            # Save booking and assign to a variable; this takes the rooms in
+            # the RoomNight ledger atomically or fails if a night is full
+            new_booking = Booking(
                 user=request.user,
                 property=property_obj,
                 room_type=room_type,
                 check_in=check_in,
                 check_out=check_out,
                 guests=guests,
+                rooms=rooms,
                 nights=nights,
                 price_per_night=price_per_night,
                 total_price=total_price,
                 status="pending",
+                idempotency_key=idempotency_key,
             )
-
-            messages.success(request, "Booking submitted successfully!")
-            return redirect('booking_success', booking_id=new_booking.id)
+            try:
+                new_booking.save()
+            except IntegrityError:
+                # The same submission raced us and won; show its booking
+                existing = get_object_or_404(Booking, user=request.user, idempotency_key=idempotency_key)
+                return redirect('booking_success', booking_id=existing.id)
+            except RoomsUnavailable as exc:
+                form.add_error(None, str(exc))
+            else:
+                messages.success(request, "Booking submitted successfully!")
+                return redirect('booking_success', booking_id=new_booking.id)
 
 
     return render(
@@ -277,17 +326,45 @@ def my_bookings(request):
 
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render
-from .models import Booking, BookingProperty
+from core.pagination import paginate_keyset
+from .forms import OwnerBookingFilterForm
+from .models import Booking
+
+OWNER_BOOKINGS_PAGE_SIZE = 50
 
 @login_required(login_url='login')
 def owner_bookings(request):
-    # Get all properties owned by this user
-    properties = BookingProperty.objects.filter(owner=request.user)
-
-    # Get all bookings for these properties
-    bookings = Booking.objects.filter(property__in=properties).order_by('-created_at')
+    """
+    Bookings for the owner's properties, newest first, filtered by status,
+    property and stay dates. Each page is one keyset range read with the
+    customer and property joined in; the status tabs come from one grouped
+    count over the other filters.
+    """
+    form = OwnerBookingFilterForm(request.GET, owner=request.user)
+    bookings = form.filter(Booking.objects.for_owner(request.user))
+    status_counts = bookings.status_counts()
+
+    status = form.selected_status()
+    if status:
+        bookings = bookings.filter(status=status)
+    page = paginate_keyset(request, bookings.select_related("user", "property"), per_page=OWNER_BOOKINGS_PAGE_SIZE)
+
+    query = request.GET.copy()
+    query.pop("cursor", None)
+    status_tabs = []
+    for value, label in [("", "All")] + list(Booking.STATUS_CHOICES):
+        query["status"] = value
+        count = status_counts.get(value) if value else sum(status_counts.values())
+        status_tabs.append((value, label, count, "?" + query.urlencode()))
 
-    return render(request, 'property/owner_bookings.html', {'bookings': bookings})
+    context = {
+        'bookings': page.object_list,
+        'page': page,
+        'form': form,
+        'status': status,
+        'status_tabs': status_tabs,
+    }
+    return render(request, 'property/owner_bookings.html', context)
 
 
 
@@ -315,23 +392,53 @@ def owner_booking_detail(request, booking_id):
 
 
 
-from django.shortcuts import get_object_or_404, redirect
+from django.shortcuts import redirect
 from django.contrib import messages
-from .models import Booking
+from django.views.decorators.http import require_POST
+from .transitions import transition_bookings
+
+
+def posted_versions(request, ids):
+    """``{booking id: version}`` from the ``version_<id>`` fields the inbox renders next to each booking."""
+    versions = {}
+    for pk in ids:
+        try:
+            versions[int(pk)] = int(request.POST[f"version_{pk}"])
+        except (KeyError, TypeError, ValueError):
+            continue
+    return versions
+
+
+def change_booking_status(request, ids):
+    status = request.POST.get('status')
+    if status not in dict(Booking.STATUS_CHOICES):
+        messages.error(request, "Invalid status selected.")
+        return
+    result = transition_bookings(ids, status, owner=request.user, versions=posted_versions(request, ids))
+    if result.applied:
+        messages.success(request, f"{len(result.applied)} booking(s) updated to {status.title()}.")
+    if result.rejected:
+        messages.error(request, "Not updated: " + "; ".join(
+            f"ST-B-{pk:04d} ({reason})" for pk, reason in result.rejected.items()
+        ))
+
 
+@login_required(login_url='login')
+@require_POST
 def update_owner_booking_status(request, pk):
-    booking = get_object_or_404(Booking, pk=pk)
-    
-    if request.method == "POST":
-        new_status = request.POST.get('status')
-        if new_status in ['pending', 'confirmed', 'cancelled', 'completed']:
-            booking.status = new_status
-            booking.save()
-            messages.success(request, f"Booking {booking.id} status updated to {new_status.title()}.")
-        else:
-            messages.error(request, "Invalid status selected.")
-    
-    return redirect(request.META.get('HTTP_REFERER', 'bookings_list'))
+    change_booking_status(request, [pk])
+    return redirect(request.META.get('HTTP_REFERER', 'owner_bookings'))
+
+
+@login_required(login_url='login')
+@require_POST
+def bulk_update_owner_booking_status(request):
+    ids = request.POST.getlist('booking_id')
+    if ids:
+        change_booking_status(request, ids)
+    else:
+        messages.error(request, "Select at least one booking.")
+    return redirect(request.META.get('HTTP_REFERER', 'owner_bookings'))
 
 
 
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.utils.html import format_html
 from .models import (
     CarRental,
     CarRentalSetup,
@@ -18,9 +19,9 @@ class CarRentalPhotoInline(admin.TabularInline):
 
     def image_preview(self, obj):
         if obj.image:
-            return f'<img src="{obj.image.url}" width="100" style="border-radius:5px;" />'
+            # Small rendition instead of the full-size upload
+            return format_html('<img src="{}" width="100" style="border-radius:5px;" />', obj.preview_url)
         return "-"
-    image_preview.allow_tags = True
     image_preview.short_description = 'Preview'
 
 # ---------------------------
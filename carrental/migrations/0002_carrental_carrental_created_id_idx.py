@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('carrental', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='carrental',
+            index=models.Index(fields=['created_at', 'id'], name='carrental_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+from django.db import migrations
+
+from core.search import create_fulltext_index
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('carrental', '0002_carrental_carrental_created_id_idx'),
+    ]
+
+    operations = [
+        create_fulltext_index(
+            'carrental_carrental',
+            ['car_name', 'car_description', 'manufacturer', 'registration_number'],
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:52
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('carrental', '0005_carrentalphoto_renditions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='carrentalphoto',
+            name='image',
+            field=models.ImageField(storage=core.storage.ContentAddressedStorage(), upload_to='car_rental_photos/'),
+        ),
+    ]
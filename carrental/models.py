@@ -1,10 +1,20 @@
 from django.db import models
 from django.conf import settings
+from core.images import RenditionsMixin
+from core.storage import photo_storage
+from core.listings import ListingQuerySet, CoverPhotoMixin, OwnerVerifiedMixin
+
+
+class CarRentalQuerySet(ListingQuerySet):
+    listing_related = ("carrentalpricing",)
+    search_fields = ("car_name", "car_description", "manufacturer", "registration_number")
+    search_weights = (10.0, 1.0, 4.0, 4.0)
+
 
 # ---------------------------------------------------
 # Car Rental Main Model
 # ---------------------------------------------------
-class CarRental(models.Model):
+class CarRental(OwnerVerifiedMixin, CoverPhotoMixin, models.Model):
     CAR_TYPE_CHOICES = [
         ('shuffle', 'Shuffles'),
         ('moving_logistic', 'Moving Logistic'),
@@ -30,9 +40,19 @@ class CarRental(models.Model):
     fuel_type = models.CharField(max_length=50, blank=True, null=True)
     mileage_km = models.PositiveIntegerField(blank=True, null=True)
 
+    owner_verified = models.BooleanField(default=False, editable=False)  # owner has a verified attachment
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CarRentalQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Keyset pagination on the public listing pages
+            models.Index(fields=["created_at", "id"], name="carrental_created_id_idx"),
+            models.Index(fields=["car_type", "owner_verified", "created_at"], name="carrental_public_idx"),
+        ]
+
     def __str__(self):
         return f"{self.car_name} ({self.get_car_type_display()})"
 
@@ -56,9 +76,11 @@ class CarRentalSetup(models.Model):
 # ---------------------------------------------------
 # Car Rental Photos
 # ---------------------------------------------------
-class CarRentalPhoto(models.Model):
+class CarRentalPhoto(RenditionsMixin, models.Model):
     car = models.ForeignKey(CarRental, on_delete=models.CASCADE, related_name='photos')
-    image = models.ImageField(upload_to='car_rental_photos/')
+    image = models.ImageField(upload_to='car_rental_photos/', storage=photo_storage)  # stored once per distinct file
+    renditions = models.JSONField(default=dict, blank=True, editable=False)  # size -> resized copy, see core.images
+    placeholder = models.TextField(blank=True, editable=False)  # tiny data URI shown while loading
 
     def __str__(self):
         return f"Photo of {self.car.car_name}"
@@ -1,3 +1,37 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-# Create your tests here.
+from attachments.models import Attachment
+from core.listings import LISTING_QUERY_BUDGETS
+from .models import CarRental, CarRentalPhoto, CarRentalPricing
+
+
+class CarRentalListQueryBudgetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = get_user_model().objects.create_user(
+            username="owner", email="owner@example.com", password="pass12345"
+        )
+        Attachment.objects.create(
+            user=owner, attachment_type="passport",
+            document="attachments/images/id.jpg", is_verified=True,
+        )
+        for i in range(10):
+            car = CarRental.objects.create(
+                owner=owner, car_name=f"Car {i}", car_type="shuffle",
+                registration_number=f"T{i:03d} ABC",
+            )
+            CarRentalPricing.objects.create(car=car, base_price_per_day=80000)
+            for j in range(3):
+                CarRentalPhoto.objects.create(car=car, image=f"car_rental_photos/{i}_{j}.jpg")
+
+    def test_listing_stays_within_query_budget(self):
+        url = reverse("car_rental_list_by_type", args=["shuffle"])
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertContains(response, "Car 9")
+        self.assertLessEqual(len(ctx), LISTING_QUERY_BUDGETS["car_rental_list"])
@@ -1,4 +1,5 @@
 from django.shortcuts import render
+from listings.uploads import attach_uploads, kept_uploads
 from .models import CarRental, CarRentalPhoto
 from .forms import (
     CarRentalForm,
@@ -38,6 +39,9 @@ def add_car_all_in_one(request):
             for image in images:
                 CarRentalPhoto.objects.create(car=car_obj, image=image)
 
+            # Photos sent ahead in chunks by chunked-upload.js
+            attach_uploads(request.user, request.POST.getlist("upload_id"), CarRentalPhoto, car=car_obj)
+
             success = True
         else:
             # Print errors in console
@@ -58,6 +62,7 @@ def add_car_all_in_one(request):
         "pricing_form": pricing_form,
         "legal_form": legal_form,
         "success": success,
+        "uploads": kept_uploads(request),
     })
 
 
@@ -99,38 +104,27 @@ def car_rental_detail(request, pk):
 
 
 from django.shortcuts import render
-from django.db.models import Q
+from core.pagination import paginate_keyset
+from listings.facets import listing_facets
+from listings.models import price_bucket_range
 from .models import CarRental
 
-# List of all Tanzania regions
-TANZANIA_REGIONS = [
-    'Arusha', 'Dar es Salaam', 'Dodoma', 'Geita', 'Iringa', 'Kagera', 'Katavi',
-    'Kigoma', 'Kilimanjaro', 'Lindi', 'Manyara', 'Mara', 'Mbeya', 'Morogoro',
-    'Mtwara', 'Mwanza', 'Njombe', 'Pwani', 'Rukwa', 'Ruvuma', 'Shinyanga',
-    'Simiyu', 'Singida', 'Tabora', 'Tanga', 'Zanzibar North', 'Zanzibar South',
-    'Zanzibar West', 'Zanzibar Central/South', 'Zanzibar Urban/West'
-]
-
 def car_rental_list(request, car_type=None):
     """
     List cars optionally filtered by type, region, or keyword.
     """
     # Base queryset
-    cars = CarRental.objects.filter(owner__attachments__is_verified=True)
+    cars = CarRental.objects.filter(owner_verified=True).for_listing()
 
     # Filters from URL or GET parameters
     keyword = request.GET.get("keyword", "")
     region = request.GET.get("region", "")
     car_type_filter = car_type or request.GET.get("car_type", "")
+    price = request.GET.get("price", "")
 
     # Keyword search
     if keyword:
-        cars = cars.filter(
-            Q(car_name__icontains=keyword) |
-            Q(car_description__icontains=keyword) |
-            Q(manufacturer__icontains=keyword) |
-            Q(registration_number__icontains=keyword)
-        )
+        cars = cars.search(keyword)
 
     # Filter by region (optional)
     if region:
@@ -140,9 +134,24 @@ def car_rental_list(request, car_type=None):
     if car_type_filter:
         cars = cars.filter(car_type=car_type_filter)
 
+    # Price bucket filter
+    price_range = price_bucket_range("car", price)
+    if price_range:
+        low, high = price_range
+        cars = cars.filter(carrentalpricing__base_price_per_day__gte=low)
+        if high is not None:
+            cars = cars.filter(carrentalpricing__base_price_per_day__lt=high)
+
+    page = paginate_keyset(request, cars)
+
+    # Cars have no region yet, so only the price facet is shown
+    facets = listing_facets(["car"], listing_type=car_type_filter, price=price)
+    facets.regions = []
+
     context = {
-        "cars": cars,
-        "tanzania_regions": TANZANIA_REGIONS,
+        "cars": page.object_list,
+        "page": page,
+        "facets": facets,
         "car_type_choices": CarRental.CAR_TYPE_CHOICES,
         "car_type_selected": car_type_filter,
     }
@@ -0,0 +1,204 @@
+import base64
+import os
+from io import BytesIO
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+
+from .storage import photo_storage
+
+
+# ---------------------------------------------------
+# Photo renditions
+# ---------------------------------------------------
+# Bounding boxes (width, height) for the resized copies kept for every
+# listing photo. Images are scaled down to fit and never scaled up.
+RENDITION_SIZES = {
+    "card": (640, 480),        # listing cards and search results
+    "gallery": (1600, 1200),   # detail page main image and lightbox
+    "preview": (200, 150),     # thumbnail strips and admin inlines
+}
+
+RENDITION_QUALITY = 82
+
+# Tiny blurred stand-in inlined into the page while the real image loads
+PLACEHOLDER_SIZE = (16, 16)
+PLACEHOLDER_QUALITY = 50
+
+
+def pillow_supports(feature):
+    try:
+        return features.check(feature)
+    except ValueError:  # feature name unknown to this Pillow version
+        return False
+
+
+# Extra encodings written next to the JPEG of every size, best first:
+# (key, Pillow format, file extension, save options)
+RENDITION_FORMATS = []
+if pillow_supports("avif"):
+    RENDITION_FORMATS.append(("avif", "AVIF", ".avif", {"quality": 55}))
+if pillow_supports("webp"):
+    RENDITION_FORMATS.append(("webp", "WEBP", ".webp", {"quality": 78, "method": 4}))
+
+
+def rendition_name(name, size, ext=".jpg"):
+    """
+    ``booking_property_photos/a.png`` -> ``booking_property_photos/renditions/card/a.jpg``
+
+    Only a hint: the content-addressed photo storage keeps just the extension.
+    """
+    directory, filename = os.path.split(os.path.splitext(name)[0])
+    return f"{directory}/renditions/{size}/{filename}{ext}"
+
+
+def encode(image, fmt, **options):
+    buffer = BytesIO()
+    image.save(buffer, fmt, **options)
+    return buffer.getvalue()
+
+
+def placeholder_data_uri(image):
+    """A JPEG data URI of ``image`` scaled down to PLACEHOLDER_SIZE (a few hundred bytes)."""
+    tiny = image.copy()
+    tiny.thumbnail(PLACEHOLDER_SIZE, Image.LANCZOS)
+    data = encode(tiny, "JPEG", quality=PLACEHOLDER_QUALITY, optimize=True)
+    return "data:image/jpeg;base64," + base64.b64encode(data).decode("ascii")
+
+
+def render_renditions(storage, name):
+    """
+    Write every size in RENDITION_SIZES for the image stored as ``name``, as
+    JPEG plus each of RENDITION_FORMATS, and return ``(renditions,
+    placeholder)``: the storage names as ``{"card": jpeg, "card.webp": webp,
+    "card.avif": avif, ...}`` and a ``placeholder_data_uri``.
+
+    Returns ``({}, "")`` when the file cannot be read as an image, in which
+    case pages keep using the original.
+    """
+    try:
+        with storage.open(name, "rb") as original:
+            image = Image.open(original)
+            image = ImageOps.exif_transpose(image).convert("RGB")
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+        return {}, ""
+
+    renditions = {}
+    for size, box in RENDITION_SIZES.items():
+        resized = image.copy()
+        resized.thumbnail(box, Image.LANCZOS)
+        # Content-addressed, so re-rendering the same image never adds a file
+        renditions[size] = storage.save(
+            rendition_name(name, size),
+            ContentFile(encode(resized, "JPEG", quality=RENDITION_QUALITY, optimize=True, progressive=True)),
+        )
+        for key, fmt, ext, options in RENDITION_FORMATS:
+            renditions[f"{size}.{key}"] = storage.save(
+                rendition_name(name, size, ext), ContentFile(encode(resized, fmt, **options))
+            )
+    return renditions, placeholder_data_uri(image)
+
+
+def renditions_complete(renditions):
+    """True if ``renditions`` has every size in every current format."""
+    return all(
+        size in renditions and all(f"{size}.{key}" in renditions for key, _, _, _ in RENDITION_FORMATS)
+        for size in RENDITION_SIZES
+    )
+
+
+# ---------------------------------------------------
+# Format negotiation
+# ---------------------------------------------------
+def accepted_types(accept):
+    """``"image/avif,image/webp;q=0.9,*/*;q=0.8"`` -> ``{"image/avif": 1.0, "image/webp": 0.9, "*/*": 0.8}``"""
+    accepted = {}
+    for part in accept.split(","):
+        media_type, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if media_type:
+            accepted[media_type.strip().lower()] = quality
+    return accepted
+
+
+def negotiate_rendition(renditions, size, accept):
+    """
+    Storage name of the best ``size`` rendition for an ``Accept`` header.
+
+    AVIF and WebP are only picked when the client names them explicitly
+    (browsers that can decode them do); everyone else gets the JPEG.
+    """
+    accepted = accepted_types(accept or "")
+    for key, _, _, _ in RENDITION_FORMATS:
+        name = renditions.get(f"{size}.{key}")
+        if name and accepted.get(f"image/{key}", 0) > 0:
+            return name
+    return renditions.get(size)
+
+
+def render_job(name):
+    """
+    Process-pool entry point: renditions and placeholder for ``name`` in
+    the listing photo storage.
+
+    Runs in a worker process and touches only files, never the database.
+    """
+    return render_renditions(photo_storage, name)
+
+
+class RenditionsMixin:
+    """Photo model with ``renditions`` and ``placeholder`` fields; a new upload queues an ImageJob."""
+
+    def save(self, *args, **kwargs):
+        MediaBlob = apps.get_model("listings", "MediaBlob")
+        ImageJob = apps.get_model("listings", "ImageJob")
+
+        new_upload = bool(self.image) and not getattr(self.image, "_committed", True)
+        replaced = None
+        if new_upload:
+            # Any old ones belong to the replaced file
+            self.renditions = {}
+            self.placeholder = ""
+            if self.pk:
+                replaced = type(self).objects.filter(pk=self.pk).values_list("image", flat=True).first()
+        super().save(*args, **kwargs)
+        if not new_upload:
+            return
+
+        blob = MediaBlob.objects.acquire(self.image.name)
+        if replaced:
+            MediaBlob.objects.release(replaced)
+        if renditions_complete(blob.renditions) and blob.placeholder:
+            # The same bytes were uploaded before
+            self.renditions = blob.renditions
+            self.placeholder = blob.placeholder
+            super().save(update_fields=["renditions", "placeholder"])
+        else:
+            ImageJob.objects.enqueue(self)
+
+    def rendition_url(self, size, accept=""):
+        """URL of the ``size`` rendition, in the best format for ``accept`` (an HTTP Accept header)."""
+        name = negotiate_rendition(self.renditions, size, accept)
+        if name:
+            return self.image.storage.url(name)
+        return self.image.url if self.image else ""
+
+    @property
+    def card_url(self):
+        return self.rendition_url("card")
+
+    @property
+    def gallery_url(self):
+        return self.rendition_url("gallery")
+
+    @property
+    def preview_url(self):
+        return self.rendition_url("preview")
@@ -0,0 +1,103 @@
+from django.apps import apps
+from django.db import connections, models
+from django.db.models import FloatField, Prefetch
+from django.db.models.expressions import RawSQL
+
+from .search import fts_match_query, fts_table, icontains_q
+
+
+# ---------------------------------------------------
+# Query budgets for the public listing pages
+# ---------------------------------------------------
+# Maximum number of SQL queries each listing view may run for a page of
+# results (listings, cover photos, facet counts), no matter how many cards
+# are rendered. The tests enforce these.
+LISTING_QUERY_BUDGETS = {
+    "booking_properties": 3,
+    "residence_properties": 3,
+    "car_rental_list": 3,
+}
+
+
+# ---------------------------------------------------
+# Shared listing queryset
+# ---------------------------------------------------
+class ListingQuerySet(models.QuerySet):
+    """
+    Base queryset for the three listing models (BookingProperty,
+    ResidenceProperty and CarRental).
+
+    Subclasses set ``listing_related`` to the one-to-one rows shown on a
+    listing card (pricing, setup). ``for_listing()`` joins those rows in and
+    prefetches a single cover photo per listing, so a page of cards costs a
+    fixed number of queries.
+
+    ``search_fields`` are the columns covered by keyword search, and
+    ``search_weights`` their BM25 weights, in the same order as the FTS5
+    index built by the app's migration.
+    """
+    listing_related = ()
+    search_fields = ()
+    search_weights = ()
+
+    def for_listing(self):
+        photo_model = self.model._meta.get_field("photos").related_model
+        return self.select_related(*self.listing_related).prefetch_related(
+            Prefetch(
+                "photos",
+                queryset=photo_model.objects.order_by("pk")[:1],
+                to_attr="cover_photos",
+            )
+        )
+
+    def search(self, keyword):
+        """
+        Keyword search over ``search_fields``.
+
+        On SQLite this is an FTS5 lookup annotated with ``search_score``
+        (negated BM25, so higher is better). Other backends, or keywords
+        with nothing searchable in them, use icontains lookups.
+        """
+        match = fts_match_query(keyword)
+        if connections[self.db].vendor != "sqlite" or not match:
+            return self.filter(icontains_q(self.search_fields, keyword))
+
+        table = self.model._meta.db_table
+        fts = fts_table(table)
+        weights = ", ".join(str(w) for w in self.search_weights)
+        return self.filter(
+            pk__in=RawSQL(f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s", (match,))
+        ).annotate(
+            search_score=RawSQL(
+                f"SELECT -bm25({fts}, {weights}) FROM {fts} "
+                f"WHERE {fts} MATCH %s AND {fts}.rowid = {table}.id",
+                (match,),
+                output_field=FloatField(),
+            )
+        )
+
+
+class OwnerVerifiedMixin:
+    """
+    Keeps a listing's denormalized ``owner_verified`` flag right when it is saved.
+
+    Later changes to the owner's attachments are pushed to existing listings
+    by ``listings.models.refresh_owner_verified``.
+    """
+
+    def save(self, *args, **kwargs):
+        Attachment = apps.get_model("attachments", "Attachment")
+        self.owner_verified = Attachment.objects.filter(
+            user_id=self.owner_id, is_verified=True
+        ).exists()
+        super().save(*args, **kwargs)
+
+
+class CoverPhotoMixin:
+    """Gives a listing model a ``cover_photo`` that uses the prefetched photo when present."""
+
+    @property
+    def cover_photo(self):
+        if hasattr(self, "cover_photos"):
+            return self.cover_photos[0] if self.cover_photos else None
+        return self.photos.order_by("pk").first()
@@ -0,0 +1,18 @@
+from django.utils.cache import patch_vary_headers
+
+
+class VaryOnAcceptMiddleware:
+    """
+    Adds ``Vary: Accept`` to responses whose image URLs were chosen from the
+    Accept header (see the ``image_url`` template tag), so caches keep the
+    WebP/AVIF and JPEG versions of a page apart.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if getattr(request, "vary_on_accept", False):
+            patch_vary_headers(response, ("Accept",))
+        return response
@@ -0,0 +1,124 @@
+from datetime import datetime
+
+from django.core import signing
+from django.db.models import Q
+
+
+LISTING_PAGE_SIZE = 24
+
+CURSOR_SALT = "core.pagination.cursor"
+
+
+# ---------------------------------------------------
+# Keyset (cursor) pagination on (created_at, id)
+# ---------------------------------------------------
+class KeysetPage:
+    """One page of results plus the URLs for the neighbouring pages."""
+
+    def __init__(self, object_list, next_url=None, previous_url=None):
+        self.object_list = object_list
+        self.next_url = next_url
+        self.previous_url = previous_url
+
+    @property
+    def has_next(self):
+        return self.next_url is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_url is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def _dump_value(value):
+    if isinstance(value, datetime):
+        return ["dt", value.isoformat()]
+    return value
+
+
+def _load_value(value):
+    if isinstance(value, list) and value[:1] == ["dt"]:
+        return datetime.fromisoformat(value[1])
+    return value
+
+
+def make_cursor(obj, key, direction):
+    """Opaque, signed token pointing just after ("next") or before ("prev") ``obj``."""
+    return signing.dumps(
+        [key, _dump_value(getattr(obj, key)), obj.pk, direction],
+        salt=CURSOR_SALT,
+    )
+
+
+def read_cursor(token, key):
+    """
+    Return ``(value, pk, direction)``, or ``None`` for a missing or tampered
+    token or one issued for a different sort key.
+    """
+    if not token:
+        return None
+    try:
+        token_key, value, pk, direction = signing.loads(token, salt=CURSOR_SALT)
+        if token_key != key:
+            return None
+        return _load_value(value), int(pk), direction
+    except (signing.BadSignature, ValueError, TypeError):
+        return None
+
+
+def _page_url(request, param, token):
+    query = request.GET.copy()
+    query[param] = token
+    return "?" + query.urlencode()
+
+
+def paginate_keyset(request, queryset, param="cursor", per_page=LISTING_PAGE_SIZE, key=None):
+    """
+    Paginate ``queryset`` in descending ``(key, id)`` order.
+
+    ``key`` defaults to ``search_score`` for ranked keyword results (see
+    ``ListingQuerySet.search``) and ``created_at`` (newest first) otherwise.
+    Every page is a single range read, so a deep page costs the same as the
+    first one, unlike OFFSET paging.
+    """
+    if key is None:
+        key = "search_score" if "search_score" in queryset.query.annotations else "created_at"
+    cursor = read_cursor(request.GET.get(param), key)
+
+    if cursor and cursor[2] == "prev":
+        value, pk, _ = cursor
+        rows = list(
+            queryset.filter(
+                Q(**{f"{key}__gt": value}) | Q(**{key: value, "pk__gt": pk})
+            ).order_by(key, "pk")[:per_page + 1]
+        )
+        has_more = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        has_previous, has_next = has_more, True
+    else:
+        if cursor:
+            value, pk, _ = cursor
+            queryset = queryset.filter(
+                Q(**{f"{key}__lt": value}) | Q(**{key: value, "pk__lt": pk})
+            )
+        rows = list(queryset.order_by(f"-{key}", "-pk")[:per_page + 1])
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+        has_previous = cursor is not None
+
+    next_url = previous_url = None
+    if rows and has_next:
+        next_url = _page_url(request, param, make_cursor(rows[-1], key, "next"))
+    if rows and has_previous:
+        previous_url = _page_url(request, param, make_cursor(rows[0], key, "prev"))
+
+    return KeysetPage(rows, next_url=next_url, previous_url=previous_url)
@@ -0,0 +1,11 @@
+# ---------------------------------------------------
+# Tanzania administrative regions
+# ---------------------------------------------------
+# Single list used by the search forms and region facets on every vertical.
+TANZANIA_REGIONS = [
+    "Arusha", "Dar es Salaam", "Dodoma", "Geita", "Iringa", "Kagera", "Katavi",
+    "Kigoma", "Kilimanjaro", "Lindi", "Manyara", "Mara", "Mbeya", "Morogoro",
+    "Mtwara", "Mwanza", "Njombe", "Pemba North", "Pemba South", "Pwani",
+    "Rukwa", "Ruvuma", "Shinyanga", "Simiyu", "Singida", "Songwe", "Tabora",
+    "Tanga", "Zanzibar Central/South", "Zanzibar North", "Zanzibar Urban/West",
+]
@@ -0,0 +1,116 @@
+from functools import reduce
+import operator
+import re
+
+from django.db import migrations
+from django.db.models import Q
+
+
+# ---------------------------------------------------
+# SQLite FTS5 keyword index for the listing models
+# ---------------------------------------------------
+# Each listing table gets an external-content FTS5 table named
+# "<table>_fts". Triggers keep it in sync with every INSERT, UPDATE and
+# DELETE on the listing table, so no application code has to remember to
+# reindex. Other database backends fall back to icontains lookups.
+#
+# SQLite drops a table's triggers when Django rebuilds it during a
+# migration (e.g. AddField), so ensure_fulltext_indexes() runs after every
+# migrate and puts back anything that is missing.
+
+FTS_TOKENIZER = "unicode61 remove_diacritics 2"
+
+
+def fts_table(table):
+    return f"{table}_fts"
+
+
+def fts_create_statements(table, columns):
+    fts = fts_table(table)
+    cols = ", ".join(columns)
+    new_cols = ", ".join(f"new.{c}" for c in columns)
+    old_cols = ", ".join(f"old.{c}" for c in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, content='{table}', "
+        f"content_rowid='id', tokenize='{FTS_TOKENIZER}')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_cols}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_cols}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_cols}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_cols}); END",
+        # Index the rows that existed before the table was created
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def fts_drop_statements(table):
+    fts = fts_table(table)
+    return [
+        f"DROP TRIGGER IF EXISTS {fts}_ai",
+        f"DROP TRIGGER IF EXISTS {fts}_ad",
+        f"DROP TRIGGER IF EXISTS {fts}_au",
+        f"DROP TABLE IF EXISTS {fts}",
+    ]
+
+
+def create_fulltext_index(table, columns):
+    """Migration operation that builds the FTS5 index on SQLite and does nothing elsewhere."""
+
+    def run(statements):
+        def forwards(apps, schema_editor):
+            if schema_editor.connection.vendor != "sqlite":
+                return
+            for sql in statements:
+                schema_editor.execute(sql)
+        return forwards
+
+    return migrations.RunPython(
+        run(fts_create_statements(table, columns)),
+        run(fts_drop_statements(table)),
+    )
+
+
+def ensure_fulltext_indexes(using="default", **kwargs):
+    """
+    Recreate the FTS table and triggers for every searchable listing model
+    whose index is incomplete, then reindex it. Safe to run repeatedly.
+    """
+    from django.apps import apps
+    from django.db import connections
+
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+        existing = {row[0] for row in cursor.fetchall()}
+
+        for model in apps.get_models():
+            columns = getattr(model._default_manager.get_queryset(), "search_fields", ())
+            table = model._meta.db_table
+            if not columns or table not in existing:
+                continue
+            fts = fts_table(table)
+            wanted = {fts, f"{fts}_ai", f"{fts}_ad", f"{fts}_au"}
+            if wanted <= existing:
+                continue
+            for sql in fts_create_statements(table, columns):
+                cursor.execute(sql)
+
+
+def fts_match_query(keyword):
+    """
+    Turn free text into an FTS5 MATCH expression.
+
+    Every word is quoted (so user input can never be parsed as FTS syntax)
+    and used as a prefix, and all words must match.
+    """
+    words = re.findall(r"\w+", keyword)
+    return " ".join('"{}"*'.format(w.replace('"', '""')) for w in words)
+
+
+def icontains_q(fields, keyword):
+    return reduce(operator.or_, (Q(**{f"{f}__icontains": keyword}) for f in fields))
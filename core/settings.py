@@ -58,6 +58,8 @@ INSTALLED_APPS = [
     'resedence', 
     'carrental',
     'attachments.apps.AttachmentsConfig',
+    'listings.apps.ListingsConfig',
+    'outbox.apps.OutboxConfig',
     'django.contrib.humanize', 
     'allauth',
     'allauth.account',
@@ -79,6 +81,7 @@ MIDDLEWARE = [
     'allauth.account.middleware.AccountMiddleware',  # <--- Add this line
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.VaryOnAcceptMiddleware',
 ]
 
 
@@ -132,6 +135,17 @@ DATABASES = {
     }
 }
 
+# In the database, so every web worker and the management commands
+# (expire_bookings, send_outbox) share one cache and a delete in any of them
+# clears it for all. Create the table once per database with
+# `python manage.py createcachetable`.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'django_cache',
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -168,9 +182,38 @@ AUTH_USER_MODEL = 'custom_account.User'
 
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / "static"]  # Path object, not os.path.join
+# Build with `manage.py collectstatic`: fingerprinted names, staticfiles.json
+# manifest and .gz/.br copies, served by core.staticfiles.serve
+STATIC_ROOT = BASE_DIR / "staticfiles"
+# Django answers STATIC_URL itself (core/urls.py), in production too: that
+# is the intended way to serve STATIC_ROOT when no front server does. Set
+# SERVE_STATIC=False where nginx/Apache serves STATIC_ROOT at STATIC_URL.
+SERVE_STATIC = env.bool('SERVE_STATIC', default=True)
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "core.staticfiles.CompressedManifestStaticFilesStorage"},
+}
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / "media"           # Path object
 
+# Part files of chunked photo uploads (listings.ChunkedUpload); not served
+CHUNKED_UPLOAD_ROOT = BASE_DIR / "upload_chunks"
+
+# Identity documents (attachments.Attachment). Never served directly: the
+# view at PROTECTED_MEDIA_URL checks the requester, then the front server
+# sends the file. SENDFILE_BACKEND is "x-accel-redirect" for nginx, with
+#   location /_protected/ { internal; alias <PROTECTED_MEDIA_ROOT>/; }
+# "x-sendfile" for Apache (mod_xsendfile) or lighttpd, or empty to stream
+# the file from Django (local runs).
+PROTECTED_MEDIA_ROOT = BASE_DIR / "protected_media"
+PROTECTED_MEDIA_URL = '/attachments/files/'
+SENDFILE_BACKEND = env('SENDFILE_BACKEND', default='')
+SENDFILE_URL = '/_protected/'
+
+# Pending bookings not confirmed within this many hours are cancelled by
+# the expire_bookings command, which gives their rooms back
+BOOKING_PENDING_EXPIRY_HOURS = 48
+
 LOGIN_REDIRECT_URL = '/'
 
 ACCOUNT_LOGIN_METHODS = {'email', 'username'}
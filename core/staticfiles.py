@@ -0,0 +1,127 @@
+import gzip
+import mimetypes
+import os
+import posixpath
+
+import brotli
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.contrib.staticfiles import finders
+from django.http import Http404
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.functional import cached_property
+
+from .images import accepted_types
+from .streaming import ranged_file_response, serve_file
+
+# ---------------------------------------------------
+# Fingerprinted, precompressed static files
+# ---------------------------------------------------
+# File types worth compressing; images, fonts in woff/woff2 and video are
+# already compressed.
+COMPRESSIBLE_EXTENSIONS = {
+    ".css", ".js", ".mjs", ".map", ".json", ".svg", ".txt", ".html", ".xml",
+    ".ico", ".ttf", ".otf", ".eot",
+}
+
+# A variant is only kept if it is at least this much smaller than the original
+MIN_SAVING = 0.05
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def compress_file(path):
+    """Write ``path.gz`` and ``path.br`` where they shrink ``path``; returns the encodings written."""
+    with open(path, "rb") as original:
+        data = original.read()
+    variants = [
+        ("gzip", ".gz", lambda raw: gzip.compress(raw, compresslevel=9, mtime=0)),
+        ("br", ".br", lambda raw: brotli.compress(raw, quality=11)),
+    ]
+
+    written = []
+    for encoding, suffix, compress in variants:
+        compressed = compress(data)
+        if len(compressed) <= len(data) * (1 - MIN_SAVING):
+            with open(path + suffix, "wb") as variant:
+                variant.write(compressed)
+            written.append(encoding)
+        elif os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    ``collectstatic`` storage that copies every file under a content-hashed
+    name (``main.3f2a1c9b7d0e.js``), records the mapping in
+    ``STATIC_ROOT/staticfiles.json`` for ``{% static %}``, and writes gzip
+    and brotli copies of the text files for ``serve`` below.
+
+    Until collectstatic has run (development, tests) there is no manifest and
+    ``{% static %}`` gives the plain names. References in CSS to files that
+    are not in the tree (several vendor stylesheets have them) are left
+    unhashed instead of failing the build.
+    """
+
+    manifest_strict = False
+
+    def hashed_name(self, name, content=None, filename=None):
+        try:
+            return super().hashed_name(name, content, filename)
+        except ValueError:
+            return name
+
+    @cached_property
+    def fingerprinted_names(self):
+        return set(self.hashed_files.values())
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in self.hashed_files.values():
+            if os.path.splitext(name)[1].lower() in COMPRESSIBLE_EXTENSIONS:
+                compress_file(self.path(name))
+
+
+def serve(request, path):
+    """
+    Serve ``path`` from STATIC_ROOT, picking the ``.br`` or ``.gz`` variant
+    the client accepts. Range requests (video seeking) get byte ranges of
+    the uncompressed file.
+
+    Fingerprinted names never change content, so they are cached for a year
+    as ``immutable``; anything else is revalidated on each use. In DEBUG,
+    files that have not been collected are served from STATICFILES_DIRS.
+    """
+    name = posixpath.normpath(path).lstrip("/")
+    # safe_join rejects paths outside STATIC_ROOT (400 Bad Request)
+    full_path = safe_join(settings.STATIC_ROOT, name) if settings.STATIC_ROOT else ""
+    if not full_path or not os.path.isfile(full_path):
+        if settings.DEBUG:
+            return serve_file(request, finders.find(name) if name else None)
+        raise Http404(path)
+
+    headers = {}
+    if name in getattr(staticfiles_storage, "fingerprinted_names", ()):
+        headers["Cache-Control"] = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+    else:
+        headers["Cache-Control"] = "public, no-cache"
+
+    content_type, _ = mimetypes.guess_type(full_path)
+    accepted = accepted_types(request.headers.get("Accept-Encoding", ""))
+    file_path, compressed = full_path, False
+    for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+        if os.path.exists(full_path + suffix):
+            compressed = True
+            if file_path == full_path and accepted.get(encoding, 0) > 0 and "Range" not in request.headers:
+                file_path = full_path + suffix
+                headers["Content-Encoding"] = encoding
+
+    response = ranged_file_response(request, file_path, content_type, headers)
+    if compressed:
+        patch_vary_headers(response, ("Accept-Encoding",))
+    return response
+
@@ -0,0 +1,107 @@
+import hashlib
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+from django.utils.functional import cached_property
+
+
+# ---------------------------------------------------
+# Content-addressed storage for listing photos
+# ---------------------------------------------------
+@deconstructible(path="core.storage.ContentAddressedStorage")
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File storage that names every file after the SHA-256 of its content.
+
+    The digest is computed while the upload is streamed to a temporary file,
+    which is then moved to ``photos/<d0d1>/<d2d3>/<digest><ext>``. A second
+    upload with the same bytes, from any listing, ends up with the same name
+    and is not stored again. Which rows use a blob is counted in
+    ``listings.MediaBlob``.
+
+    Files saved before this storage was introduced keep their old names and
+    are served as usual.
+    """
+
+    prefix = "photos"
+
+    def blob_name(self, digest, name):
+        ext = os.path.splitext(name)[1].lower()
+        return f"{self.prefix}/{digest[:2]}/{digest[2:4]}/{digest}{ext}"
+
+    def get_available_name(self, name, max_length=None):
+        # The final name comes from the content in _save, never from ``name``
+        return name
+
+    def _save(self, name, content):
+        tmp_dir = self.path(f"{self.prefix}/tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        digest = hashlib.sha256()
+        if hasattr(content, "seek"):
+            content.seek(0)
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    tmp.write(chunk)
+
+            blob = self.blob_name(digest.hexdigest(), name)
+            full_path = self.path(blob)
+            if os.path.exists(full_path):
+                os.remove(tmp_path)
+                # Fresh mtime: clean_media leaves recently touched files alone
+                os.utime(full_path)
+            else:
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                os.replace(tmp_path, full_path)
+                if self.file_permissions_mode is not None:
+                    os.chmod(full_path, self.file_permissions_mode)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return blob
+
+
+photo_storage = ContentAddressedStorage()
+
+
+# ---------------------------------------------------
+# Private storage for identity documents
+# ---------------------------------------------------
+@deconstructible(path="core.storage.ProtectedStorage")
+class ProtectedStorage(FileSystemStorage):
+    """
+    FileSystemStorage rooted at PROTECTED_MEDIA_ROOT, outside MEDIA_ROOT so
+    the front server never exposes it.
+
+    ``url()`` points at PROTECTED_MEDIA_URL, the permission-checked view in
+    ``attachments.views``, which hands the file back to the front server
+    (see ``core.streaming.sendfile_response``).
+    """
+
+    @cached_property
+    def base_location(self):
+        return self._value_or_setting(self._location, settings.PROTECTED_MEDIA_ROOT)
+
+    @cached_property
+    def base_url(self):
+        if self._base_url is not None and not self._base_url.endswith("/"):
+            self._base_url += "/"
+        return self._value_or_setting(self._base_url, settings.PROTECTED_MEDIA_URL)
+
+    def _clear_cached_properties(self, setting, **kwargs):
+        super()._clear_cached_properties(setting, **kwargs)
+        if setting == "PROTECTED_MEDIA_ROOT":
+            self.__dict__.pop("base_location", None)
+            self.__dict__.pop("location", None)
+        elif setting == "PROTECTED_MEDIA_URL":
+            self.__dict__.pop("base_url", None)
+
+
+protected_storage = ProtectedStorage()
@@ -0,0 +1,174 @@
+import mimetypes
+import os
+import posixpath
+import re
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.encoding import iri_to_uri
+from django.utils.http import http_date, parse_http_date_safe
+
+
+# ---------------------------------------------------
+# Byte-range file responses
+# ---------------------------------------------------
+# Used for static files and uploaded media, so <video> elements can seek
+# and mobile browsers fetch only what they play.
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+STREAM_BLOCK_SIZE = 64 * 1024
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header, size):
+    """
+    ``(start, end)``, inclusive, for a single-range ``Range`` header such as
+    ``bytes=0-1023``, ``bytes=500-`` or ``bytes=-500``.
+
+    Returns None when the whole file should be sent instead (no header,
+    several ranges, a unit other than bytes); raises RangeNotSatisfiable
+    when the range lies outside the file.
+    """
+    match = RANGE_RE.match((header or "").strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        length = int(last)
+        if length == 0:
+            raise RangeNotSatisfiable
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise RangeNotSatisfiable
+    return start, end
+
+
+def file_etag(stat):
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def read_range(file, start, length, block_size=STREAM_BLOCK_SIZE):
+    try:
+        file.seek(start)
+        while length > 0:
+            block = file.read(min(block_size, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+    finally:
+        file.close()
+
+
+def ranged_file_response(request, path, content_type=None, headers=None):
+    """Response for the file at ``path`` that honours ``Range``, ``If-Range`` and its validators."""
+    stat = os.stat(path)
+    etag, last_modified = file_etag(stat), stat.st_mtime
+    headers = {"Accept-Ranges": "bytes", "ETag": etag, "Last-Modified": http_date(last_modified), **(headers or {})}
+
+    conditional = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if conditional is not None:
+        for name, value in headers.items():
+            conditional[name] = value
+        return conditional
+
+    content_type = content_type or mimetypes.guess_type(path)[0] or "application/octet-stream"
+    byte_range = None
+    if request.method in ("GET", "HEAD") and _if_range_matches(request, etag, last_modified):
+        try:
+            byte_range = parse_range(request.headers.get("Range"), stat.st_size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{stat.st_size}"
+            for name, value in headers.items():
+                response[name] = value
+            return response
+
+    if byte_range is None:
+        response = FileResponse(open(path, "rb"), content_type=content_type)
+        response.headers.pop("Content-Disposition", None)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            read_range(open(path, "rb"), start, end - start + 1), status=206, content_type=content_type
+        )
+        response["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+        response["Content-Length"] = str(end - start + 1)
+    for name, value in headers.items():
+        response[name] = value
+    return response
+
+
+def _if_range_matches(request, etag, last_modified):
+    """False if an ``If-Range`` validator says the client's copy is stale (send it all)."""
+    if_range = request.headers.get("If-Range")
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        return if_range == etag
+    date = parse_http_date_safe(if_range)
+    return date is not None and int(last_modified) <= date
+
+
+def serve_file(request, full_path, headers=None):
+    """``ranged_file_response`` for an absolute path, 404 if there is no such file."""
+    if not full_path or not os.path.isfile(full_path):
+        raise Http404("File not found")
+    return ranged_file_response(request, full_path, headers=headers)
+
+
+# Identity documents uploaded by the old registration form (NIDA cards). No
+# row points at them any more; they are never served from here, and
+# clean_media never collects them as orphans.
+PRIVATE_MEDIA_DIRECTORIES = ("nida_cards/",)
+
+
+def serve_media(request, path):
+    """MEDIA_ROOT in development, e.g. listing video tours, with byte-range support."""
+    name = posixpath.normpath(path).lstrip("/")
+    if name.startswith(PRIVATE_MEDIA_DIRECTORIES):
+        raise Http404("File not found")
+    # safe_join rejects paths outside MEDIA_ROOT (400 Bad Request)
+    return serve_file(request, safe_join(settings.MEDIA_ROOT, name))
+
+
+def sendfile_response(request, root, name, headers=None):
+    """
+    Response for the already permission-checked file ``name`` under
+    ``root``, handed to the front server according to SENDFILE_BACKEND:
+
+    - ``"x-accel-redirect"``: nginx serves SENDFILE_URL + ``name`` from an
+      ``internal`` location.
+    - ``"x-sendfile"``: Apache/lighttpd serve the absolute path.
+    - empty: Django streams it with ``ranged_file_response``.
+
+    With a front server no file bytes pass through Python, and ranges and
+    validators are handled there.
+    """
+    full_path = safe_join(root, name)
+    if not os.path.isfile(full_path):
+        raise Http404("File not found")
+
+    backend = settings.SENDFILE_BACKEND.lower()
+    if not backend:
+        return ranged_file_response(request, full_path, headers=headers)
+
+    response = HttpResponse(content_type=mimetypes.guess_type(full_path)[0] or "application/octet-stream")
+    if backend == "x-accel-redirect":
+        response["X-Accel-Redirect"] = iri_to_uri(settings.SENDFILE_URL + name)
+    elif backend == "x-sendfile":
+        response["X-Sendfile"] = full_path
+    else:
+        raise ValueError(f"Unknown SENDFILE_BACKEND {settings.SENDFILE_BACKEND!r}")
+    for header, value in (headers or {}).items():
+        response[header] = value
+    return response
@@ -0,0 +1,85 @@
+import os
+import shutil
+import tempfile
+
+from django.core.management import call_command
+from django.templatetags.static import static
+from django.http import Http404
+from django.test import RequestFactory, TestCase, override_settings
+
+from core.streaming import serve_media
+
+
+class StaticFilesTests(TestCase):
+
+    def setUp(self):
+        source, self.root = tempfile.mkdtemp(), tempfile.mkdtemp()
+        for directory in (source, self.root):
+            self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        os.makedirs(os.path.join(source, "css"))
+        with open(os.path.join(source, "css", "site.css"), "w") as css:
+            css.write(".card { background: url('logo.png'); }\n" * 200)
+        with open(os.path.join(source, "css", "logo.png"), "wb") as logo:
+            logo.write(b"\x89PNG not really")
+        os.makedirs(os.path.join(source, "videos"))
+        self.video = bytes(range(256)) * 400
+        with open(os.path.join(source, "videos", "tour.mp4"), "wb") as video:
+            video.write(self.video)
+
+        settings_override = override_settings(STATICFILES_DIRS=[source], STATIC_ROOT=self.root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        call_command("collectstatic", interactive=False, verbosity=0)
+
+    def test_collected_files_are_fingerprinted_precompressed_and_cached(self):
+        url = static("css/site.css")
+        self.assertRegex(url, r"^/static/css/site\.[0-9a-f]{12}\.css$")
+        self.assertTrue(os.path.exists(os.path.join(self.root, url[len("/static/"):] + ".gz")))
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertLess(int(response["Content-Length"]), os.path.getsize(os.path.join(self.root, "css", "site.css")))
+
+        self.assertTrue(os.path.exists(os.path.join(self.root, url[len("/static/"):] + ".br")))
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip, deflate, br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertLess(int(response["Content-Length"]), os.path.getsize(os.path.join(self.root, "css", "site.css")))
+
+        plain = self.client.get(url, HTTP_ACCEPT_ENCODING="identity")
+        self.assertFalse(plain.has_header("Content-Encoding"))
+        self.assertIn(b"logo.", b"".join(plain.streaming_content))
+
+        # The unhashed copy may change on the next deploy
+        self.assertEqual(self.client.get("/static/css/site.css")["Cache-Control"], "public, no-cache")
+        self.assertEqual(self.client.get("/static/css/missing.css").status_code, 404)
+
+    def test_video_is_served_in_byte_ranges(self):
+        url, size = static("videos/tour.mp4"), len(self.video)
+
+        response = self.client.get(url, HTTP_RANGE="bytes=1000-1999")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 1000-1999/{size}")
+        self.assertEqual(response["Content-Type"], "video/mp4")
+        self.assertEqual(b"".join(response.streaming_content), self.video[1000:2000])
+
+        tail = self.client.get(url, HTTP_RANGE="bytes=-100")
+        self.assertEqual(b"".join(tail.streaming_content), self.video[-100:])
+        self.assertEqual(self.client.get(url, HTTP_RANGE=f"bytes={size}-").status_code, 416)
+
+        full = self.client.get(url)
+        self.assertEqual((full.status_code, full["Accept-Ranges"]), (200, "bytes"))
+        # A stale If-Range gets the whole (new) file instead of a mismatched piece
+        self.assertEqual(self.client.get(url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"old"').status_code, 200)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=full["ETag"]).status_code, 304)
+
+
+class MediaServingTests(TestCase):
+
+    def test_identity_documents_are_not_served(self):
+        # Committed under media/nida_cards, so the file does exist
+        request = RequestFactory().get("/media/nida_cards/ando_long_tune1a.png")
+        with self.assertRaises(Http404):
+            serve_media(request, "nida_cards/ando_long_tune1a.png")
+
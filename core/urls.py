@@ -1,7 +1,11 @@
+import re
+
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
+
+from core.staticfiles import serve as serve_static
+from core.streaming import serve_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -11,10 +15,19 @@ urlpatterns = [
     path('resedence/', include('resedence.urls')), 
     path('carrental/', include('carrental.urls')), 
     path('attachments/', include('attachments.urls')), 
+    path('uploads/', include('listings.urls')),
     
 ]
 
 
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-    urlpatterns += static(settings.STATIC_URL, document_root=settings.STATICFILES_DIRS[0])
\ No newline at end of file
+    urlpatterns += [
+        re_path(r'^%s(?P<path>.*)$' % re.escape(settings.MEDIA_URL.lstrip('/')), serve_media),
+    ]
+
+# Collected static files, precompressed and cached (see core.staticfiles);
+# the production path unless a front server serves STATIC_ROOT (SERVE_STATIC)
+if settings.SERVE_STATIC:
+    urlpatterns += [
+        re_path(r'^%s(?P<path>.*)$' % re.escape(settings.STATIC_URL.lstrip('/')), serve_static),
+    ]
\ No newline at end of file
@@ -0,0 +1,53 @@
+from django.contrib import admin
+from .models import ImageJob, ListingIndex
+
+
+@admin.register(ListingIndex)
+class ListingIndexAdmin(admin.ModelAdmin):
+    list_display = (
+        'name',
+        'vertical',
+        'listing_type',
+        'region',
+        'district',
+        'owner_verified',
+        'is_active',
+        'headline_price',
+        'updated_at',
+    )
+    list_filter = (
+        'vertical',
+        'owner_verified',
+        'is_active',
+        'region',
+    )
+    search_fields = (
+        'name',
+        'owner__email',
+        'district',
+        'region',
+    )
+    ordering = ('-created_at',)
+
+    # Rows are maintained by signals; rebuild with `manage.py rebuild_listing_index`
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ImageJob)
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = ('image_name', 'photo_type', 'status', 'attempts', 'created_at', 'finished_at')
+    list_filter = ('status', 'photo_type')
+    search_fields = ('image_name',)
+    ordering = ('-created_at',)
+
+    # Queued on upload; worked off by `manage.py process_image_jobs`
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+
+
+class ListingsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'listings'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+        from core.search import ensure_fulltext_indexes
+        from . import signals  # noqa: F401
+
+        post_migrate.connect(ensure_fulltext_indexes, sender=self, dispatch_uid="ensure_fulltext_indexes")
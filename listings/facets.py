@@ -0,0 +1,57 @@
+from collections import Counter
+
+from core.regions import TANZANIA_REGIONS
+from .models import FacetCount, PRICE_BUCKETS
+
+
+class ListingFacets:
+    """
+    Region, type and price-bucket counts for one set of listing filters.
+
+    Each facet is counted with the other two filters applied but not its
+    own, so every option shows how many results picking it would give.
+    """
+
+    def __init__(self, regions, types, prices):
+        self.regions = regions
+        self.types = types
+        self.prices = prices
+
+
+def listing_facets(verticals, type_choices=(), listing_type="", region="", price="", verified_only=True):
+    """
+    Build ListingFacets for ``verticals`` from the FacetCount table.
+
+    This is a single read of a table with at most a few hundred rows, no
+    matter how many listings there are. Keyword search is not reflected in
+    the counts.
+    """
+    cells = FacetCount.objects.filter(vertical__in=verticals, count__gt=0)
+    if verified_only:
+        cells = cells.filter(owner_verified=True)
+    cells = list(cells.values_list("listing_type", "region", "price_bucket", "count"))
+
+    by_region, by_type, by_price = Counter(), Counter(), Counter()
+    for cell_type, cell_region, cell_price, count in cells:
+        type_ok = not listing_type or cell_type == listing_type
+        region_ok = not region or cell_region == region
+        price_ok = not price or cell_price == price
+        if type_ok and price_ok:
+            by_region[cell_region] += count
+        if region_ok and price_ok:
+            by_type[cell_type] += count
+        if type_ok and region_ok:
+            by_price[cell_price] += count
+
+    regions = [(name, by_region[name]) for name in TANZANIA_REGIONS]
+    regions += sorted(
+        (name, count) for name, count in by_region.items()
+        if name and name not in TANZANIA_REGIONS
+    )
+    types = [(key, label, by_type[key]) for key, label in type_choices]
+
+    prices = []
+    if len(verticals) == 1:
+        prices = [(key, label, by_price[key]) for key, label, _, _ in PRICE_BUCKETS[verticals[0]]]
+
+    return ListingFacets(regions, types, prices)
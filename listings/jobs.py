@@ -0,0 +1,107 @@
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.db import connections, transaction
+from django.utils import timezone
+
+from core.images import render_job, renditions_complete
+from .models import ImageJob, MediaBlob
+
+
+# How long claimed jobs are hidden from other workers; jobs of a worker that
+# dies mid-batch become due again after this.
+CLAIM_LEASE = timedelta(minutes=10)
+
+
+def image_pool(workers=None):
+    """
+    A process pool for ``process_image_jobs``, with its workers already
+    started.
+
+    The executor only forks its workers on the first submit, so a no-op is
+    submitted right after closing the database connections: no worker
+    inherits an open connection, and later batches reopen one in this
+    process only.
+    """
+    connections.close_all()
+    pool = ProcessPoolExecutor(max_workers=workers)
+    pool.submit(int).result()
+    return pool
+
+
+def claim_jobs(batch_size):
+    with transaction.atomic():
+        ids = list(
+            ImageJob.objects.due()
+            .select_for_update(skip_locked=True)
+            .order_by("run_after", "pk")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        ImageJob.objects.filter(pk__in=ids).update(run_after=timezone.now() + CLAIM_LEASE)
+    return list(ImageJob.objects.filter(pk__in=ids).select_related("photo_type").order_by("pk"))
+
+
+def process_image_jobs(batch_size=20, pool=None):
+    """
+    Write renditions for one batch of queued photos and return the number
+    of jobs handled.
+
+    With a ``pool`` (see ``image_pool``) the images are decoded, resized and
+    encoded in parallel worker processes; without one they are done here,
+    one after another. Only this process writes to the database.
+    """
+    jobs = claim_jobs(batch_size)
+    if not jobs:
+        return 0
+
+    # One query per photo model for the whole batch
+    photos = {}
+    for job in jobs:
+        photos.setdefault(job.photo_type, []).append(job.photo_id)
+    photos = {
+        photo_type: photo_type.model_class().objects.in_bulk(ids)
+        for photo_type, ids in photos.items()
+    }
+
+    # Renditions already written for the same file by an earlier job
+    rendered = {
+        name: (renditions, placeholder)
+        for name, renditions, placeholder in MediaBlob.objects.filter(
+            name__in=[job.image_name for job in jobs]
+        ).values_list("name", "renditions", "placeholder")
+        if renditions_complete(renditions) and placeholder
+    }
+
+    work = []
+    for job in jobs:
+        photo = photos[job.photo_type].get(job.photo_id)
+        if photo is None or photo.image.name != job.image_name:
+            # Photo deleted, or replaced by an upload with its own job
+            job.mark_done()
+            continue
+        if job.image_name in rendered:
+            photo.renditions, photo.placeholder = rendered[job.image_name]
+            photo.save(update_fields=["renditions", "placeholder"])
+            job.mark_done()
+            continue
+        work.append((job, photo))
+
+    if pool is None:
+        futures = [(job, photo, None) for job, photo in work]
+    else:
+        futures = [(job, photo, pool.submit(render_job, job.image_name)) for job, photo in work]
+
+    for job, photo, future in futures:
+        try:
+            renditions, placeholder = future.result() if future else render_job(job.image_name)
+        except Exception as exc:
+            job.mark_failed(exc)
+            continue
+        photo.renditions, photo.placeholder = renditions, placeholder
+        # Saving (not updating) lets the listing index pick up the card rendition
+        photo.save(update_fields=["renditions", "placeholder"])
+        if renditions:
+            MediaBlob.objects.filter(name=job.image_name).update(renditions=renditions, placeholder=placeholder)
+        job.mark_done()
+
+    return len(jobs)
@@ -0,0 +1,93 @@
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from listings.media import orphaned_files, referenced_media_names
+from listings.models import ChunkedUpload, MediaBlob
+
+
+class Command(BaseCommand):
+    help = (
+        "Report media and protected document files no database row points at (deleted listings, "
+        "photos and attachments, abandoned chunked uploads). Nothing is removed without --delete."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--delete", action="store_true", help="Delete the orphaned files instead of only listing them.")
+        parser.add_argument(
+            "--min-age", type=float, default=24,
+            help="Hours a file or unfinished upload must be untouched before it counts as orphaned (default 24).",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        self.delete = options["delete"]
+        self.verbosity = options["verbosity"]
+        min_age = timedelta(hours=options["min_age"])
+        batch_size = options["batch_size"]
+
+        # Names are collected before the scan: a file written after this
+        # point is newer than --min-age and skipped anyway
+        referenced = referenced_media_names()
+        self.stdout.write(f"{len(referenced)} file name(s) referenced in the database.")
+
+        count = size = 0
+        released = []
+        for name, path, file_size in orphaned_files(settings.MEDIA_ROOT, referenced, min_age.total_seconds()):
+            count += 1
+            size += file_size
+            self.remove(name, path)
+            if self.delete:
+                released.append(name)
+                if len(released) >= batch_size:
+                    self.forget_blobs(released)
+                    released = []
+        if released:
+            self.forget_blobs(released)
+        self.summary("media", count, size)
+
+        count = size = 0
+        for name, path, file_size in orphaned_files(settings.PROTECTED_MEDIA_ROOT, referenced, min_age.total_seconds()):
+            count += 1
+            size += file_size
+            self.remove(name, path)
+        self.summary("protected document", count, size)
+
+        count, size = self.clean_uploads(timezone.now() - min_age, min_age.total_seconds())
+        self.summary("chunked upload", count, size)
+
+    def remove(self, name, path):
+        if self.verbosity >= 2:
+            self.stdout.write(f"  {'deleting' if self.delete else 'orphan'}: {name}")
+        if self.delete:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def forget_blobs(self, names):
+        # Rows for files that are gone; a re-upload of the same bytes starts a new count
+        MediaBlob.objects.filter(name__in=names, refcount=0).delete()
+
+    def clean_uploads(self, cutoff, min_age):
+        """Part files of uploads started before ``cutoff`` and never attached, and parts with no row."""
+        stale = ChunkedUpload.objects.filter(created_at__lt=cutoff)
+        live = {
+            f"{pk}.part" for pk in ChunkedUpload.objects.filter(created_at__gte=cutoff).values_list("pk", flat=True)
+        }
+        count = size = 0
+        for name, path, file_size in orphaned_files(settings.CHUNKED_UPLOAD_ROOT, live, min_age):
+            count += 1
+            size += file_size
+            self.remove(name, path)
+        if self.delete:
+            stale.delete()
+        return count, size
+
+    def summary(self, kind, count, size):
+        verb = "Deleted" if self.delete else "Found"
+        message = f"{verb} {count} orphaned {kind} file(s), {size / (1024 * 1024):.1f} MB."
+        self.stdout.write(self.style.SUCCESS(message) if self.delete or not count else self.style.WARNING(message))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from booking.models import BookingPropertyPhoto
+from carrental.models import CarRentalPhoto
+from core.images import RENDITION_FORMATS
+from listings.models import ImageJob
+from resedence.models import ResidencePropertyPhoto
+
+
+PHOTO_MODELS = (BookingPropertyPhoto, ResidencePropertyPhoto, CarRentalPhoto)
+
+
+class Command(BaseCommand):
+    help = "Queue rendition jobs for listing photos missing renditions, formats or placeholders (run process_image_jobs after)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Queue every photo, not only those without renditions.")
+
+    def handle(self, *args, **options):
+        for model in PHOTO_MODELS:
+            photos = model.objects.exclude(image="")
+            if not options["force"]:
+                # No renditions yet, written before a format was added, or no placeholder
+                missing = ~Q(renditions__has_key="card") | Q(placeholder="")
+                for key, _, _, _ in RENDITION_FORMATS:
+                    missing |= ~Q(renditions__has_key=f"card.{key}")
+                photos = photos.filter(missing)
+            count = 0
+            for photo in photos.iterator(chunk_size=500):
+                ImageJob.objects.enqueue(photo)
+                count += 1
+            self.stdout.write(f"{model.__name__}: queued {count} photo(s).")
+        self.stdout.write(self.style.SUCCESS("Rendition jobs queued; run `manage.py process_image_jobs`."))
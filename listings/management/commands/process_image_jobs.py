@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from listings.jobs import image_pool, process_image_jobs
+
+
+class Command(BaseCommand):
+    help = "Write renditions for queued photo uploads, resizing in a pool of worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU; 0 = no pool).")
+        parser.add_argument("--batch-size", type=int, default=20)
+        parser.add_argument(
+            "--loop", action="store_true",
+            help="Keep running and poll for new jobs instead of exiting when the queue is empty.",
+        )
+        parser.add_argument("--interval", type=float, default=2.0, help="Seconds to wait between polls with --loop.")
+
+    def handle(self, *args, **options):
+        pool = None if options["workers"] == 0 else image_pool(options["workers"])
+        total = 0
+        try:
+            while True:
+                handled = process_image_jobs(options["batch_size"], pool=pool)
+                total += handled
+                if handled:
+                    continue
+                if not options["loop"]:
+                    break
+                time.sleep(options["interval"])
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        self.stdout.write(self.style.SUCCESS(f"Processed {total} image job(s)."))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from listings.models import FacetCount, ListingIndex
+
+
+class Command(BaseCommand):
+    help = "Rebuild the cross-vertical ListingIndex and its facet counts from the booking, residence and car rental tables."
+
+    def handle(self, *args, **options):
+        for vertical, count in ListingIndex.objects.rebuild().items():
+            self.stdout.write(f"Indexed {count} {vertical} listing(s).")
+        FacetCount.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS("Listing index rebuilt."))
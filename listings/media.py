@@ -0,0 +1,97 @@
+import os
+import time
+
+from django.apps import apps
+from django.db import models
+
+from core.streaming import PRIVATE_MEDIA_DIRECTORIES
+from .models import ImageJob, ListingIndex, MediaBlob
+
+
+# ---------------------------------------------------
+# Orphaned media files
+# ---------------------------------------------------
+# Deleting a listing, a photo or an attachment removes the row but not the
+# file. ``clean_media`` finds those files by streaming over MEDIA_ROOT and
+# checking every path against the set of names the database still uses.
+def file_fields():
+    """``(model, field)`` for every FileField/ImageField on an installed model."""
+    for model in apps.get_models():
+        for field in model._meta.concrete_fields:
+            if isinstance(field, models.FileField):
+                yield model, field
+
+
+def referenced_media_names(chunk_size=2000):
+    """
+    Every storage name in MEDIA_ROOT or PROTECTED_MEDIA_ROOT the database
+    still points at.
+
+    One streamed query per file field and per rendition column, however many
+    files there are. Blobs with no photo rows left (refcount 0) do not count,
+    so their file and renditions are collected. Files of photo jobs still
+    pending are kept.
+    """
+    names = set()
+
+    def add(values):
+        names.update(value for value in values if value)
+
+    def add_renditions(values):
+        for renditions in values:
+            add((renditions or {}).values())
+
+    for model, field in file_fields():
+        if isinstance(field.default, str):
+            add([field.default])
+        add(model._base_manager.values_list(field.attname, flat=True).iterator(chunk_size=chunk_size))
+        if any(f.name == "renditions" for f in model._meta.concrete_fields):
+            add_renditions(model._base_manager.values_list("renditions", flat=True).iterator(chunk_size=chunk_size))
+
+    live_blobs = MediaBlob.objects.filter(refcount__gt=0)
+    add(live_blobs.values_list("name", flat=True).iterator(chunk_size=chunk_size))
+    add_renditions(live_blobs.values_list("renditions", flat=True).iterator(chunk_size=chunk_size))
+    add(ImageJob.objects.filter(status="pending").values_list("image_name", flat=True).iterator(chunk_size=chunk_size))
+    add(ListingIndex.objects.values_list("cover_thumbnail", flat=True).iterator(chunk_size=chunk_size))
+    add_renditions(ListingIndex.objects.values_list("cover_renditions", flat=True).iterator(chunk_size=chunk_size))
+    return names
+
+
+def scan_files(root, prefix=""):
+    """
+    Yield ``(name, path, entry)`` for every regular file under ``root``,
+    ``name`` being the ``/``-separated path relative to it.
+
+    Walks with os.scandir one directory at a time, so memory does not grow
+    with the number of files. Symlinks are not followed.
+    """
+    try:
+        entries = os.scandir(root)
+    except FileNotFoundError:
+        return
+    with entries:
+        for entry in entries:
+            name = f"{prefix}{entry.name}"
+            if entry.is_dir(follow_symlinks=False):
+                yield from scan_files(entry.path, f"{name}/")
+            elif entry.is_file(follow_symlinks=False):
+                yield name, entry.path, entry
+
+
+def orphaned_files(root, referenced, min_age):
+    """
+    Files under ``root`` whose name is not in ``referenced``, as
+    ``(name, path, size)``.
+
+    Files changed in the last ``min_age`` seconds are skipped: an upload
+    writes its file before the row that points at it is committed. So are
+    the identity documents under PRIVATE_MEDIA_DIRECTORIES.
+    """
+    cutoff = time.time() - min_age
+    for name, path, entry in scan_files(root):
+        if name in referenced or name.startswith(PRIVATE_MEDIA_DIRECTORIES):
+            continue
+        stat = entry.stat(follow_symlinks=False)
+        if stat.st_mtime > cutoff:
+            continue
+        yield name, path, stat.st_size
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ListingIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('vertical', models.CharField(choices=[('booking', 'Booking'), ('residence', 'Residence'), ('car', 'Car Rental')], max_length=20)),
+                ('listing_id', models.PositiveBigIntegerField()),
+                ('listing_type', models.CharField(max_length=50)),
+                ('name', models.CharField(max_length=255)),
+                ('region', models.CharField(blank=True, max_length=50)),
+                ('district', models.CharField(blank=True, max_length=100)),
+                ('country', models.CharField(blank=True, max_length=50)),
+                ('description', models.TextField(blank=True)),
+                ('owner_verified', models.BooleanField(default=False)),
+                ('is_active', models.BooleanField(default=True)),
+                ('headline_price', models.DecimalField(blank=True, decimal_places=2, max_digits=16, null=True)),
+                ('cover_thumbnail', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Listing Index',
+                'verbose_name_plural': 'Listing Index',
+                'indexes': [models.Index(fields=['region', 'is_active', 'created_at'], name='listingindex_region_idx'), models.Index(fields=['district', 'is_active', 'created_at'], name='listingindex_district_idx'), models.Index(fields=['created_at', 'id'], name='listingindex_created_id_idx')],
+                'constraints': [models.UniqueConstraint(fields=('vertical', 'listing_id'), name='listingindex_unique_listing')],
+            },
+        ),
+    ]
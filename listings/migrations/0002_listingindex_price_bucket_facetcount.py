@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='listingindex',
+            name='price_bucket',
+            field=models.CharField(blank=True, max_length=20),
+        ),
+        migrations.CreateModel(
+            name='FacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('vertical', models.CharField(choices=[('booking', 'Booking'), ('residence', 'Residence'), ('car', 'Car Rental')], max_length=20)),
+                ('listing_type', models.CharField(max_length=50)),
+                ('region', models.CharField(blank=True, max_length=50)),
+                ('price_bucket', models.CharField(blank=True, max_length=20)),
+                ('owner_verified', models.BooleanField(default=False)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('vertical', 'listing_type', 'region', 'price_bucket', 'owner_verified'), name='facetcount_unique_cell')],
+            },
+        ),
+    ]
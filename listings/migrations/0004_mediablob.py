@@ -0,0 +1,48 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:52
+
+from django.db import migrations, models
+
+
+PHOTO_MODELS = [
+    ('booking', 'BookingPropertyPhoto'),
+    ('resedence', 'ResidencePropertyPhoto'),
+    ('carrental', 'CarRentalPhoto'),
+]
+
+
+def count_existing_photos(apps, schema_editor):
+    MediaBlob = apps.get_model('listings', 'MediaBlob')
+    blobs = {}
+    for app_label, model_name in PHOTO_MODELS:
+        photos = apps.get_model(app_label, model_name).objects.exclude(image='')
+        for name, renditions in photos.values_list('image', 'renditions').iterator():
+            blob = blobs.setdefault(name, MediaBlob(name=name, refcount=0))
+            blob.refcount += 1
+            if renditions:
+                blob.renditions = renditions
+    MediaBlob.objects.bulk_create(blobs.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0003_imagejob'),
+        ('booking', '0012_alter_bookingpropertyphoto_image'),
+        ('resedence', '0006_alter_residencepropertyphoto_image'),
+        ('carrental', '0006_alter_carrentalphoto_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('refcount', models.PositiveIntegerField(default=0)),
+                ('renditions', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(count_existing_photos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0004_mediablob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='listingindex',
+            name='cover_renditions',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-18 17:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0006_chunkedupload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='listingindex',
+            name='cover_placeholder',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='mediablob',
+            name='placeholder',
+            field=models.TextField(blank=True),
+        ),
+    ]
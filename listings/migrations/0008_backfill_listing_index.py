@@ -0,0 +1,25 @@
+from django.db import migrations
+
+
+def backfill_listing_index(apps, schema_editor):
+    # The row mapping lives on the real models (VERTICALS, sync), so this uses
+    # them rather than the historical ones and must run after every migration
+    # those models read from
+    from listings.models import FacetCount, ListingIndex
+
+    ListingIndex.objects.rebuild()
+    FacetCount.objects.rebuild()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0007_photo_placeholder'),
+        ('booking', '0017_booking_status_created_idx'),
+        ('carrental', '0007_photo_placeholder'),
+        ('resedence', '0007_photo_placeholder'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_listing_index, migrations.RunPython.noop),
+    ]
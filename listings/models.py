@@ -0,0 +1,527 @@
+import os
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, Exists, F, OuterRef
+from django.urls import reverse
+from django.utils import timezone
+
+from attachments.models import Attachment
+from core.images import negotiate_rendition
+from booking.models import BookingProperty
+from carrental.models import CarRental
+from resedence.models import ResidenceProperty
+
+
+# ---------------------------------------------------
+# Per-vertical mapping onto the index columns
+# ---------------------------------------------------
+def _booking_fields(listing):
+    pricing = getattr(listing, "bookingpropertypricing", None)
+    return {
+        "listing_type": listing.property_type,
+        "name": listing.property_name,
+        "region": listing.region,
+        "district": listing.district,
+        "country": listing.country,
+        "headline_price": pricing.base_price_per_night if pricing else None,
+        "is_active": True,
+    }
+
+
+def _residence_fields(listing):
+    pricing = getattr(listing, "residencepropertypricing", None)
+    return {
+        "listing_type": listing.property_type,
+        "name": listing.property_name,
+        "region": listing.region,
+        "district": listing.district,
+        "country": listing.country,
+        "headline_price": pricing.base_price if pricing else None,
+        "is_active": listing.status == "open",
+    }
+
+
+def _car_fields(listing):
+    # Cars have no location of their own yet, so they carry no region/district
+    pricing = getattr(listing, "carrentalpricing", None)
+    return {
+        "listing_type": listing.car_type,
+        "name": listing.car_name,
+        "region": "",
+        "district": "",
+        "country": "",
+        "description": listing.car_description or "",
+        "headline_price": pricing.base_price_per_day if pricing else None,
+        "is_active": True,
+    }
+
+
+VERTICALS = {
+    BookingProperty: ("booking", _booking_fields),
+    ResidenceProperty: ("residence", _residence_fields),
+    CarRental: ("car", _car_fields),
+}
+
+
+# ---------------------------------------------------
+# Headline price buckets per vertical (TZS)
+# ---------------------------------------------------
+# (key, label, lower bound inclusive, upper bound exclusive or None)
+PRICE_BUCKETS = {
+    "booking": [
+        ("under-50k", "Under 50,000", 0, 50000),
+        ("50k-100k", "50,000 - 100,000", 50000, 100000),
+        ("100k-250k", "100,000 - 250,000", 100000, 250000),
+        ("250k-plus", "250,000 and above", 250000, None),
+    ],
+    "residence": [
+        ("under-300k", "Under 300,000", 0, 300000),
+        ("300k-700k", "300,000 - 700,000", 300000, 700000),
+        ("700k-1500k", "700,000 - 1,500,000", 700000, 1500000),
+        ("1500k-plus", "1,500,000 and above", 1500000, None),
+    ],
+    "car": [
+        ("under-50k", "Under 50,000", 0, 50000),
+        ("50k-100k", "50,000 - 100,000", 50000, 100000),
+        ("100k-200k", "100,000 - 200,000", 100000, 200000),
+        ("200k-plus", "200,000 and above", 200000, None),
+    ],
+}
+
+
+def price_bucket(vertical, price):
+    if price is None:
+        return ""
+    for key, _, low, high in PRICE_BUCKETS[vertical]:
+        if price >= low and (high is None or price < high):
+            return key
+    return ""
+
+
+def price_bucket_range(vertical, key):
+    """Return ``(low, high)`` for a bucket key, or ``None`` if the key is unknown."""
+    for bucket_key, _, low, high in PRICE_BUCKETS[vertical]:
+        if bucket_key == key:
+            return low, high
+    return None
+
+
+def refresh_owner_verified(user_ids):
+    """
+    Recompute the denormalized ``owner_verified`` flag for every listing
+    (and index row) owned by ``user_ids``.
+
+    Each table gets a single UPDATE, however many listings or owners are
+    affected. The active index rows whose flag flips are counted per facet
+    cell first, and those counts move to the cell with the other flag.
+    """
+    verified = Exists(Attachment.objects.filter(user=OuterRef("owner"), is_verified=True))
+    cell_fields = ("vertical", "listing_type", "region", "price_bucket", "owner_verified")
+    with transaction.atomic():
+        flipping = list(
+            ListingIndex.objects.filter(owner_id__in=user_ids, is_active=True)
+            .alias(now_verified=verified)
+            .exclude(owner_verified=F("now_verified"))
+            .values(*cell_fields)
+            .annotate(total=Count("id"))
+            .order_by()
+        )
+        for model in VERTICALS:
+            model.objects.filter(owner_id__in=user_ids).update(owner_verified=verified)
+        ListingIndex.objects.filter(owner_id__in=user_ids).update(owner_verified=verified)
+        for cell in flipping:
+            total = cell.pop("total")
+            FacetCount.objects.adjust(cell, -total)
+            FacetCount.objects.adjust({**cell, "owner_verified": not cell["owner_verified"]}, total)
+
+
+# ---------------------------------------------------
+# Listing Index
+# ---------------------------------------------------
+class ListingIndexQuerySet(models.QuerySet):
+
+    def sync(self, listing):
+        """Insert or refresh the index row for a BookingProperty, ResidenceProperty or CarRental."""
+        vertical, fields = VERTICALS[type(listing)]
+        cover = listing.photos.order_by("pk").first()
+        defaults = fields(listing)
+        defaults.update({
+            "owner_id": listing.owner_id,
+            "owner_verified": listing.owner_verified,
+            "price_bucket": price_bucket(vertical, defaults["headline_price"]),
+            "cover_thumbnail": (cover.renditions.get("card") or cover.image.name) if cover else "",
+            "cover_renditions": cover.renditions if cover else {},
+            "cover_placeholder": cover.placeholder if cover else "",
+            "created_at": listing.created_at,
+        })
+        with transaction.atomic():
+            old = self.filter(vertical=vertical, listing_id=listing.pk).first()
+            row = self.update_or_create(
+                vertical=vertical, listing_id=listing.pk, defaults=defaults
+            )[0]
+            FacetCount.objects.move(old, row)
+        return row
+
+    def rebuild(self):
+        """Re-index every listing in the three verticals; returns how many per vertical."""
+        self.all().delete()
+        counts = {}
+        for model, (vertical, _) in VERTICALS.items():
+            counts[vertical] = 0
+            for listing in model.objects.iterator(chunk_size=500):
+                self.sync(listing)
+                counts[vertical] += 1
+        return counts
+
+    def remove(self, listing):
+        # Facet counts are released by the post_delete hook on ListingIndex
+        vertical, _ = VERTICALS[type(listing)]
+        return self.filter(vertical=vertical, listing_id=listing.pk).delete()
+
+
+class ListingIndex(models.Model):
+    """
+    One denormalized row per public listing across all three verticals.
+
+    Rows are written by the post_save/post_delete hooks in ``signals.py``,
+    so cross-vertical pages (global search, city search) read a single
+    indexed table with one sort order instead of querying three models.
+    """
+
+    VERTICAL_CHOICES = [
+        ('booking', 'Booking'),
+        ('residence', 'Residence'),
+        ('car', 'Car Rental'),
+    ]
+
+    PRICE_UNITS = {
+        'booking': 'Night',
+        'residence': 'Month',
+        'car': 'Day',
+    }
+
+    DETAIL_URLS = {
+        'booking': 'booking_property_detail',
+        'residence': 'residence_property_details',
+        'car': 'car_rental_details',
+    }
+
+    vertical = models.CharField(max_length=20, choices=VERTICAL_CHOICES)
+    listing_id = models.PositiveBigIntegerField()
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+
+    listing_type = models.CharField(max_length=50)
+    name = models.CharField(max_length=255)
+    region = models.CharField(max_length=50, blank=True)
+    district = models.CharField(max_length=100, blank=True)
+    country = models.CharField(max_length=50, blank=True)
+    description = models.TextField(blank=True)  # cars only, for city search
+
+    owner_verified = models.BooleanField(default=False)
+    is_active = models.BooleanField(default=True)
+    headline_price = models.DecimalField(max_digits=16, decimal_places=2, blank=True, null=True)
+    price_bucket = models.CharField(max_length=20, blank=True)
+    cover_thumbnail = models.CharField(max_length=255, blank=True)
+    cover_renditions = models.JSONField(default=dict, blank=True)  # the cover photo's renditions
+    cover_placeholder = models.TextField(blank=True)  # and its placeholder data URI
+
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = ListingIndexQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Listing Index"
+        verbose_name_plural = "Listing Index"
+        constraints = [
+            models.UniqueConstraint(fields=["vertical", "listing_id"], name="listingindex_unique_listing"),
+        ]
+        indexes = [
+            models.Index(fields=["region", "is_active", "created_at"], name="listingindex_region_idx"),
+            models.Index(fields=["district", "is_active", "created_at"], name="listingindex_district_idx"),
+            models.Index(fields=["created_at", "id"], name="listingindex_created_id_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_vertical_display()}: {self.name}"
+
+    def get_absolute_url(self):
+        return reverse(self.DETAIL_URLS[self.vertical], args=[self.listing_id])
+
+    @property
+    def price_unit(self):
+        return self.PRICE_UNITS[self.vertical]
+
+    @property
+    def cover_url(self):
+        if self.cover_thumbnail:
+            return default_storage.url(self.cover_thumbnail)
+        return None
+
+    @property
+    def placeholder(self):
+        """Cover photo placeholder, for the ``{% placeholder_style %}`` tag."""
+        return self.cover_placeholder
+
+    def rendition_url(self, size, accept=""):
+        """Cover photo URL in the best format for ``accept``, for the ``{% image_url %}`` tag."""
+        name = negotiate_rendition(self.cover_renditions, size, accept)
+        if name:
+            return default_storage.url(name)
+        return self.cover_url
+
+
+# ---------------------------------------------------
+# Facet counts
+# ---------------------------------------------------
+class FacetCountQuerySet(models.QuerySet):
+
+    @staticmethod
+    def key(row):
+        """The facet cell a ListingIndex row is counted in, or ``None`` if it is not public."""
+        if row is None or not row.is_active:
+            return None
+        return {
+            "vertical": row.vertical,
+            "listing_type": row.listing_type,
+            "region": row.region,
+            "price_bucket": row.price_bucket,
+            "owner_verified": row.owner_verified,
+        }
+
+    def adjust(self, key, delta):
+        if key is None:
+            return
+        updated = self.filter(**key).update(count=F("count") + delta)
+        if not updated and delta > 0:
+            try:
+                with transaction.atomic():
+                    self.create(count=delta, **key)
+            except IntegrityError:
+                # Another request created the cell first
+                self.filter(**key).update(count=F("count") + delta)
+
+    def move(self, old_row, new_row):
+        """Move one listing's count from the cell of ``old_row`` to the cell of ``new_row``."""
+        old_key, new_key = self.key(old_row), self.key(new_row)
+        if old_key == new_key:
+            return
+        self.adjust(old_key, -1)
+        self.adjust(new_key, 1)
+
+    def rebuild(self):
+        """Recount every cell from ListingIndex with one grouped query."""
+        fields = ("vertical", "listing_type", "region", "price_bucket", "owner_verified")
+        cells = (
+            ListingIndex.objects.filter(is_active=True)
+            .values(*fields)
+            .annotate(total=Count("id"))
+            .order_by()
+        )
+        with transaction.atomic():
+            self.all().delete()
+            self.bulk_create(
+                FacetCount(count=cell.pop("total"), **cell) for cell in cells
+            )
+
+
+class FacetCount(models.Model):
+    """
+    Number of active listings per (vertical, type, region, price bucket,
+    owner verified) cell.
+
+    Kept up to date incrementally as ListingIndex rows move between cells,
+    so facet counts for a listing page come from one read of this small
+    table instead of a COUNT query per option.
+    """
+    vertical = models.CharField(max_length=20, choices=ListingIndex.VERTICAL_CHOICES)
+    listing_type = models.CharField(max_length=50)
+    region = models.CharField(max_length=50, blank=True)
+    price_bucket = models.CharField(max_length=20, blank=True)
+    owner_verified = models.BooleanField(default=False)
+    count = models.IntegerField(default=0)
+
+    objects = FacetCountQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["vertical", "listing_type", "region", "price_bucket", "owner_verified"],
+                name="facetcount_unique_cell",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.vertical}/{self.listing_type}/{self.region}/{self.price_bucket}: {self.count}"
+
+
+# ---------------------------------------------------
+# Stored photo files
+# ---------------------------------------------------
+class MediaBlobQuerySet(models.QuerySet):
+
+    def acquire(self, name):
+        """Count one more photo row using the file ``name`` and return its blob."""
+        if not self.filter(name=name).update(refcount=F("refcount") + 1):
+            try:
+                with transaction.atomic():
+                    return self.create(name=name, refcount=1)
+            except IntegrityError:
+                # Another upload of the same bytes created it first
+                self.filter(name=name).update(refcount=F("refcount") + 1)
+        return self.get(name=name)
+
+    def release(self, name):
+        self.filter(name=name, refcount__gt=0).update(refcount=F("refcount") - 1)
+
+
+class MediaBlob(models.Model):
+    """
+    One stored photo file and the number of photo rows (booking, residence
+    or car) that point at it.
+
+    With ``core.storage.ContentAddressedStorage`` identical uploads share a
+    file name, so the count can be above one, and the renditions written for
+    the first upload are reused by the rest. Files whose count drops to zero
+    stay on disk until the ``clean_media`` command removes them.
+    """
+    name = models.CharField(max_length=255, unique=True)
+    refcount = models.PositiveIntegerField(default=0)
+    renditions = models.JSONField(default=dict, blank=True)
+    placeholder = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = MediaBlobQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.name} x{self.refcount}"
+
+
+# ---------------------------------------------------
+# Photo processing jobs
+# ---------------------------------------------------
+class ImageJobQuerySet(models.QuerySet):
+
+    def enqueue(self, photo):
+        return self.create(
+            photo_type=ContentType.objects.get_for_model(photo),
+            photo_id=photo.pk,
+            image_name=photo.image.name,
+        )
+
+    def due(self):
+        return self.filter(status="pending", run_after__lte=timezone.now())
+
+
+class ImageJob(models.Model):
+    """
+    Renditions still to be written for one uploaded listing photo.
+
+    Queued by ``core.images.RenditionsMixin`` and worked off by the
+    ``process_image_jobs`` command, which resizes in a process pool.
+    """
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    MAX_ATTEMPTS = 3
+    RETRY_DELAY = timedelta(minutes=1)
+
+    photo_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    photo_id = models.PositiveBigIntegerField()
+    image_name = models.CharField(max_length=255)  # the upload this job was queued for
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    objects = ImageJobQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "run_after"], name="imagejob_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.image_name} ({self.status})"
+
+    def mark_done(self):
+        self.status = "done"
+        self.attempts += 1
+        self.finished_at = timezone.now()
+        self.save(update_fields=["status", "attempts", "finished_at"])
+
+    def mark_failed(self, error):
+        self.attempts += 1
+        self.last_error = str(error)[:1000]
+        if self.attempts >= self.MAX_ATTEMPTS:
+            self.status = "failed"
+            self.finished_at = timezone.now()
+        else:
+            self.run_after = timezone.now() + self.RETRY_DELAY * self.attempts
+        self.save(update_fields=["status", "attempts", "last_error", "run_after", "finished_at"])
+
+
+# ---------------------------------------------------
+# Chunked photo uploads
+# ---------------------------------------------------
+class ChunkedUploadQuerySet(models.QuerySet):
+
+    def completed_for(self, user, ids):
+        """Finished uploads among ``ids`` that belong to ``user``; bad ids are ignored."""
+        valid = []
+        for upload_id in ids:
+            try:
+                valid.append(uuid.UUID(str(upload_id)))
+            except ValueError:
+                continue
+        return self.filter(owner=user, pk__in=valid, completed_at__isnull=False)
+
+
+class ChunkedUpload(models.Model):
+    """
+    One photo being uploaded in pieces before the add-listing form is sent.
+
+    Chunks are appended at ``offset`` to a part file under
+    ``settings.CHUNKED_UPLOAD_ROOT``. A client that loses its connection asks
+    for the current offset and carries on from there. Finished uploads are
+    turned into photo rows when the form is submitted.
+    """
+    MAX_SIZE = 20 * 1024 * 1024
+    MAX_CHUNK_SIZE = 2 * 1024 * 1024
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(blank=True, null=True)
+
+    objects = ChunkedUploadQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
+
+    @property
+    def path(self):
+        return os.path.join(settings.CHUNKED_UPLOAD_ROOT, f"{self.pk}.part")
+
+    @property
+    def is_complete(self):
+        return self.completed_at is not None
@@ -0,0 +1,82 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from attachments.models import Attachment
+from booking.models import Booking, BookingProperty, BookingPropertyPhoto, BookingPropertyPricing
+from carrental.models import CarRental, CarRentalPhoto, CarRentalPricing
+from resedence.models import ResidenceProperty, ResidencePropertyPhoto, ResidencePropertyPricing
+from .models import FacetCount, ListingIndex, MediaBlob, refresh_owner_verified
+from .stats import invalidate_owner_stats
+
+
+LISTING_MODELS = (BookingProperty, ResidenceProperty, CarRental)
+
+PHOTO_MODELS = (BookingPropertyPhoto, ResidencePropertyPhoto, CarRentalPhoto)
+
+# Child rows that feed the index (price, cover photo) -> name of the FK to the listing
+CHILD_MODELS = {
+    BookingPropertyPricing: "property",
+    BookingPropertyPhoto: "property",
+    ResidencePropertyPricing: "property",
+    ResidencePropertyPhoto: "property",
+    CarRentalPricing: "car",
+    CarRentalPhoto: "car",
+}
+
+
+def sync_listing(sender, instance, **kwargs):
+    ListingIndex.objects.sync(instance)
+
+
+def remove_listing(sender, instance, **kwargs):
+    ListingIndex.objects.remove(instance)
+
+
+def sync_parent_listing(sender, instance, **kwargs):
+    listing = getattr(instance, CHILD_MODELS[sender])
+    ListingIndex.objects.sync(listing)
+
+
+for model in LISTING_MODELS:
+    post_save.connect(sync_listing, sender=model, dispatch_uid=f"listing_index_save_{model.__name__}")
+    post_delete.connect(remove_listing, sender=model, dispatch_uid=f"listing_index_delete_{model.__name__}")
+
+for model in CHILD_MODELS:
+    post_save.connect(sync_parent_listing, sender=model, dispatch_uid=f"listing_index_child_save_{model.__name__}")
+    post_delete.connect(sync_parent_listing, sender=model, dispatch_uid=f"listing_index_child_delete_{model.__name__}")
+
+
+@receiver(post_delete, sender=ListingIndex, dispatch_uid="listing_index_release_facet")
+def release_facet_count(sender, instance, **kwargs):
+    FacetCount.objects.move(instance, None)
+
+
+@receiver([post_save, post_delete], sender=Attachment, dispatch_uid="listing_owner_verified")
+def attachment_changed(sender, instance, **kwargs):
+    refresh_owner_verified([instance.user_id])
+
+
+def release_photo_blob(sender, instance, **kwargs):
+    if instance.image:
+        MediaBlob.objects.release(instance.image.name)
+
+
+for model in PHOTO_MODELS:
+    post_delete.connect(release_photo_blob, sender=model, dispatch_uid=f"listing_photo_release_blob_{model.__name__}")
+
+
+def listing_owner_changed(sender, instance, **kwargs):
+    invalidate_owner_stats(instance.owner_id)
+
+
+for model in LISTING_MODELS:
+    post_save.connect(listing_owner_changed, sender=model, dispatch_uid=f"owner_stats_save_{model.__name__}")
+    post_delete.connect(listing_owner_changed, sender=model, dispatch_uid=f"owner_stats_delete_{model.__name__}")
+
+
+def booking_owner_changed(sender, instance, **kwargs):
+    invalidate_owner_stats(instance.property.owner_id)
+
+
+post_save.connect(booking_owner_changed, sender=Booking, dispatch_uid="owner_stats_save_booking")
+post_delete.connect(booking_owner_changed, sender=Booking, dispatch_uid="owner_stats_delete_booking")
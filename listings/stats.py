@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from booking.models import BOOKING_TOTAL_FIELDS, BookingProperty, DailyPropertyStats, OwnerStats
+from carrental.models import CarRental
+from resedence.models import ResidenceProperty
+
+
+# ---------------------------------------------------
+# Owner dashboard stats
+# ---------------------------------------------------
+# Cleared by the listing and booking save/delete hooks in signals.py; the
+# timeout only bounds how long a value computed during a concurrent write
+# can survive.
+OWNER_STATS_TIMEOUT = 10 * 60
+
+# Days of bookings in the dashboard revenue chart
+REVENUE_CHART_DAYS = 30
+
+
+def owner_stats_key(owner_id):
+    return f"owner-stats:{owner_id}"
+
+
+def compute_owner_stats(owner_id):
+    """
+    Dashboard counters for one owner: one aggregate query per listing
+    model, the three most recent residences as plain values, and booking
+    totals read from the OwnerStats and DailyPropertyStats rollups.
+    """
+    stats = ResidenceProperty.objects.filter(owner_id=owner_id).aggregate(
+        residence_count=Count("pk"),
+        available_count=Count("pk", filter=Q(status="open")),
+        hold_count=Count("pk", filter=Q(status="hold")),
+        closed_count=Count("pk", filter=Q(status="closed")),
+    )
+    stats.update(BookingProperty.objects.filter(owner_id=owner_id).aggregate(booking_count=Count("pk")))
+    stats.update(CarRental.objects.filter(owner_id=owner_id).aggregate(car_rental_count=Count("pk")))
+    stats["residence_properties"] = list(
+        ResidenceProperty.objects.filter(owner_id=owner_id)
+        .order_by("-created_at")
+        .values("pk", "property_name", "status", "created_at")[:3]
+    )
+    totals = OwnerStats.objects.filter(owner_id=owner_id).first() or OwnerStats(owner_id=owner_id)
+    stats["booking_totals"] = {field: getattr(totals, field) for field in BOOKING_TOTAL_FIELDS}
+    stats["booking_totals"]["booking_count"] = totals.booking_count
+    today = timezone.localdate()
+    stats["revenue_by_day"] = [
+        (row["day"].isoformat(), float(row["revenue"]))
+        for row in DailyPropertyStats.objects.series(owner_id, today - timedelta(days=REVENUE_CHART_DAYS - 1), today)
+    ]
+    return stats
+
+
+def owner_stats(owner_id):
+    """``compute_owner_stats`` through the cache: a single cache read when nothing changed."""
+    key = owner_stats_key(owner_id)
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_owner_stats(owner_id)
+        cache.set(key, stats, OWNER_STATS_TIMEOUT)
+    return stats
+
+
+def invalidate_owner_stats(owner_id):
+    # After commit, so a dashboard loaded meanwhile cannot cache the old counts again
+    transaction.on_commit(lambda: cache.delete(owner_stats_key(owner_id)))
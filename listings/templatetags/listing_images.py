@@ -0,0 +1,44 @@
+from django import template
+from django.utils.html import format_html
+
+from core.images import RENDITION_FORMATS
+
+
+register = template.Library()
+
+# An Accept header naming every alternative format the renditions come in
+ALL_FORMATS_ACCEPT = ",".join(f"image/{key}" for key, _, _, _ in RENDITION_FORMATS)
+
+
+@register.simple_tag(takes_context=True)
+def image_url(context, obj, size):
+    """
+    ``{% image_url photo "card" %}``: URL of a photo rendition (or of a
+    ListingIndex row's cover) in AVIF or WebP when the browser's Accept
+    header allows it, JPEG otherwise.
+
+    Marks the request so VaryOnAcceptMiddleware adds ``Vary: Accept``, but
+    only when the photo has AVIF or WebP renditions to choose between.
+    """
+    if not obj:
+        return ""
+    fallback = obj.rendition_url(size, "")
+    request = context.get("request")
+    if request is None or obj.rendition_url(size, ALL_FORMATS_ACCEPT) == fallback:
+        return fallback
+    request.vary_on_accept = True
+    return obj.rendition_url(size, request.META.get("HTTP_ACCEPT", ""))
+
+
+@register.simple_tag
+def placeholder_style(obj):
+    """
+    ``<img style="{% placeholder_style photo %}" loading="lazy" ...>``: paints
+    the photo's (or ListingIndex cover's) inline placeholder behind the image
+    until it has loaded, so cards have their final look before any image
+    request is made.
+    """
+    placeholder = getattr(obj, "placeholder", "") if obj else ""
+    if not placeholder:
+        return ""
+    return format_html("background: url('{}') center / cover no-repeat;", placeholder)
@@ -0,0 +1,548 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from io import BytesIO, StringIO
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.cache import has_vary_header
+from PIL import Image
+
+from core.images import RENDITION_FORMATS, renditions_complete
+
+from attachments.models import Attachment
+from booking.models import BookingProperty, BookingPropertyPhoto, BookingPropertyPricing
+from carrental.models import CarRental, CarRentalPhoto
+from resedence.models import ResidenceProperty
+from .jobs import process_image_jobs
+from .stats import owner_stats
+from .models import ChunkedUpload, FacetCount, ImageJob, ListingIndex, MediaBlob, refresh_owner_verified
+from .uploads import attach_uploads
+
+
+def use_temp_media_root(test):
+    """Point MEDIA_ROOT (and the other upload roots) at a throwaway directory, so renditions never land in media/."""
+    media_root = tempfile.mkdtemp()
+    test.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+    settings_override = override_settings(
+        MEDIA_ROOT=media_root,
+        CHUNKED_UPLOAD_ROOT=os.path.join(media_root, "upload_chunks"),
+        PROTECTED_MEDIA_ROOT=os.path.join(media_root, "protected"),
+    )
+    settings_override.enable()
+    test.addCleanup(settings_override.disable)
+
+
+class ListingIndexSyncTests(TestCase):
+
+    def setUp(self):
+        use_temp_media_root(self)
+        self.owner = get_user_model().objects.create_user(
+            username="owner", email="owner@example.com", password="pass12345"
+        )
+        self.hotel = BookingProperty.objects.create(
+            owner=self.owner, property_name="Kilimanjaro View", property_type="hotel",
+            address="Street", district="Moshi", region="Kilimanjaro",
+        )
+
+    def test_listing_save_and_children_update_row(self):
+        BookingPropertyPricing.objects.create(
+            property=self.hotel, base_price_per_night=75000,
+            available_from=date(2026, 1, 1), available_to=date(2026, 12, 31),
+        )
+        BookingPropertyPhoto.objects.create(property=self.hotel, image="booking_property_photos/a.jpg")
+
+        row = ListingIndex.objects.get(vertical="booking", listing_id=self.hotel.pk)
+        self.assertEqual(row.region, "Kilimanjaro")
+        self.assertEqual(row.headline_price, 75000)
+        self.assertEqual(row.cover_thumbnail, "booking_property_photos/a.jpg")
+        self.assertFalse(row.owner_verified)
+
+    def test_delete_removes_row(self):
+        BookingPropertyPhoto.objects.create(property=self.hotel, image="booking_property_photos/a.jpg")
+        self.hotel.delete()
+        self.assertFalse(ListingIndex.objects.exists())
+
+    def test_attachment_verification_updates_owner_rows(self):
+        Attachment.objects.create(
+            user=self.owner, attachment_type="passport",
+            document="attachments/images/id.jpg", is_verified=True,
+        )
+        self.assertTrue(ListingIndex.objects.get(listing_id=self.hotel.pk).owner_verified)
+
+    def test_closed_residence_is_inactive(self):
+        house = ResidenceProperty.objects.create(
+            owner=self.owner, property_name="Moshi House", property_type="house",
+            address="Road", district="Moshi", region="Kilimanjaro", status="closed",
+        )
+        self.assertFalse(ListingIndex.objects.get(vertical="residence", listing_id=house.pk).is_active)
+
+
+class CrossVerticalSearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = get_user_model().objects.create_user(
+            username="owner", email="owner@example.com", password="pass12345"
+        )
+        BookingProperty.objects.create(
+            owner=owner, property_name="Arusha Lodge", property_type="lodge",
+            address="Street", district="Arusha City", region="Arusha",
+        )
+        ResidenceProperty.objects.create(
+            owner=owner, property_name="Arusha Flat", property_type="apartment",
+            address="Road", district="Arusha City", region="Arusha",
+        )
+        CarRental.objects.create(
+            owner=owner, car_name="Land Cruiser", car_type="shuffle", registration_number="T123",
+            car_description="Four-wheel drive for safari trips",
+        )
+
+    def test_city_search_is_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("city_search", args=["arusha"]))
+            self.assertContains(response, "Arusha Lodge")
+            self.assertContains(response, "Arusha Flat")
+            self.assertNotContains(response, "Land Cruiser")
+
+    def test_city_search_matches_partial_names_and_country(self):
+        for term, expected in [
+            ("rusha", "Arusha Lodge"), ("tanzania", "Arusha Flat"),
+            ("cruiser", "Land Cruiser"), ("safari", "Land Cruiser"),
+        ]:
+            self.assertContains(self.client.get(reverse("city_search", args=[term])), expected)
+
+    def test_global_search_filters_by_type(self):
+        response = self.client.get(reverse("global_search"), {"region": "Arusha", "property_type": "apartment"})
+        self.assertContains(response, "Arusha Flat")
+        self.assertNotContains(response, "Arusha Lodge")
+
+
+class OwnerVerifiedTests(TestCase):
+
+    def setUp(self):
+        self.owner = get_user_model().objects.create_user(
+            username="owner", email="owner@example.com", password="pass12345"
+        )
+        self.attachment = Attachment.objects.create(
+            user=self.owner, attachment_type="passport", document="attachments/images/id.jpg",
+        )
+        self.hotel = BookingProperty.objects.create(
+            owner=self.owner, property_name="Zanzibar Inn", property_type="hotel",
+            address="Street", district="Stone Town", region="Zanzibar Urban/West",
+        )
+        self.car = CarRental.objects.create(
+            owner=self.owner, car_name="Noah", car_type="shuffle", registration_number="T1",
+        )
+
+    def test_new_listing_picks_up_existing_verification(self):
+        self.attachment.is_verified = True
+        self.attachment.save()
+        hotel = BookingProperty.objects.create(
+            owner=self.owner, property_name="Second Inn", property_type="hotel",
+            address="Street", district="Stone Town", region="Zanzibar Urban/West",
+        )
+        self.assertTrue(hotel.owner_verified)
+
+    def test_admin_actions_propagate_in_one_update_per_table(self):
+        from django.contrib.admin.sites import site
+        from attachments.admin import AttachmentAdmin
+
+        model_admin = AttachmentAdmin(Attachment, site)
+        with CaptureQueriesContext(connection) as ctx:
+            model_admin.mark_verified(None, Attachment.objects.all())
+        updates = [q["sql"].split('"')[1] for q in ctx.captured_queries if q["sql"].startswith("UPDATE")]
+        # Facet counts move per facet cell (out of one cell, into the other), not per listing
+        self.assertEqual(updates.count("listings_facetcount"), 4)
+        updates = [table for table in updates if table != "listings_facetcount"]
+        self.assertEqual(sorted(updates), sorted([
+            "attachments_attachment",
+            "booking_bookingproperty",
+            "resedence_residenceproperty",
+            "carrental_carrental",
+            "listings_listingindex",
+        ]))
+
+        self.hotel.refresh_from_db()
+        self.car.refresh_from_db()
+        self.assertTrue(self.hotel.owner_verified)
+        self.assertTrue(self.car.owner_verified)
+        self.assertTrue(ListingIndex.objects.filter(owner=self.owner, owner_verified=False).count() == 0)
+
+        model_admin.mark_unverified(None, Attachment.objects.filter(is_verified=True))
+        self.hotel.refresh_from_db()
+        self.assertFalse(self.hotel.owner_verified)
+
+
+class FacetCountTests(TestCase):
+
+    def setUp(self):
+        self.owner = get_user_model().objects.create_user(
+            username="owner", email="owner@example.com", password="pass12345"
+        )
+        Attachment.objects.create(
+            user=self.owner, attachment_type="passport",
+            document="attachments/images/id.jpg", is_verified=True,
+        )
+
+    def add_hotel(self, region, price):
+        hotel = BookingProperty.objects.create(
+            owner=self.owner, property_name=f"{region} Hotel", property_type="hotel",
+            address="Street", district="Town", region=region,
+        )
+        BookingPropertyPricing.objects.create(
+            property=hotel, base_price_per_night=price,
+            available_from=date(2026, 1, 1), available_to=date(2026, 12, 31),
+        )
+        return hotel
+
+    def test_counts_follow_listing_changes(self):
+        from .facets import listing_facets
+
+        arusha = self.add_hotel("Arusha", 40000)
+        self.add_hotel("Arusha", 120000)
+        self.add_hotel("Mwanza", 120000)
+
+        facets = listing_facets(["booking"], listing_type="hotel")
+        regions = dict(facets.regions)
+        self.assertEqual(regions["Arusha"], 2)
+        self.assertEqual(regions["Mwanza"], 1)
+        self.assertEqual(regions["Dodoma"], 0)
+
+        facets = listing_facets(["booking"], listing_type="hotel", region="Arusha")
+        prices = {key: count for key, _, count in facets.prices}
+        self.assertEqual(prices, {"under-50k": 1, "50k-100k": 0, "100k-250k": 1, "250k-plus": 0})
+
+        arusha.region = "Mwanza"
+        arusha.save()
+        self.assertEqual(dict(listing_facets(["booking"]).regions)["Mwanza"], 2)
+
+        arusha.delete()
+        self.assertEqual(dict(listing_facets(["booking"]).regions)["Mwanza"], 1)
+
+    def test_rebuild_matches_incremental_counts(self):
+        self.add_hotel("Arusha", 40000)
+        self.add_hotel("Tanga", 300000)
+        before = sorted(FacetCount.objects.filter(count__gt=0).values_list(
+            "region", "price_bucket", "owner_verified", "count"))
+        FacetCount.objects.rebuild()
+        after = sorted(FacetCount.objects.values_list("region", "price_bucket", "owner_verified", "count"))
+        self.assertEqual(before, after)
+
+    def test_verification_change_moves_counts_between_cells(self):
+        self.add_hotel("Arusha", 40000)
+        self.add_hotel("Tanga", 300000)
+        Attachment.objects.filter(user=self.owner).update(is_verified=False)
+        with CaptureQueriesContext(connection) as queries:
+            refresh_owner_verified([self.owner.pk])
+        # Counts move with F() updates; the table is not recounted
+        self.assertFalse([q for q in queries if q["sql"].startswith("DELETE")])
+        counts = sorted(FacetCount.objects.filter(count__gt=0).values_list("region", "owner_verified", "count"))
+        self.assertEqual(counts, [("Arusha", False, 1), ("Tanga", False, 1)])
+
+        FacetCount.objects.rebuild()
+        self.assertEqual(
+            sorted(FacetCount.objects.values_list("region", "owner_verified", "count")), counts
+        )
+
+
+class ListingIndexBackfillTests(TransactionTestCase):
+
+    def test_migration_indexes_and_counts_existing_listings(self):
+        call_command("migrate", "listings", "0007_photo_placeholder", verbosity=0)
+        owner = get_user_model().objects.create_user(
+            username="owner", email="owner@example.com", password="pass12345"
+        )
+        hotel = BookingProperty.objects.create(
+            owner=owner, property_name="Arusha Lodge", property_type="lodge",
+            address="Street", district="Arusha City", region="Arusha",
+        )
+        BookingPropertyPricing.objects.create(
+            property=hotel, base_price_per_night=75000,
+            available_from=date(2026, 1, 1), available_to=date(2026, 12, 31),
+        )
+        # As on a database that had listings before the index existed
+        ListingIndex.objects.all().delete()
+        FacetCount.objects.all().delete()
+
+        call_command("migrate", "listings", verbosity=0)
+
+        self.assertTrue(ListingIndex.objects.filter(vertical="booking", listing_id=hotel.pk).exists())
+        cells = FacetCount.objects.filter(vertical="booking", listing_type="lodge", region="Arusha")
+        self.assertEqual(list(cells.values_list("price_bucket", "count")), [("50k-100k", 1)])
+
+
+class PhotoRenditionTests(TestCase):
+
+    def setUp(self):
+        use_temp_media_root(self)
+        owner = get_user_model().objects.create_user(
+            username="owner", email="owner@example.com", password="pass12345"
+        )
+        self.hotel = BookingProperty.objects.create(
+            owner=owner, property_name="Serengeti Camp", property_type="hotel",
+            address="Street", district="Serengeti", region="Mara",
+        )
+
+    def upload(self, name="big.png", size=(3000, 2000)):
+        buffer = BytesIO()
+        Image.new("RGB", size, "orange").save(buffer, "PNG")
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+    def test_upload_queues_a_job_and_worker_writes_every_rendition(self):
+        photo = BookingPropertyPhoto.objects.create(property=self.hotel, image=self.upload())
+        self.assertEqual(photo.renditions, {})
+        self.assertEqual(ImageJob.objects.get().status, "pending")
+
+        self.assertEqual(process_image_jobs(), 1)
+
+        photo.refresh_from_db()
+        self.assertEqual(ImageJob.objects.get().status, "done")
+        self.assertTrue({"card", "gallery", "preview"} <= set(photo.renditions))
+        self.assertTrue(renditions_complete(photo.renditions))
+        storage = photo.image.storage
+        with storage.open(photo.renditions["card"]) as card:
+            self.assertEqual(Image.open(card).size, (640, 427))
+        with storage.open(photo.renditions["preview"]) as preview:
+            self.assertEqual(Image.open(preview).size, (200, 133))
+        self.assertEqual(photo.card_url, storage.url(photo.renditions["card"]))
+        self.assertNotEqual(photo.card_url, photo.image.url)
+
+        row = ListingIndex.objects.get(vertical="booking", listing_id=self.hotel.pk)
+        self.assertEqual(row.cover_thumbnail, photo.renditions["card"])
+
+        self.assertTrue(photo.placeholder.startswith("data:image/jpeg;base64,"))
+        self.assertLess(len(photo.placeholder), 1000)
+        self.assertEqual(row.cover_placeholder, photo.placeholder)
+
+    def test_unreadable_upload_falls_back_to_original(self):
+        broken = SimpleUploadedFile("broken.jpg", b"not an image", content_type="image/jpeg")
+        photo = BookingPropertyPhoto(property=self.hotel, image=broken)
+        # ImageField only validates in forms, so the model save goes through
+        photo.save()
+        process_image_jobs()
+
+        photo.refresh_from_db()
+        self.assertEqual(photo.renditions, {})
+        self.assertEqual(photo.card_url, photo.image.url)
+
+    def test_process_pool_renders_a_batch_in_parallel(self):
+        photos = [
+            BookingPropertyPhoto.objects.create(property=self.hotel, image=self.upload(f"p{i}.png", (1200, 900)))
+            for i in range(4)
+        ]
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            self.assertEqual(process_image_jobs(pool=pool), 4)
+
+        for photo in photos:
+            photo.refresh_from_db()
+            self.assertTrue(renditions_complete(photo.renditions))
+        self.assertFalse(ImageJob.objects.exclude(status="done").exists())
+
+    def test_identical_uploads_share_one_file_and_its_renditions(self):
+        car = CarRental.objects.create(owner=self.hotel.owner, car_name="Land Cruiser", car_type="shuffle")
+        first = BookingPropertyPhoto.objects.create(property=self.hotel, image=self.upload("front.png"))
+        process_image_jobs()
+        second = CarRentalPhoto.objects.create(car=car, image=self.upload("copy-of-front.png"))
+
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertTrue(first.image.name.startswith("photos/"))
+        blob = MediaBlob.objects.get(name=first.image.name)
+        self.assertEqual(blob.refcount, 2)
+        # The duplicate reused the renditions instead of queueing work
+        first.refresh_from_db()
+        self.assertEqual(second.renditions, first.renditions)
+        self.assertEqual(second.placeholder, first.placeholder)
+        self.assertEqual(ImageJob.objects.count(), 1)
+
+        second.delete()
+        blob.refresh_from_db()
+        self.assertEqual(blob.refcount, 1)
+        self.assertTrue(first.image.storage.exists(first.image.name))
+
+    def test_image_url_tag_picks_format_from_accept_header(self):
+        BookingPropertyPricing.objects.create(
+            property=self.hotel, base_price_per_night=75000,
+            available_from=date(2026, 1, 1), available_to=date(2026, 12, 31),
+        )
+        BookingPropertyPhoto.objects.create(property=self.hotel, image=self.upload())
+        url = reverse("global_search")
+        # Only the original so far: nothing to negotiate, so caches need not split the page
+        self.assertFalse(has_vary_header(self.client.get(url, {"region": "Mara"}), "Accept"))
+        process_image_jobs()
+        row = ListingIndex.objects.get(vertical="booking", listing_id=self.hotel.pk)
+
+        plain = self.client.get(url, {"region": "Mara"}, HTTP_ACCEPT="text/html,*/*;q=0.8")
+        self.assertContains(plain, default_storage.url(row.cover_renditions["card"]))
+        self.assertContains(plain, f"background: url('{row.cover_placeholder}')")
+        self.assertContains(plain, 'loading="lazy"')
+        self.assertIn("Accept", plain["Vary"])
+
+        for key, _, _, _ in RENDITION_FORMATS:
+            response = self.client.get(url, {"region": "Mara"}, HTTP_ACCEPT=f"text/html,image/{key},*/*;q=0.8")
+            self.assertContains(response, default_storage.url(row.cover_renditions[f"card.{key}"]))
+
+
+class ChunkedUploadTests(TestCase):
+
+    def setUp(self):
+        use_temp_media_root(self)
+        self.owner = get_user_model().objects.create_user(
+            username="owner", email="owner@example.com", password="pass12345"
+        )
+        self.client.force_login(self.owner)
+        buffer = BytesIO()
+        Image.new("RGB", (400, 300), "teal").save(buffer, "PNG")
+        self.data = buffer.getvalue()
+
+    def send(self, upload_id, offset, chunk, **headers):
+        return self.client.post(
+            reverse("upload_chunk", args=[upload_id]), chunk,
+            content_type="application/octet-stream", HTTP_UPLOAD_OFFSET=str(offset), **headers,
+        )
+
+    def test_resumed_upload_is_attached_as_a_photo(self):
+        start = self.client.post(reverse("upload_start"), {"filename": "front.png", "size": len(self.data)})
+        self.assertEqual(start.status_code, 201)
+        upload_id = start.json()["id"]
+        half = len(self.data) // 2
+
+        response = self.send(upload_id, 0, self.data[:half], HTTP_X_CHUNK_SHA256=hashlib.sha256(self.data[:half]).hexdigest())
+        self.assertEqual(response.json()["offset"], half)
+        # A retried chunk after a lost response, and a corrupted one, are both refused
+        self.assertEqual(self.send(upload_id, 0, self.data[:half]).json()["offset"], half)
+        corrupted = self.send(upload_id, half, self.data[half:], HTTP_X_CHUNK_SHA256="0" * 64)
+        self.assertEqual((corrupted.status_code, corrupted.json()["offset"]), (409, half))
+
+        status = self.client.get(reverse("upload_status", args=[upload_id])).json()
+        self.assertEqual(self.send(upload_id, status["offset"], self.data[half:]).json()["complete"], True)
+
+        car = CarRental.objects.create(owner=self.owner, car_name="Land Cruiser", car_type="shuffle")
+        upload = ChunkedUpload.objects.get()
+        (photo,) = attach_uploads(self.owner, [upload_id, "not-a-uuid"], CarRentalPhoto, car=car)
+        with photo.image.open("rb") as stored:
+            self.assertEqual(stored.read(), self.data)
+        self.assertFalse(ChunkedUpload.objects.exists())
+        self.assertFalse(os.path.exists(upload.path))
+
+    def test_finished_uploads_survive_a_form_with_errors(self):
+        upload_id = self.client.post(
+            reverse("upload_start"), {"filename": "front.png", "size": len(self.data)}
+        ).json()["id"]
+        self.send(upload_id, 0, self.data)
+
+        response = self.client.post(reverse("add_car_rental"), {"upload_id": [upload_id]})
+
+        self.assertFalse(response.context["success"])
+        self.assertContains(response, f'name="upload_id" value="{upload_id}"')
+        self.assertContains(response, "Already uploaded: front.png")
+        self.assertTrue(ChunkedUpload.objects.filter(pk=upload_id).exists())
+
+    def test_other_users_cannot_write_to_an_upload(self):
+        upload_id = self.client.post(reverse("upload_start"), {"filename": "a.png", "size": 10}).json()["id"]
+        self.client.force_login(get_user_model().objects.create_user(
+            username="other", email="other@example.com", password="pass12345"
+        ))
+        self.assertEqual(self.send(upload_id, 0, b"0123456789").status_code, 404)
+        self.assertEqual(attach_uploads(self.owner, [upload_id], CarRentalPhoto), [])
+
+
+class CleanMediaTests(TestCase):
+
+    def setUp(self):
+        use_temp_media_root(self)
+        owner = get_user_model().objects.create_user(
+            username="owner", email="owner@example.com", password="pass12345"
+        )
+        self.car = CarRental.objects.create(owner=owner, car_name="Land Cruiser", car_type="shuffle")
+
+    def photo(self, colour):
+        buffer = BytesIO()
+        Image.new("RGB", (800, 600), colour).save(buffer, "PNG")
+        photo = CarRentalPhoto.objects.create(car=self.car, image=SimpleUploadedFile(f"{colour}.png", buffer.getvalue()))
+        process_image_jobs()
+        photo.refresh_from_db()
+        return photo
+
+    def clean(self, *args):
+        out = StringIO()
+        call_command("clean_media", "--min-age", "0", *args, stdout=out)
+        return out.getvalue()
+
+    def test_deleted_photo_files_are_reported_then_removed(self):
+        kept, deleted = self.photo("red"), self.photo("blue")
+        storage = kept.image.storage
+        deleted_files = [deleted.image.name, *deleted.renditions.values()]
+        stray = storage.save("car_rental_photos/old-upload.jpg", SimpleUploadedFile("x.jpg", b"x"))
+        deleted.delete()
+
+        report = self.clean()
+        self.assertIn(f"Found {len(deleted_files) + 1} orphaned media file(s)", report)
+        self.assertTrue(all(storage.exists(name) for name in deleted_files))
+
+        self.clean("--delete")
+        self.assertFalse(any(storage.exists(name) for name in [stray, *deleted_files]))
+        self.assertTrue(all(storage.exists(name) for name in [kept.image.name, *kept.renditions.values()]))
+        self.assertEqual(list(MediaBlob.objects.values_list("name", flat=True)), [kept.image.name])
+
+    def test_identity_documents_are_never_collected(self):
+        card = default_storage.save("nida_cards/card.jpg", SimpleUploadedFile("card.jpg", b"id"))
+        self.assertIn("Found 0 orphaned media file(s)", self.clean())
+        self.clean("--delete")
+        self.assertTrue(default_storage.exists(card))
+
+    def test_recent_files_are_left_alone(self):
+        self.photo("green").delete()
+        out = StringIO()
+        call_command("clean_media", "--delete", stdout=out)
+        self.assertIn("Deleted 0 orphaned media file(s)", out.getvalue())
+
+
+class OwnerStatsTests(TestCase):
+
+    def setUp(self):
+        self.owner = get_user_model().objects.create_user(
+            username="owner", email="owner@example.com", password="pass12345"
+        )
+        self.addCleanup(cache.clear)
+
+    def residence(self, name, status):
+        with self.captureOnCommitCallbacks(execute=True):
+            return ResidenceProperty.objects.create(
+                owner=self.owner, property_name=name, property_type="apartment", status=status,
+                address="Street", district="Ilala", region="Dar es Salaam",
+            )
+
+    def test_counts_are_cached_until_a_listing_changes(self):
+        self.residence("Sea View", "open")
+        self.residence("Old Town", "hold")
+
+        # Four listing aggregates plus the two booking rollup reads, besides the cache table
+        with CaptureQueriesContext(connection) as ctx:
+            stats = owner_stats(self.owner.pk)
+        queries = [q["sql"] for q in ctx.captured_queries if "django_cache" not in q["sql"]]
+        self.assertEqual(len([sql for sql in queries if "SAVEPOINT" not in sql]), 6)
+        self.assertEqual(
+            (stats["residence_count"], stats["available_count"], stats["hold_count"], stats["closed_count"]),
+            (2, 1, 1, 0),
+        )
+        self.assertEqual(stats["residence_properties"][0]["property_name"], "Old Town")
+        # A cached read is the one cache lookup
+        with self.assertNumQueries(1):
+            owner_stats(self.owner.pk)
+
+        closed = self.residence("Hill Top", "closed")
+        self.assertEqual(owner_stats(self.owner.pk)["closed_count"], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            closed.delete()
+        self.assertEqual(owner_stats(self.owner.pk)["residence_count"], 2)
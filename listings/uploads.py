@@ -0,0 +1,107 @@
+import hashlib
+import os
+
+from django.core.files import File
+from django.utils import timezone
+from PIL import Image, UnidentifiedImageError
+
+from .models import ChunkedUpload
+
+
+READ_SIZE = 64 * 1024
+
+
+class ChunkRejected(Exception):
+    """The chunk does not fit the upload; ``offset`` is where the client should resume."""
+
+    def __init__(self, message, offset):
+        super().__init__(message)
+        self.offset = offset
+
+
+def start_upload(user, filename, size):
+    if size <= 0 or size > ChunkedUpload.MAX_SIZE:
+        raise ValueError(f"Photos must be between 1 byte and {ChunkedUpload.MAX_SIZE // (1024 * 1024)} MB.")
+    upload = ChunkedUpload.objects.create(owner=user, filename=os.path.basename(filename)[:255], size=size)
+    os.makedirs(os.path.dirname(upload.path), exist_ok=True)
+    open(upload.path, "wb").close()
+    return upload
+
+
+def write_chunk(upload, offset, stream, checksum=""):
+    """
+    Append the bytes of ``stream`` to ``upload`` at ``offset``.
+
+    The chunk is read and hashed in small pieces as it is written, so memory
+    use does not depend on the chunk size. If the client sent a SHA-256
+    ``checksum`` that does not match, the chunk is dropped and has to be sent
+    again. Returns the new offset.
+    """
+    if upload.is_complete:
+        raise ChunkRejected("Upload already complete.", upload.offset)
+    if offset != upload.offset:
+        raise ChunkRejected("Chunk does not start at the current offset.", upload.offset)
+
+    digest = hashlib.sha256()
+    written = 0
+    with open(upload.path, "r+b") as part:
+        part.seek(offset)
+        while True:
+            piece = stream.read(READ_SIZE)
+            if not piece:
+                break
+            written += len(piece)
+            if written > ChunkedUpload.MAX_CHUNK_SIZE or offset + written > upload.size:
+                raise ChunkRejected("Chunk is larger than allowed.", upload.offset)
+            digest.update(piece)
+            part.write(piece)
+
+    if checksum and checksum.lower() != digest.hexdigest():
+        raise ChunkRejected("Chunk checksum mismatch.", upload.offset)
+
+    new_offset = offset + written
+    completed_at = timezone.now() if new_offset == upload.size else None
+    # Only one request can move the upload past a given offset
+    moved = ChunkedUpload.objects.filter(pk=upload.pk, offset=offset).update(
+        offset=new_offset, completed_at=completed_at
+    )
+    if not moved:
+        upload.refresh_from_db()
+        raise ChunkRejected("Chunk was already received.", upload.offset)
+
+    upload.offset, upload.completed_at = new_offset, completed_at
+    if completed_at:
+        # The file ends where the last chunk ended
+        os.truncate(upload.path, new_offset)
+    return new_offset
+
+
+def attach_uploads(user, upload_ids, photo_model, **parent):
+    """
+    Turn ``user``'s finished uploads among ``upload_ids`` into
+    ``photo_model`` rows for ``parent`` (e.g. ``property=property_obj``).
+
+    Files that are not images are skipped. Part files and upload rows are
+    removed either way. Returns the created photos.
+    """
+    photos = []
+    for upload in ChunkedUpload.objects.completed_for(user, upload_ids):
+        try:
+            with Image.open(upload.path) as image:
+                image.verify()
+            with open(upload.path, "rb") as part:
+                photos.append(photo_model.objects.create(image=File(part, name=upload.filename), **parent))
+        except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+            pass
+        finally:
+            if os.path.exists(upload.path):
+                os.remove(upload.path)
+            upload.delete()
+    return photos
+
+
+def kept_uploads(request):
+    """Finished uploads posted with an add-listing form, re-rendered as hidden fields if it has errors."""
+    if request.method != "POST" or not request.user.is_authenticated:
+        return ChunkedUpload.objects.none()
+    return ChunkedUpload.objects.completed_for(request.user, request.POST.getlist("upload_id"))
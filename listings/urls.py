@@ -0,0 +1,8 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('', views.upload_start, name='upload_start'),
+    path('<uuid:upload_id>/', views.upload_status, name='upload_status'),
+    path('<uuid:upload_id>/chunk/', views.upload_chunk, name='upload_chunk'),
+]
@@ -0,0 +1,61 @@
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_GET, require_POST
+
+from .models import ChunkedUpload
+from .uploads import ChunkRejected, start_upload, write_chunk
+
+
+# ---------------------------------------------------
+# Chunked photo uploads
+# ---------------------------------------------------
+# The add-listing pages send each photo here in pieces (see
+# static/customer/js/chunked-upload.js), then submit the form with the
+# upload ids instead of the files.
+def _upload_state(upload):
+    return {
+        "id": str(upload.pk),
+        "offset": upload.offset,
+        "size": upload.size,
+        "complete": upload.is_complete,
+    }
+
+
+@login_required
+@require_POST
+def upload_start(request):
+    try:
+        size = int(request.POST.get("size", ""))
+        upload = start_upload(request.user, request.POST.get("filename", "") or "photo", size)
+    except ValueError as exc:
+        return JsonResponse({"error": str(exc) or "Invalid size."}, status=400)
+    return JsonResponse(_upload_state(upload), status=201)
+
+
+@login_required
+@require_GET
+def upload_status(request, upload_id):
+    upload = get_object_or_404(ChunkedUpload, pk=upload_id, owner=request.user)
+    return JsonResponse(_upload_state(upload))
+
+
+@login_required
+@require_POST
+def upload_chunk(request, upload_id):
+    """
+    Body: the raw bytes of one chunk. ``Upload-Offset`` says where it starts;
+    an optional ``X-Chunk-SHA256`` is checked against the received bytes.
+    Answers 409 with the offset to resume from if the chunk does not fit.
+    """
+    upload = get_object_or_404(ChunkedUpload, pk=upload_id, owner=request.user)
+    try:
+        offset = int(request.headers.get("Upload-Offset", ""))
+    except ValueError:
+        return JsonResponse({"error": "Upload-Offset header required.", **_upload_state(upload)}, status=400)
+
+    try:
+        write_chunk(upload, offset, request, request.headers.get("X-Chunk-SHA256", ""))
+    except ChunkRejected as exc:
+        return JsonResponse({"error": str(exc), **_upload_state(upload), "offset": exc.offset}, status=409)
+    return JsonResponse(_upload_state(upload))
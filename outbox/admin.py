@@ -0,0 +1,34 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import OutboxBatch, OutboxEmail
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ("subject", "recipient_list", "status", "attempts", "next_attempt_at", "sent_at", "created_at")
+    list_filter = ("status",)
+    search_fields = ("subject", "recipients")
+    readonly_fields = ("attempts", "last_error", "created_at", "sent_at")
+    ordering = ("-created_at",)
+    actions = ["retry_now"]
+
+    def recipient_list(self, obj):
+        return ", ".join(obj.recipients)
+
+    recipient_list.short_description = "To"
+
+    @admin.action(description="Retry selected emails now")
+    def retry_now(self, request, queryset):
+        queryset.exclude(status="sent").update(status="pending", attempts=0, next_attempt_at=timezone.now())
+
+
+@admin.register(OutboxBatch)
+class OutboxBatchAdmin(admin.ModelAdmin):
+    list_display = ("started_at", "sent", "retried", "failed", "duration_ms", "avg_latency_ms")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
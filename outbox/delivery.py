@@ -0,0 +1,82 @@
+import time
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxBatch, OutboxEmail
+
+
+# How long a claimed email is hidden from other workers. If a worker dies
+# mid-batch, its emails become due again after this and are retried.
+CLAIM_LEASE = timedelta(minutes=5)
+
+
+def claim_batch(batch_size):
+    """Take up to ``batch_size`` due emails, so concurrent workers never pick the same ones."""
+    with transaction.atomic():
+        ids = list(
+            OutboxEmail.objects.due()
+            .select_for_update(skip_locked=True)
+            .order_by("next_attempt_at", "pk")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        OutboxEmail.objects.filter(pk__in=ids).update(next_attempt_at=timezone.now() + CLAIM_LEASE)
+    return list(OutboxEmail.objects.filter(pk__in=ids).order_by("pk"))
+
+
+def deliver_batch(batch_size=50):
+    """
+    Send one batch of due emails over a single SMTP connection.
+
+    Returns the OutboxBatch with the delivery numbers, or ``None`` when
+    nothing was due.
+    """
+    emails = claim_batch(batch_size)
+    if not emails:
+        return None
+
+    started_at = timezone.now()
+    started = time.monotonic()
+    batch = OutboxBatch(started_at=started_at)
+    latencies = []
+
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as exc:
+        # Could not reach the mail server: every email waits for a retry
+        for email in emails:
+            email.mark_failed(exc)
+    else:
+        for email in emails:
+            message = EmailMessage(
+                email.subject,
+                email.message,
+                email.from_email or None,
+                email.recipients,
+                connection=connection,
+            )
+            try:
+                message.send()
+            except Exception as exc:
+                email.mark_failed(exc)
+            else:
+                email.mark_sent()
+                latencies.append((email.sent_at - email.created_at).total_seconds() * 1000)
+    finally:
+        connection.close()
+
+    for email in emails:
+        if email.status == "sent":
+            batch.sent += 1
+        elif email.status == "failed":
+            batch.failed += 1
+        else:
+            batch.retried += 1
+    if latencies:
+        batch.avg_latency_ms = int(sum(latencies) / len(latencies))
+    batch.duration_ms = int((time.monotonic() - started) * 1000)
+    batch.save()
+    return batch
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from outbox.delivery import deliver_batch
+
+
+class Command(BaseCommand):
+    help = "Send queued emails from the outbox, one SMTP connection per batch."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument(
+            "--loop", action="store_true",
+            help="Keep running and poll for new emails instead of exiting when the outbox is empty.",
+        )
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds to wait between polls with --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            batch = deliver_batch(options["batch_size"])
+            if batch:
+                self.stdout.write(str(batch))
+                continue
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+        self.stdout.write(self.style.SUCCESS("Outbox is empty."))
@@ -0,0 +1,120 @@
+from datetime import timedelta
+
+from django.db import models
+from django.utils import timezone
+
+
+# ---------------------------------------------------
+# Queued outgoing email
+# ---------------------------------------------------
+class OutboxEmailQuerySet(models.QuerySet):
+
+    def queue(self, subject, message, recipient_list, from_email=None):
+        """
+        Store an email for the ``send_outbox`` worker instead of sending it
+        inside the request.
+        """
+        return self.create(
+            subject=subject,
+            message=message,
+            from_email=from_email or "",
+            recipients=list(recipient_list),
+        )
+
+    def queue_many(self, emails, from_email=None):
+        """``queue`` for many ``(subject, message, recipient_list)`` emails in one INSERT."""
+        return self.bulk_create(
+            OutboxEmail(
+                subject=subject,
+                message=message,
+                from_email=from_email or "",
+                recipients=list(recipient_list),
+            )
+            for subject, message, recipient_list in emails
+        )
+
+    def due(self):
+        return self.filter(status="pending", next_attempt_at__lte=timezone.now())
+
+
+class OutboxEmail(models.Model):
+    """
+    One email waiting to be sent, sent, or given up on.
+
+    Failed sends are retried with exponential backoff (``RETRY_BASE``
+    doubled per attempt, capped at ``RETRY_MAX``) until ``MAX_ATTEMPTS``.
+    """
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    MAX_ATTEMPTS = 5
+    RETRY_BASE = timedelta(minutes=1)
+    RETRY_MAX = timedelta(hours=1)
+
+    subject = models.CharField(max_length=255)
+    message = models.TextField()
+    from_email = models.CharField(max_length=255, blank=True)  # blank = DEFAULT_FROM_EMAIL
+    recipients = models.JSONField(default=list)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    objects = OutboxEmailQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Outbox Email"
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="outbox_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)} ({self.status})"
+
+    def mark_sent(self):
+        self.status = "sent"
+        self.sent_at = timezone.now()
+        self.attempts += 1
+        self.last_error = ""
+        self.save(update_fields=["status", "sent_at", "attempts", "last_error"])
+
+    def mark_failed(self, error):
+        """Record a failed attempt and schedule the next one, or give up."""
+        self.attempts += 1
+        self.last_error = str(error)[:1000]
+        if self.attempts >= self.MAX_ATTEMPTS:
+            self.status = "failed"
+        else:
+            delay = min(self.RETRY_BASE * 2 ** (self.attempts - 1), self.RETRY_MAX)
+            self.next_attempt_at = timezone.now() + delay
+        self.save(update_fields=["status", "attempts", "last_error", "next_attempt_at"])
+
+
+# ---------------------------------------------------
+# Delivery metrics
+# ---------------------------------------------------
+class OutboxBatch(models.Model):
+    """Delivery numbers for one run of the outbox worker over a batch."""
+    started_at = models.DateTimeField()
+    duration_ms = models.PositiveIntegerField(default=0)
+    sent = models.PositiveIntegerField(default=0)
+    retried = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    # Average time from queueing to delivery for the emails sent in this batch
+    avg_latency_ms = models.PositiveIntegerField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = "Outbox Batch"
+        verbose_name_plural = "Outbox Batches"
+        ordering = ["-started_at"]
+
+    def __str__(self):
+        return f"{self.started_at:%Y-%m-%d %H:%M:%S}: {self.sent} sent, {self.retried} retried, {self.failed} failed"
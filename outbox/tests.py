@@ -0,0 +1,81 @@
+from datetime import timedelta
+from smtplib import SMTPServerDisconnected
+
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from .delivery import deliver_batch
+from .models import OutboxBatch, OutboxEmail
+
+
+class FlakyBackend(EmailBackend):
+    """locmem backend that refuses one recipient, to exercise retries."""
+
+    opened = 0
+
+    def open(self):
+        FlakyBackend.opened += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        if any("bounce@example.com" in m.to for m in messages):
+            raise SMTPServerDisconnected("connection dropped")
+        return super().send_messages(messages)
+
+
+@override_settings(EMAIL_BACKEND="outbox.tests.FlakyBackend")
+class OutboxDeliveryTests(TestCase):
+
+    def setUp(self):
+        FlakyBackend.opened = 0
+
+    def test_batch_is_sent_over_one_connection(self):
+        for i in range(3):
+            OutboxEmail.objects.queue("Hello", "Body", [f"user{i}@example.com"], from_email="from@example.com")
+
+        batch = deliver_batch()
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(FlakyBackend.opened, 1)
+        self.assertEqual((batch.sent, batch.retried, batch.failed), (3, 0, 0))
+        self.assertFalse(OutboxEmail.objects.exclude(status="sent").exists())
+        self.assertIsNone(deliver_batch())
+
+    def test_failed_send_is_retried_with_backoff_then_given_up(self):
+        email = OutboxEmail.objects.queue("Hello", "Body", ["bounce@example.com"])
+
+        batch = deliver_batch()
+        email.refresh_from_db()
+        self.assertEqual((batch.sent, batch.retried), (0, 1))
+        self.assertEqual((email.status, email.attempts), ("pending", 1))
+        self.assertGreater(email.next_attempt_at, timezone.now() + timedelta(seconds=50))
+        self.assertIn("connection dropped", email.last_error)
+
+        # Not due yet
+        self.assertIsNone(deliver_batch())
+
+        for _ in range(OutboxEmail.MAX_ATTEMPTS - 1):
+            OutboxEmail.objects.update(next_attempt_at=timezone.now())
+            deliver_batch()
+        email.refresh_from_db()
+        self.assertEqual(email.status, "failed")
+        self.assertEqual(OutboxBatch.objects.latest("pk").failed, 1)
+
+
+class ResendOtpTests(TestCase):
+
+    def test_resend_otp_queues_instead_of_sending(self):
+        user = get_user_model().objects.create_user(
+            username="guest", email="guest@example.com", password="pass12345"
+        )
+        response = self.client.post(reverse("resend-otp"), {"otp_email": user.email})
+
+        self.assertRedirects(response, reverse("verify-email", args=[user.username]))
+        self.assertEqual(len(mail.outbox), 0)
+        queued = OutboxEmail.objects.get()
+        self.assertEqual(queued.recipients, ["guest@example.com"])
+        self.assertIn(user.otps.last().otp_code, queued.message)
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resedence', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='residenceproperty',
+            index=models.Index(fields=['created_at', 'id'], name='residenceprop_created_id_idx'),
+        ),
+    ]
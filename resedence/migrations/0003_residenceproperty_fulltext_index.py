@@ -0,0 +1,17 @@
+from django.db import migrations
+
+from core.search import create_fulltext_index
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resedence', '0002_residenceproperty_residenceprop_created_id_idx'),
+    ]
+
+    operations = [
+        create_fulltext_index(
+            'resedence_residenceproperty',
+            ['property_name', 'property_description', 'address', 'district', 'region'],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resedence', '0004_residenceproperty_owner_verified_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='residencepropertyphoto',
+            name='renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:52
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resedence', '0005_residencepropertyphoto_renditions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='residencepropertyphoto',
+            name='image',
+            field=models.ImageField(storage=core.storage.ContentAddressedStorage(), upload_to='residence_property_photos/'),
+        ),
+    ]
@@ -3,8 +3,18 @@ from django.conf import settings
 
 from django.db import models
 from django.conf import settings
+from core.images import RenditionsMixin
+from core.storage import photo_storage
+from core.listings import ListingQuerySet, CoverPhotoMixin, OwnerVerifiedMixin
 
-class ResidenceProperty(models.Model):
+
+class ResidencePropertyQuerySet(ListingQuerySet):
+    listing_related = ("residencepropertypricing", "residencepropertysetup")
+    search_fields = ("property_name", "property_description", "address", "district", "region")
+    search_weights = (10.0, 1.0, 2.0, 4.0, 4.0)
+
+
+class ResidenceProperty(OwnerVerifiedMixin, CoverPhotoMixin, models.Model):
     PROPERTY_TYPE_CHOICES = [
         ('apartment', 'Apartment'),
         ('house', 'House'),
@@ -52,9 +62,19 @@ class ResidenceProperty(models.Model):
 
     # System
     status = models.CharField(max_length=20, choices=RESEDENCE_STATUS_CHOICES, default='open')
+    owner_verified = models.BooleanField(default=False, editable=False)  # owner has a verified attachment
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ResidencePropertyQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Keyset pagination on the public listing pages
+            models.Index(fields=["created_at", "id"], name="residenceprop_created_id_idx"),
+            models.Index(fields=["property_type", "owner_verified", "status", "created_at"], name="residenceprop_public_idx"),
+        ]
+
 
 class ResidencePropertySetup(models.Model):
     property = models.OneToOneField(ResidenceProperty, on_delete=models.CASCADE)
@@ -119,13 +139,15 @@ class ResidencePropertySetup(models.Model):
         return f"Setup for {self.property.property_name}"
 
 
-class ResidencePropertyPhoto(models.Model):
+class ResidencePropertyPhoto(RenditionsMixin, models.Model):
     property = models.ForeignKey(
         ResidenceProperty,
         on_delete=models.CASCADE,
         related_name='photos'
     )
-    image = models.ImageField(upload_to='residence_property_photos/')
+    image = models.ImageField(upload_to='residence_property_photos/', storage=photo_storage)  # stored once per distinct file
+    renditions = models.JSONField(default=dict, blank=True, editable=False)  # size -> resized copy, see core.images
+    placeholder = models.TextField(blank=True, editable=False)  # tiny data URI shown while loading
     
     def __str__(self):
         return f"Photo of {self.property.property_name}"
@@ -1,3 +1,51 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-# Create your tests here.
+from attachments.models import Attachment
+from core.listings import LISTING_QUERY_BUDGETS
+from .models import (
+    ResidenceProperty,
+    ResidencePropertySetup,
+    ResidencePropertyPhoto,
+    ResidencePropertyPricing,
+)
+
+
+class ResidencePropertiesQueryBudgetTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = get_user_model().objects.create_user(
+            username="owner", email="owner@example.com", password="pass12345"
+        )
+        Attachment.objects.create(
+            user=owner, attachment_type="passport",
+            document="attachments/images/id.jpg", is_verified=True,
+        )
+        for i in range(10):
+            prop = ResidenceProperty.objects.create(
+                owner=owner, property_name=f"House {i}", property_type="house",
+                address="Street", district="Arusha", region="Arusha",
+            )
+            ResidencePropertySetup.objects.create(property=prop)
+            ResidencePropertyPricing.objects.create(property=prop, base_price=300000)
+            for j in range(3):
+                ResidencePropertyPhoto.objects.create(
+                    property=prop, image=f"residence_property_photos/{i}_{j}.jpg"
+                )
+
+    def test_listing_stays_within_query_budget(self):
+        url = reverse("residence_properties_type", args=["house"])
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertContains(response, "House 9")
+        self.assertLessEqual(len(ctx), LISTING_QUERY_BUDGETS["residence_properties"])
+
+    def test_listing_shows_only_open_residences_like_the_facets(self):
+        ResidenceProperty.objects.filter(property_name="House 9").update(status="closed")
+        response = self.client.get(reverse("residence_properties_type", args=["house"]))
+        self.assertNotContains(response, "House 9")
+        self.assertEqual(len(response.context["properties"]), 9)
@@ -1,4 +1,5 @@
 from django.shortcuts import render
+from listings.uploads import attach_uploads, kept_uploads
 from .models import (
     ResidenceProperty,
     ResidencePropertySetup,
@@ -60,6 +61,10 @@ def add_residence_property_all_in_one(request):
                     image=img
                 )
 
+            # Photos sent ahead in chunks by chunked-upload.js
+            attach_uploads(request.user, request.POST.getlist("upload_id"),
+                           ResidencePropertyPhoto, property=property_obj)
+
             success = True
 
     else:
@@ -74,6 +79,7 @@ def add_residence_property_all_in_one(request):
         "pricing_form": pricing_form,
         "legal_form": legal_form,
         "success": success,
+        "uploads": kept_uploads(request),
     }
 
     return render(request, "property/add_residence_property.html", context)
@@ -156,38 +162,28 @@ def update_residence_status(request, pk):
 
 
 from django.shortcuts import render
-from django.db.models import Q
+from core.pagination import paginate_keyset
+from listings.facets import listing_facets
+from listings.models import price_bucket_range
 from .models import ResidenceProperty
 
-
-TANZANIA_REGIONS = [
-    'Arusha', 'Dar es Salaam', 'Dodoma', 'Geita', 'Iringa', 'Kagera', 'Katavi',
-    'Kigoma', 'Kilimanjaro', 'Lindi', 'Manyara', 'Mara', 'Mbeya', 'Morogoro',
-    'Mtwara', 'Mwanza', 'Njombe', 'Pwani', 'Rukwa', 'Ruvuma', 'Shinyanga',
-    'Simiyu', 'Singida', 'Tabora', 'Tanga', 'Zanzibar North', 'Zanzibar South',
-    'Zanzibar West', 'Zanzibar Central/South', 'Zanzibar Urban/West'
-]
-
 def residence_properties(request, property_type):
-    # Filter by selected property_type (e.g., "apartment", "house", "frame")
+    # Filter by selected property_type (e.g., "apartment", "house", "frame");
+    # only open residences are listed, the same rows the facet counts cover
     properties = ResidenceProperty.objects.filter(
         property_type=property_type,
-        owner__attachments__is_verified=True
-    )
+        owner_verified=True,
+        status="open",
+    ).for_listing()
 
     keyword = request.GET.get("keyword", "")
     region = request.GET.get("region", "")
     type_filter = request.GET.get("property_type_filter", "")
+    price = request.GET.get("price", "")
 
     # Keyword search
     if keyword:
-        properties = properties.filter(
-            Q(property_name__icontains=keyword) |
-            Q(property_description__icontains=keyword) |
-            Q(address__icontains=keyword) |
-            Q(district__icontains=keyword) |
-            Q(region__icontains=keyword)
-        )
+        properties = properties.search(keyword)
 
     # Region filter
     if region:
@@ -197,11 +193,29 @@ def residence_properties(request, property_type):
     if type_filter:
         properties = properties.filter(property_type=type_filter)
 
+    # Price bucket filter
+    price_range = price_bucket_range("residence", price)
+    if price_range:
+        low, high = price_range
+        properties = properties.filter(residencepropertypricing__base_price__gte=low)
+        if high is not None:
+            properties = properties.filter(residencepropertypricing__base_price__lt=high)
+
+    page = paginate_keyset(request, properties)
+
+    facets = listing_facets(
+        ["residence"],
+        type_choices=ResidenceProperty.PROPERTY_TYPE_CHOICES,
+        listing_type=type_filter or property_type,
+        region=region,
+        price=price,
+    )
+
     context = {
-        "properties": properties,
+        "properties": page.object_list,
+        "page": page,
         "property_type": property_type.replace("_", " ").title(),
-        "tanzania_regions": TANZANIA_REGIONS,
-        "property_type_choices": ResidenceProperty.PROPERTY_TYPE_CHOICES,
+        "facets": facets,
     }
 
     return render(request, "customer/residence_property_lists.html", context)
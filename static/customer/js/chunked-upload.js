@@ -0,0 +1,165 @@
+// Chunked, resumable photo uploads for the add-listing forms.
+//
+// A file input marked with data-chunked-upload="<start url>" is sent to the
+// server in pieces when its form is submitted. Each finished photo becomes a
+// hidden "upload_id" field and the input itself is emptied, so the form post
+// only carries the ids; if the form has errors they come back as hidden
+// fields. If the connection drops, the chunk is retried from the offset the
+// server reports; an upload id is kept in localStorage so a reload can carry
+// on where it stopped. Without fetch/Blob.slice the form is posted as a
+// normal multipart upload.
+(function () {
+    "use strict";
+
+    var CHUNK_SIZE = 1024 * 1024;
+    var MAX_RETRIES = 5;
+
+    function storageKey(file) {
+        return "chunked-upload:" + [file.name, file.size, file.lastModified].join(":");
+    }
+
+    function sleep(ms) {
+        return new Promise(function (resolve) { setTimeout(resolve, ms); });
+    }
+
+    function sha256(blob) {
+        if (!window.crypto || !window.crypto.subtle) return Promise.resolve("");
+        return blob.arrayBuffer()
+            .then(function (buffer) { return crypto.subtle.digest("SHA-256", buffer); })
+            .then(function (digest) {
+                return Array.from(new Uint8Array(digest))
+                    .map(function (b) { return b.toString(16).padStart(2, "0"); })
+                    .join("");
+            });
+    }
+
+    function Uploader(startUrl, csrfToken) {
+        this.startUrl = startUrl;
+        this.csrfToken = csrfToken;
+    }
+
+    Uploader.prototype.request = function (url, options) {
+        options.headers = Object.assign({ "X-CSRFToken": this.csrfToken }, options.headers || {});
+        options.credentials = "same-origin";
+        return fetch(url, options).then(function (response) {
+            return response.json().then(function (body) {
+                return { status: response.status, body: body };
+            });
+        });
+    };
+
+    // Upload state for ``file``: resumed from localStorage or newly started
+    Uploader.prototype.open = function (file) {
+        var self = this;
+        var saved = localStorage.getItem(storageKey(file));
+        var resume = saved
+            ? this.request(this.startUrl + saved + "/", { method: "GET" })
+            : Promise.resolve({ status: 404 });
+
+        return resume.then(function (result) {
+            if (result.status === 200) return result.body;
+            var data = new FormData();
+            data.append("filename", file.name);
+            data.append("size", file.size);
+            return self.request(self.startUrl, { method: "POST", body: data }).then(function (started) {
+                if (started.status !== 201) throw new Error(started.body.error || "Upload failed");
+                localStorage.setItem(storageKey(file), started.body.id);
+                return started.body;
+            });
+        });
+    };
+
+    Uploader.prototype.upload = function (file, onProgress) {
+        var self = this;
+        return this.open(file).then(function (state) {
+            var chunkUrl = self.startUrl + state.id + "/chunk/";
+            var retries = 0;
+
+            function next(offset) {
+                onProgress(offset / file.size);
+                if (offset >= file.size) {
+                    localStorage.removeItem(storageKey(file));
+                    return state.id;
+                }
+                var chunk = file.slice(offset, offset + CHUNK_SIZE);
+                return sha256(chunk).then(function (digest) {
+                    return self.request(chunkUrl, {
+                        method: "POST",
+                        headers: {
+                            "Content-Type": "application/octet-stream",
+                            "Upload-Offset": String(offset),
+                            "X-Chunk-SHA256": digest,
+                        },
+                        body: chunk,
+                    });
+                }).then(function (result) {
+                    if (result.status === 200 || result.status === 409) {
+                        // 409: the server has a different offset, continue from there
+                        retries = result.status === 200 ? 0 : retries + 1;
+                        if (retries > MAX_RETRIES) throw new Error(result.body.error);
+                        return next(result.body.offset);
+                    }
+                    throw new Error(result.body.error || "Upload failed");
+                }, function () {
+                    // Network error: wait, ask where the server got to, carry on
+                    if (++retries > MAX_RETRIES) throw new Error("Connection lost");
+                    return sleep(500 * Math.pow(2, retries))
+                        .then(function () { return self.request(self.startUrl + state.id + "/", { method: "GET" }); })
+                        .then(function (status) { return next(status.body.offset); }, function () { return next(offset); });
+                });
+            }
+
+            return next(state.offset);
+        });
+    };
+
+    function attach(input) {
+        var form = input.form;
+        if (!form || !window.fetch || !window.Blob || !Blob.prototype.slice) return;
+        var csrf = form.querySelector("[name=csrfmiddlewaretoken]");
+        var uploader = new Uploader(input.dataset.chunkedUpload, csrf ? csrf.value : "");
+        var submitting = false;
+        var uploaded = {};  // storageKey -> id, so a resubmit skips finished photos
+        // "name:size" of photos the server kept from a submit that had form errors
+        var kept = {};
+        form.querySelectorAll("input[name=upload_id][data-file]").forEach(function (hidden) {
+            kept[hidden.dataset.file] = true;
+        });
+        var status = document.createElement("div");
+        status.className = "small text-muted mt-2";
+        input.parentNode.appendChild(status);
+
+        form.addEventListener("submit", function (event) {
+            if (submitting || !input.files.length) return;
+            event.preventDefault();
+            submitting = true;
+
+            var files = Array.from(input.files);
+
+            files.reduce(function (done, file, index) {
+                return done.then(function () {
+                    if (uploaded[storageKey(file)] || kept[file.name + ":" + file.size]) return;
+                    return uploader.upload(file, function (fraction) {
+                        status.textContent = "Uploading photo " + (index + 1) + " of " + files.length +
+                            " (" + Math.round(fraction * 100) + "%)";
+                    }).then(function (id) {
+                        uploaded[storageKey(file)] = id;
+                        var hidden = document.createElement("input");
+                        hidden.type = "hidden";
+                        hidden.name = "upload_id";
+                        hidden.value = id;
+                        form.appendChild(hidden);
+                    });
+                });
+            }, Promise.resolve()).then(function () {
+                input.value = "";
+                form.submit();
+            }, function (error) {
+                submitting = false;
+                status.textContent = error.message + ". Submit again to resume.";
+            });
+        });
+    }
+
+    document.querySelectorAll("input[type=file][data-chunked-upload]").forEach(attach);
+})();